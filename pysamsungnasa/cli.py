@@ -9,6 +9,7 @@ from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.shortcuts import CompleteStyle
 
 from .nasa import SamsungNasa
+from .correlation import NackError
 from .device import NasaDevice
 from .protocol.enum import DataType
 from .protocol.factory import build_message, SendMessage
@@ -284,7 +285,11 @@ async def interactive_cli(nasa: SamsungNasa):
                     if device_id not in nasa.devices:
                         print(f"Unknown device ID: {device_id}")
                         continue
-                    await nasa.devices[device_id].write_attribute(message, float(value))
+                    try:
+                        await nasa.devices[device_id].write_attribute(message, float(value))
+                    except (NackError, TimeoutError, ConnectionError) as ex:
+                        print(f"Write attribute failed for {message.MESSAGE_NAME}: {ex}")
+                        continue
                     print(f"Write attribute complete for {message.MESSAGE_NAME}")
             elif command == "read-range" and len(parts) == 4:
                 device_id = parts[1]
@@ -378,7 +383,8 @@ async def interactive_cli(nasa: SamsungNasa):
                         print("Usage: config append <key> <value>")
                 elif len(parts) == 2 and parts[1] == "dump":
                     for key, value in nasa.config.__dict__.items():
-                        print(f"{key}: {value}")
+                        if not key.startswith("_"):  # Internal caches such as the compiled log filter
+                            print(f"{key}: {value}")
                 else:
                     print(
                         "Usage: config set <key> <value> or config read <key> or config append <key> <value> or config dump"
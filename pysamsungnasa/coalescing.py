@@ -0,0 +1,162 @@
+"""Merge requests to the same device into as few packets as possible."""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import functools
+import logging
+
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .protocol.enum import DataType
+from .protocol.factory.types import SendMessage
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_MESSAGES_PER_PACKET = 10  # NASA packets carry at most 10 datasets
+
+
+def chunk_message_ids(message_ids: Iterable[int], size: int = MAX_MESSAGES_PER_PACKET) -> list[list[int]]:
+    """Split message IDs into packets of at most size IDs, dropping duplicates and keeping their order."""
+    unique = list(dict.fromkeys(message_ids))
+    return [unique[start : start + size] for start in range(0, len(unique), size)]
+
+
+@dataclass
+class _Batch:
+    """Messages waiting to be sent for one key, by message ID."""
+
+    done: asyncio.Future[dict[int, Any]]  # Result or exception of the packet carrying each message ID
+    messages: dict[int, Any] = field(default_factory=dict)  # Ordered by first request
+
+
+class _Coalescer(abc.ABC):
+    """Collect messages per key for `window` seconds and send them in packets of at most 10.
+
+    The first message for a key opens a batch that is sent `window` seconds later.
+    Messages added in the meantime join the batch, and every caller gets what
+    _send returned for the packet carrying its first message, or the exception
+    it raised.
+    """
+
+    def __init__(self, window: float) -> None:
+        """Init a coalescer collecting messages for window seconds."""
+        self.window = window
+        self._batches: dict[Hashable, _Batch] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.requested = 0  # Requests added
+        self.packets = 0  # Packets sent for them
+
+    async def _add(self, key: Hashable, messages: dict[int, Any]) -> Any:
+        """Add messages to the batch for key and wait for it to be sent."""
+        if not messages:
+            return None
+        self.requested += 1
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(asyncio.get_running_loop().create_future())
+            task = asyncio.create_task(self._flush_later(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(functools.partial(self._resolve, batch))
+        batch.messages.update(messages)
+        # Shielded so a cancelled caller does not cancel the batch for everyone else in it
+        results = await asyncio.shield(batch.done)
+        result = results.get(next(iter(messages)))
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    @abc.abstractmethod
+    async def _send(self, key: Hashable, messages: dict[int, Any]) -> Any:
+        """Send one packet of messages for key, returns the result for its callers."""
+
+    async def _flush_later(self, key: Hashable, batch: _Batch) -> None:
+        """Send a batch once its window has passed."""
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            if self._batches.get(key) is batch:
+                del self._batches[key]
+        chunks = chunk_message_ids(batch.messages)
+        results: dict[int, Any] = {}
+        for chunk in chunks:
+            try:
+                result = await self._send(key, {message_id: batch.messages[message_id] for message_id in chunk})
+            except Exception as ex:  # Only fails the callers of this packet
+                result = ex
+            self.packets += 1
+            results.update(dict.fromkeys(chunk, result))
+        _LOGGER.debug("Sent %d message(s) for %s in %d coalesced packet(s)", len(results), key, len(chunks))
+        batch.done.set_result(results)
+
+    @staticmethod
+    def _resolve(batch: _Batch, task: asyncio.Task) -> None:
+        """Pass a failed or cancelled flush on to every caller in the batch."""
+        if batch.done.done():
+            return
+        if task.cancelled():
+            batch.done.set_exception(ConnectionError("Coalescer was closed before the batch was sent"))
+        elif (ex := task.exception()) is not None:
+            batch.done.set_exception(ex)
+
+    def close(self) -> None:
+        """Cancel batches that have not been sent yet, their callers get ConnectionError."""
+        for task in list(self._tasks):
+            task.cancel()
+        self._batches.clear()
+
+
+class ReadCoalescer(_Coalescer):
+    """Merge reads to the same destination that are requested within a short window.
+
+    Message IDs requested more than once are only read once.
+    """
+
+    def __init__(self, window: float, send: Callable[[str, list[int]], Awaitable[int | None]]) -> None:
+        """Init a coalescer that sends each packet with send(destination, message_ids)."""
+        super().__init__(window)
+        self._send_read = send
+
+    def pending(self, destination: str) -> list[int]:
+        """Return the message IDs waiting to be sent to destination."""
+        batch = self._batches.get(destination)
+        return list(batch.messages) if batch is not None else []
+
+    async def read(self, destination: str, message_ids: Iterable[int]) -> int | None:
+        """Read message IDs from destination, returns the packet number of the first packet carrying them."""
+        return await self._add(destination, dict.fromkeys(message_ids))
+
+    async def _send(self, key: Hashable, messages: dict[int, Any]) -> int | None:
+        return await self._send_read(key, list(messages))
+
+
+class WriteCoalescer(_Coalescer):
+    """Merge writes to the same destination that are issued within a short window.
+
+    Writes with different data types go in separate packets. A later write to a
+    message ID replaces the pending one, so only the latest value is sent.
+    Every caller gets the result of the packet carrying its first message, e.g.
+    the reply to it when send waits for one.
+    """
+
+    def __init__(self, window: float, send: Callable[[str, DataType, list[SendMessage]], Awaitable[Any]]) -> None:
+        """Init a coalescer that sends each packet with send(destination, data_type, messages)."""
+        super().__init__(window)
+        self._send_write = send
+
+    def pending(self, destination: str, data_type: DataType = DataType.WRITE) -> list[SendMessage]:
+        """Return the messages waiting to be sent to destination."""
+        batch = self._batches.get((destination, data_type))
+        return list(batch.messages.values()) if batch is not None else []
+
+    async def write(self, destination: str, data_type: DataType, messages: Iterable[SendMessage]) -> Any:
+        """Write messages to destination, returns what send returned for the packet carrying the first one."""
+        return await self._add((destination, data_type), {message.MESSAGE_ID: message for message in messages})
+
+    async def _send(self, key: Hashable, messages: dict[int, Any]) -> Any:
+        destination, data_type = key
+        return await self._send_write(destination, data_type, list(messages.values()))
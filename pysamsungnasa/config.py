@@ -5,6 +5,27 @@ from dataclasses import dataclass, field
 from .helpers import Address
 
 
+@dataclass(frozen=True, slots=True)
+class LogFilter:
+    """The message logging options of a NasaConfig compiled into sets.
+
+    Addresses are compared upper case, so "80ff01" and "80FF01" match.
+    """
+
+    own_address: str
+    log_all: bool
+    devices: frozenset[str]
+    messages: frozenset[int]
+
+    def logs_dest(self, dest: str) -> bool:
+        """Return True if every message sent to dest is logged."""
+        return self.log_all or (dest := dest.upper()) == self.own_address or dest in self.devices
+
+    def should_log(self, dest: str, message_number: int) -> bool:
+        """Return True if message_number sent to dest is logged."""
+        return message_number in self.messages or self.logs_dest(dest)
+
+
 @dataclass
 class NasaConfig:
     """Represent a NASA configuration."""
@@ -32,8 +53,47 @@ class NasaConfig:
     write_retry_backoff_factor: float = 1.1  # Multiply retry interval by this factor after each attempt
     client_baudrate: int = 9600  # Baudrate for SerialX client
     device_path: str | None = None  # Path to the device (e.g. /dev/ttyUSB0)
+    tx_idle_gap: float = 0.02  # Seconds the bus must be quiet, after the last byte received or sent, before sending
+    tx_max_idle_wait: float = 0.5  # Send anyway if the bus has not been quiet for this many seconds
+    tx_rate_limit: float = 0.0  # Average frames per second sent, 0 (default) only paces by bus activity
+    tx_burst: int = 5  # Frames that can be sent back to back before the rate limit applies
+    tx_max_queue_wait: float = 2.0  # Seconds a queued frame waits before it is sent ahead of higher priority frames
+    request_timeout: float = 5.0  # Seconds request() waits for the reply
+    read_coalesce_window: float = 0.01  # Seconds reads to the same device are collected for before they are sent
+    write_coalesce_window: float = 0.05  # Seconds writes to the same device are collected for before they are sent
+    suppress_unchanged_values: bool = False  # Skip device callbacks for values received again unchanged (opt-in)
+    value_store: bool = False  # Also keep the latest numeric values of each device in flat arrays (device.values)
+    batch_device_callbacks: bool = False  # Call device callbacks once per packet instead of once per message
+    device_callback_flush_interval: float = 0.0  # Deliver changes at most once per this many seconds, 0 = per packet
+    callback_mode: str = "inline"  # Run callbacks "inline" in the receive path, as "task"s or on "thread"s
+    callback_queue_size: int = 100  # Calls queued per callback in task and thread mode
+    callback_overflow: str = "latest"  # "latest", "drop_oldest" or "block" when a callback queue is full
+    callback_threads: int = 4  # Size of the thread pool in thread mode
+    poll_jitter: float = 0.1  # Poll intervals are spread by up to this fraction so polls do not stay in step
+    poll_pack_ahead: float = 0.25  # Fill READ packets with polls due within this fraction of their interval
+    frame_template_cache_size: int = 128  # Encoded READ frames kept for repeated polls, 0 disables the cache
+    trace_buffer_size: int = 0  # Number of recent raw frames kept in memory for diagnostics, 0 disables the trace
+    _log_filter_key: tuple | None = field(default=None, init=False, repr=False, compare=False)
+    _log_filter: LogFilter | None = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def address(self) -> Address:
         """Return address."""
         return Address(0x80, 0xFF, self.client_address)
+
+    @property
+    def log_filter(self) -> LogFilter:
+        """Return the logging options as a LogFilter, rebuilt only when one of them changes.
+
+        Only read once debug logging is known to be enabled, so the change check costs nothing otherwise.
+        """
+        key = (self.client_address, self.log_all_messages, tuple(self.devices_to_log), tuple(self.messages_to_log))
+        if self._log_filter is None or key != self._log_filter_key:
+            self._log_filter_key = key
+            self._log_filter = LogFilter(
+                own_address=str(self.address).upper(),
+                log_all=self.log_all_messages,
+                devices=frozenset(str(device).upper() for device in self.devices_to_log),
+                messages=frozenset(self.messages_to_log),
+            )
+        return self._log_filter
@@ -0,0 +1,145 @@
+"""Match received responses to the requests that asked for them."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from .protocol.enum import DataType
+from .protocol.factory.types import BaseMessage
+from .protocol.packet import MessageEvent, PacketHeader
+
+
+class NackError(Exception):
+    """A device rejected a request with a NACK."""
+
+    def __init__(self, destination: str, packet_number: int) -> None:
+        """Init the error for the request sent to destination with packet_number."""
+        super().__init__(destination, packet_number)
+        self.destination = destination
+        self.packet_number = packet_number
+
+    def __str__(self) -> str:
+        return f"Device {self.destination} sent a NACK for packet {self.packet_number}"
+
+
+@dataclass(frozen=True, slots=True)
+class Response:
+    """The RESPONSE or ACK received for a request."""
+
+    header: PacketHeader
+    events: tuple[MessageEvent, ...]
+
+    @property
+    def messages(self) -> dict[int, BaseMessage]:
+        """Return the parsed messages by message ID."""
+        return {event.message_number: event.message for event in self.events}
+
+
+@dataclass(slots=True, eq=False)
+class _Request:
+    destination: str
+    packet_number: int
+    message_ids: tuple[int, ...]
+    future: asyncio.Future[Response]
+    timer: asyncio.TimerHandle | None = field(default=None)
+
+
+class RequestTracker:
+    """Requests waiting for a reply, indexed by destination and packet number and by destination and message ID.
+
+    A reply is matched to the request with its packet number. Devices do not
+    always echo it, so a reply whose packet number no request was sent with is
+    given to the oldest request to its source that asked for its first message ID.
+    Replies sent to another address than `address` are ignored. Every lookup is a
+    dict access.
+    """
+
+    def __init__(self, address: str | None = None) -> None:
+        """Init a tracker with no requests, for replies sent to address (any address if None)."""
+        self.address = address.upper() if address is not None else None
+        self._by_packet: dict[tuple[str, int], _Request] = {}
+        self._by_message: dict[tuple[str, int], dict[_Request, None]] = {}  # Ordered oldest first
+
+    def __len__(self) -> int:
+        return len(self._by_packet)
+
+    def track(
+        self, destination: str, packet_number: int, message_ids: Iterable[int], timeout: float
+    ) -> asyncio.Future[Response]:
+        """Track a request that was sent, returns a future for its reply that fails with TimeoutError after timeout."""
+        loop = asyncio.get_running_loop()
+        request = _Request(destination.upper(), packet_number, tuple(message_ids), loop.create_future())
+        key = (request.destination, packet_number)
+        if (previous := self._by_packet.get(key)) is not None:
+            # The packet number wrapped around before the previous request was answered
+            self._fail(previous, TimeoutError(f"Request {packet_number} to {destination} was not answered"))
+        self._by_packet[key] = request
+        for message_id in request.message_ids:
+            self._by_message.setdefault((request.destination, message_id), {})[request] = None
+        request.timer = loop.call_later(
+            timeout,
+            self._fail,
+            request,
+            TimeoutError(f"Timeout waiting for a reply to request {packet_number} from {destination}"),
+        )
+        request.future.add_done_callback(functools.partial(self._on_done, request))
+        return request.future
+
+    def _on_done(self, request: _Request, future: asyncio.Future[Response]) -> None:
+        """Stop tracking a request its caller cancelled."""
+        if future.cancelled():
+            self._remove(request)
+
+    def _remove(self, request: _Request) -> None:
+        """Remove a request from the indexes and stop its timer."""
+        if request.timer is not None:
+            request.timer.cancel()
+        key = (request.destination, request.packet_number)
+        if self._by_packet.get(key) is request:
+            del self._by_packet[key]
+        for message_id in request.message_ids:
+            key = (request.destination, message_id)
+            if (requests := self._by_message.get(key)) is not None:
+                requests.pop(request, None)
+                if not requests:
+                    del self._by_message[key]
+
+    def _fail(self, request: _Request, ex: BaseException) -> None:
+        self._remove(request)
+        if not request.future.done():
+            request.future.set_exception(ex)
+
+    def _find(self, header: PacketHeader, message_ids: list[int]) -> _Request | None:
+        """Return the request a reply answers, None if it answers none."""
+        request = self._by_packet.get((header.source, header.packet_number))
+        if request is not None:
+            return request if not message_ids or message_ids[0] in request.message_ids else None
+        if message_ids and (requests := self._by_message.get((header.source, message_ids[0]))):
+            return next(iter(requests))
+        return None
+
+    def handle_reply(self, header: PacketHeader, events: list[MessageEvent]) -> bool:
+        """Resolve the request a RESPONSE, ACK or NACK answers, returns True if one was found."""
+        if self.address is not None and header.dest.upper() != self.address:
+            return False
+        request = self._find(header, [event.message_number for event in events])
+        if request is None:
+            return False
+        self._remove(request)
+        if request.future.done():  # Cancelled by its caller
+            return True
+        if header.payload_type == DataType.NACK:
+            request.future.set_exception(NackError(request.destination, request.packet_number))
+        else:
+            request.future.set_result(Response(header, tuple(events)))
+        return True
+
+    def fail_all(self, ex: BaseException) -> None:
+        """Fail every request, e.g. when the connection is lost."""
+        for request in list(self._by_packet.values()):
+            self._fail(request, ex)
+        self._by_message.clear()
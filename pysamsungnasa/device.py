@@ -8,17 +8,27 @@ import logging
 from typing import TYPE_CHECKING, Any, Callable
 from datetime import datetime, timezone
 
+from .coalescing import MAX_MESSAGES_PER_PACKET, WriteCoalescer
 from .config import NasaConfig
 from .protocol.enum import AddressClass, DataType
+from .protocol.packet import MessageEvent, PacketHeader
 from .protocol.parser import NasaPacketParser
 from .protocol.factory.types import BaseMessage, SendMessage
+from .store import ValueStore
 
 if TYPE_CHECKING:
+    from .correlation import Response
     from .nasa_client import NasaClient
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _merge_changes(queued: tuple, new: tuple) -> tuple:
+    """Merge the arguments of two change callback calls for a device into one call with both sets of IDs."""
+    device, changed = queued
+    return device, changed | new[1]
+
+
 class NasaDevice:
     """NASA Device."""
 
@@ -33,19 +43,34 @@ class NasaDevice:
         self.address = address
         self.device_type = device_type
         self.attributes: dict[int, BaseMessage] = {}
+        # Latest numeric values in flat arrays, kept alongside attributes when value_store is set
+        self.values: ValueStore | None = ValueStore() if config.value_store else None
         self.config = config
         self.last_packet_time = None
+        self._last_header: PacketHeader | None = None  # Header last_packet_time was set for
+        self._last_timestamp = 0.0  # last_packet_time as seconds since the epoch
+        self._dirty: set[int] = set()  # Message IDs changed since the last drain_dirty
+        self._changed: set[int] = set()  # Message IDs changed since the change callbacks were last called
+        self._flush_handle: asyncio.TimerHandle | None = None
         self.fsv_config = {}
         self._device_callbacks: list[Callable] = []
-        self._packet_callbacks: dict[int, list[Callable]] = {}
+        self._change_callbacks: list[Callable[[NasaDevice, frozenset[int]], None]] = []
+        self._packet_callbacks: dict[int, list[Callable]] = {}  # kwargs style
+        self._packet_event_callbacks: dict[int, list[Callable[[NasaDevice, MessageEvent], None]]] = {}
         self._client = client
+        self._dispatcher = packet_parser.dispatcher
         self._attribute_events: dict[int, asyncio.Event] = {}
-        packet_parser.add_device_handler(address, self.handle_packet)
+        self._attribute_reads: dict[int, asyncio.Future[None]] = {}  # Reads in flight by message ID
+        self._read_tasks: set[asyncio.Task] = set()
+        self._write_coalescer = WriteCoalescer(config.write_coalesce_window, self._send_writes)
+        packet_parser.add_device_event_handler(address, self.handle_event)
+        packet_parser.add_device_packet_handler(address, self.handle_packet_end)
 
     def add_device_callback(self, callback: Callable):
         """Add a device callback."""
         if callback not in self._device_callbacks:
             self._device_callbacks.append(callback)
+            self._dispatcher.subscribe(callback)
 
     def add_packet_callback(self, message: type[BaseMessage], callback: Callable):
         """Add a packet callback for a specific message type.
@@ -60,6 +85,7 @@ class NasaDevice:
             self._packet_callbacks[message.MESSAGE_ID] = []
         if callback not in self._packet_callbacks[message.MESSAGE_ID]:
             self._packet_callbacks[message.MESSAGE_ID].append(callback)
+            self._dispatcher.subscribe(callback)
 
     def remove_packet_callback(self, message: type[BaseMessage], callback: Callable):
         """Remove a packet callback for a specific message type.
@@ -73,48 +99,161 @@ class NasaDevice:
         if message.MESSAGE_ID in self._packet_callbacks:
             if callback in self._packet_callbacks[message.MESSAGE_ID]:
                 self._packet_callbacks[message.MESSAGE_ID].remove(callback)
+                self._dispatcher.unsubscribe(callback)
+
+    def add_packet_event_callback(
+        self, message: type[BaseMessage], callback: Callable[[NasaDevice, MessageEvent], None]
+    ):
+        """Add a packet callback for a specific message type that is called with the device and a MessageEvent.
+
+        Args:
+            message: Message class (subclass of BaseMessage) to listen for.
+            callback: Callback function to invoke when the message is received.
+        """
+        assert issubclass(message, BaseMessage)
+        assert message.MESSAGE_ID is not None
+        self._packet_event_callbacks.setdefault(message.MESSAGE_ID, [])
+        if callback not in self._packet_event_callbacks[message.MESSAGE_ID]:
+            self._packet_event_callbacks[message.MESSAGE_ID].append(callback)
+            self._dispatcher.subscribe(callback)
+
+    def remove_packet_event_callback(
+        self, message: type[BaseMessage], callback: Callable[[NasaDevice, MessageEvent], None]
+    ):
+        """Remove a packet event callback for a specific message type.
+
+        Args:
+            message: Message class (subclass of BaseMessage) to stop listening for.
+            callback: Callback function to remove.
+        """
+        assert issubclass(message, BaseMessage)
+        assert message.MESSAGE_ID is not None
+        if callback in self._packet_event_callbacks.get(message.MESSAGE_ID, []):
+            self._packet_event_callbacks[message.MESSAGE_ID].remove(callback)
+            self._dispatcher.unsubscribe(callback)
 
     def remove_device_callback(self, callback: Callable):
         """Remove a device callback."""
         if callback in self._device_callbacks:
             self._device_callbacks.remove(callback)
+            self._dispatcher.unsubscribe(callback)
+
+    def add_change_callback(self, callback: Callable[[NasaDevice, frozenset[int]], None]):
+        """Add a callback called once per received packet with the message IDs it changed.
+
+        With device_callback_flush_interval set, changes are collected and the callback
+        is called at most once per interval instead.
+        """
+        if callback not in self._change_callbacks:
+            self._change_callbacks.append(callback)
+            self._dispatcher.subscribe(callback)
+
+    def remove_change_callback(self, callback: Callable[[NasaDevice, frozenset[int]], None]):
+        """Remove a change callback."""
+        if callback in self._change_callbacks:
+            self._change_callbacks.remove(callback)
+            self._dispatcher.unsubscribe(callback)
 
     async def get_attribute(self, attribute: type[BaseMessage], requires_read: bool = False) -> BaseMessage:
-        """Get a specific attribute from the device, if it is not already known a request will be sent to the device."""
+        """Get a specific attribute from the device, if it is not already known a request will be sent to the device.
+
+        Concurrent callers share a single read of the attribute and all get its result or TimeoutError.
+        """
         assert issubclass(attribute, BaseMessage)
         assert attribute.MESSAGE_ID is not None
-        if attribute.MESSAGE_ID not in self.attributes or requires_read:
-            await self._client.nasa_read(
-                msgs=[attribute.MESSAGE_ID],
-                destination=self.address,
-            )
+        return (await self.get_attributes([attribute], requires_read=requires_read))[attribute.MESSAGE_ID]
 
-        event = self._attribute_events.setdefault(attribute.MESSAGE_ID, asyncio.Event())
+    async def get_attributes(
+        self, attributes: list[type[BaseMessage]], requires_read: bool = False
+    ) -> dict[int, BaseMessage]:
+        """Get attributes from the device by message ID, reading the ones that are not already known.
 
-        async with asyncio.timeout(10):
-            while attribute.MESSAGE_ID not in self.attributes or requires_read:
-                event.clear()
-                await event.wait()  # Waits until handle_packet sets it
-                requires_read = False  # Only require read once
+        Attributes that are already being read join that read, the rest are read together.
+        """
+        message_ids = list(dict.fromkeys(attribute.MESSAGE_ID for attribute in attributes))
+        if None in message_ids:
+            raise ValueError("Every attribute needs a MESSAGE_ID.")
+        reads = {
+            message_id: read
+            for message_id in message_ids
+            if (read := self._attribute_reads.get(message_id)) is not None
+            or requires_read
+            or message_id not in self.attributes
+        }
+        if to_read := [message_id for message_id, read in reads.items() if read is None]:
+            reads.update(self._start_read(to_read))
+        if reads:
+            # Shielded so a cancelled caller does not cancel the read for everyone else waiting on it
+            await asyncio.gather(*(asyncio.shield(read) for read in reads.values()))
+        return {message_id: self.attributes[message_id] for message_id in message_ids}
 
-        if attribute.MESSAGE_ID not in self.attributes:
-            raise TimeoutError(f"Timeout waiting for attribute {attribute.MESSAGE_ID} from device {self.address}")
+    def _start_read(self, message_ids: list[int]) -> dict[int, asyncio.Future[None]]:
+        """Start reading message IDs, returns a future per message ID resolved when it arrives."""
+        loop = asyncio.get_running_loop()
+        reads = {message_id: loop.create_future() for message_id in message_ids}
+        self._attribute_reads.update(reads)
+        task = asyncio.create_task(self._read_attributes(reads))
+        self._read_tasks.add(task)
+        task.add_done_callback(self._read_tasks.discard)
+        return reads
 
-        return self.attributes[attribute.MESSAGE_ID]
+    async def _read_attributes(self, reads: dict[int, asyncio.Future[None]]) -> None:
+        """Read attributes and resolve their futures as they arrive, or with the error that stopped the read."""
+        error: Exception | None = None
+        try:
+            events = {
+                message_id: self._attribute_events.setdefault(message_id, asyncio.Event()) for message_id in reads
+            }
+            for event in events.values():
+                event.clear()
+            await self._client.nasa_read(
+                msgs=list(reads),
+                destination=self.address,
+            )
+            async with asyncio.timeout(10):
+                for message_id, event in events.items():
+                    await event.wait()  # Waits until handle_event sets it
+                    reads[message_id].set_result(None)
+        except asyncio.CancelledError:
+            for read in reads.values():
+                read.cancel()
+            raise
+        except TimeoutError:
+            pass
+        except Exception as ex:
+            error = ex
+        finally:
+            for message_id, read in reads.items():
+                if self._attribute_reads.get(message_id) is read:
+                    del self._attribute_reads[message_id]
+        for message_id, read in reads.items():
+            if not read.done():
+                read.set_exception(
+                    error or TimeoutError(f"Timeout waiting for attribute {message_id} from device {self.address}")
+                )
 
     async def write_attributes(self, attributes: dict[type[BaseMessage], Any], mode=DataType.WRITE):
         """Write specific attributes to the device.
 
-        NASA protocol can handle up to 10 messages per packet.
+        NASA protocol can handle up to 10 messages per packet. Writes issued within
+        write_coalesce_window are merged into packets of up to 10 messages, a later
+        write to the same attribute replaces the earlier value. Every caller waits
+        for the ACK to the packet carrying its first attribute.
 
         Args:
             attributes: Dictionary mapping message class to value
-            mode: DataType to use for writing, default is DataType.WRITE however sometimes DataType.REQUEST may be needed
+            mode: DataType to use for writing, default is DataType.WRITE however
+                sometimes DataType.REQUEST may be needed
+
+        Returns the Response (the ACK) to the packet carrying the first attribute.
 
         Raises:
             ValueError: If more than 10 messages or message class lacks MESSAGE_ID
+            NackError: If the device answered the packet with a NACK
+            TimeoutError: If no ACK arrived within request_timeout
+            ConnectionError: If the packet could not be sent
         """
-        if len(attributes) > 10:
+        if len(attributes) > MAX_MESSAGES_PER_PACKET:
             raise ValueError(f"Cannot write more than 10 messages in one packet, got {len(attributes)}")
 
         messages = []
@@ -123,54 +262,119 @@ class NasaDevice:
                 raise ValueError(f"Message class {message_class} does not have a MESSAGE_ID.")
 
             messages.append(SendMessage(MESSAGE_ID=message_class.MESSAGE_ID, PAYLOAD=message_class.to_bytes(value)))
-        await self._client.send_message(
-            destination=self.address,
-            request_type=mode,
-            messages=messages,
-        )
+        return await self._write_coalescer.write(self.address, mode, messages)
 
     async def write_attribute(self, message_class: type[BaseMessage], value: Any, mode=DataType.WRITE):
         """Write a single attribute to the device, this is a convenience method of write_attributes."""
-        await self.write_attributes({message_class: value}, mode=mode)
+        return await self.write_attributes({message_class: value}, mode=mode)
 
-    def handle_packet(self, *_nargs, **kwargs):
-        """Handle a packet sent to this device from the parser."""
-        self.last_packet_time = datetime.now(timezone.utc)
-        message_number = kwargs["messageNumber"]
-        packet_data: BaseMessage = kwargs["packet"]
-        log_message = (
-            str(self.config.address) == kwargs["dest"]
-            or self.config.log_all_messages
-            or kwargs["dest"] in self.config.devices_to_log
-            or message_number in self.config.messages_to_log
+    async def _send_writes(self, destination: str, mode: DataType, messages: list[SendMessage]) -> Response:
+        """Send one packet of writes for the write coalescer and wait for the ACK."""
+        return await self._client.request(
+            destination=destination,
+            request_type=mode,
+            messages=messages,
         )
 
+    def handle_packet(self, *_nargs, **kwargs):
+        """Handle a packet passed as keyword arguments, kept for compatibility with handle_event.
+
+        Each call carries a single dataset and is treated as a whole packet, so batched
+        and change callbacks are delivered as for a packet received from the parser.
+        """
+        event = MessageEvent.from_kwargs(kwargs)
+        self.handle_event(event)
+        self.handle_packet_end(event.header)
+
+    def drain_dirty(self) -> set[int]:
+        """Return the message IDs whose value changed since the last call, and start tracking afresh."""
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def handle_event(self, event: MessageEvent):
+        """Handle a message sent to this device from the parser.
+
+        A value with the same raw payload as the stored one is unchanged: the stored,
+        already decoded message is kept and no callbacks are called, but readers
+        waiting for the message are still woken.
+        """
+        header = event.header
+        if header is not self._last_header:  # Every dataset of a packet shares its header
+            self._last_header = header
+            self.last_packet_time = datetime.now(timezone.utc)
+            self._last_timestamp = self.last_packet_time.timestamp()
+        message_number = event.message_number
+        packet_data: BaseMessage = event.message
+        if self.config.suppress_unchanged_values and packet_data.RAW_PAYLOAD:
+            previous = self.attributes.get(message_number)
+            if (
+                previous is not None
+                and previous.RAW_PAYLOAD == packet_data.RAW_PAYLOAD
+                and type(previous) is type(packet_data)
+            ):
+                if message_number in self._attribute_events:
+                    self._attribute_events[message_number].set()
+                if self.values is not None:
+                    self.values.touch(message_number, self._last_timestamp)
+                return
+        dest = header.dest
+        log_message = _LOGGER.isEnabledFor(logging.DEBUG) and self.config.log_filter.should_log(dest, message_number)
+
         if log_message:
-            _LOGGER.debug("Handling packet for device %s: %s", self.address, kwargs)
+            _LOGGER.debug("Handling packet for device %s: %s", self.address, event)
         self.attributes[message_number] = packet_data
+        if self.values is not None:
+            self.values.update_message(message_number, packet_data, self._last_timestamp)
+        self._dirty.add(message_number)
+        self._changed.add(message_number)
         if message_number in self._attribute_events:
             self._attribute_events[message_number].set()
         if log_message:
             _LOGGER.debug(
                 "Device %s: Stored parsed attribute for msg %s (%s): %s",
                 self.address,
-                kwargs["formattedMessageNumber"],
+                event.formatted_message_number,
                 message_number,
-                self.attributes[message_number],
+                packet_data,
             )
 
         # Test if the packet is an FSV configuration packet
         if packet_data.is_fsv_message:
             self.fsv_config[message_number] = packet_data.VALUE
 
-        for callback in self._device_callbacks:
-            try:
-                callback(self)
-            except Exception:
-                _LOGGER.exception("Error in device %s callback", self.address)
+        if not self.config.batch_device_callbacks:
+            self._call_device_callbacks()
+        if message_number in self._packet_event_callbacks:
+            for callback in self._packet_event_callbacks[message_number]:
+                self._dispatcher.call(callback, self, event, key=(self.address, message_number))
         if message_number in self._packet_callbacks:
+            kwargs = event.as_kwargs()
             for callback in self._packet_callbacks[message_number]:
-                try:
-                    callback(self, **kwargs)
-                except Exception:
-                    _LOGGER.exception("Error in device %s packet callback", self.address)
+                self._dispatcher.call(callback, self, key=(self.address, message_number), **kwargs)
+
+    def _call_device_callbacks(self) -> None:
+        """Call every device callback with this device through the dispatcher, keyed by address."""
+        for callback in self._device_callbacks:
+            self._dispatcher.call(callback, self, key=self.address)
+
+    def handle_packet_end(self, _header: PacketHeader) -> None:
+        """Deliver the changes of a packet once all of its datasets are stored (packet handler for the parser)."""
+        if not self._changed or self._flush_handle is not None:
+            return
+        if (interval := self.config.device_callback_flush_interval) > 0:
+            self._flush_handle = asyncio.get_running_loop().call_later(interval, self._flush_changes)
+        else:
+            self._flush_changes()
+
+    def _flush_changes(self) -> None:
+        """Call the batched device callbacks and the change callbacks with the message IDs changed since last time."""
+        self._flush_handle = None
+        changed = frozenset(self._changed)
+        self._changed.clear()
+        if not changed:
+            return
+        if self.config.batch_device_callbacks:
+            self._call_device_callbacks()
+        for callback in self._change_callbacks:
+            # Merged with a queued call rather than replacing it, that would lose the message IDs it carries
+            self._dispatcher.call(callback, self, changed, key=self.address, merge=_merge_changes)
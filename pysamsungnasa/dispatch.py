@@ -0,0 +1,269 @@
+"""Run user callbacks inline, as tasks or on a thread pool, with a bounded queue per callback."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import itertools
+import logging
+import time
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import StrEnum
+from inspect import isawaitable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CallbackMode(StrEnum):
+    """Where callbacks run."""
+
+    INLINE = "inline"  # In the receive path, before the next dataset is handled
+    TASK = "task"  # On the event loop, from the callback's queue
+    THREAD = "thread"  # On a bounded thread pool, from the callback's queue
+
+
+class OverflowPolicy(StrEnum):
+    """What happens to a call when the callback's queue is full."""
+
+    LATEST = "latest"  # A call replaces the queued call with the same key, the oldest call is dropped when full
+    DROP_OLDEST = "drop_oldest"  # Drop the oldest queued call that has a key
+    BLOCK = "block"  # Queue the call and hold the receive path until the queue has room again
+
+
+@dataclass(frozen=True, slots=True)
+class HandlerStatistics:
+    """Calls and time spent for one callback."""
+
+    name: str
+    calls: int
+    errors: int
+    dropped: int  # Calls dropped because the queue was full, or replaced by a later call with the same key
+    queued: int
+    total_time: float  # Seconds spent in the callback
+    max_time: float
+
+
+@dataclass(slots=True, eq=False)
+class _Subscriber:
+    callback: Callable
+    name: str
+    queue: OrderedDict[Hashable, tuple[tuple, dict[str, Any], bool]] = field(default_factory=OrderedDict)
+    task: asyncio.Task | None = None
+    references: int = 0  # Registrations through subscribe
+    calls: int = 0
+    errors: int = 0
+    dropped: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+
+class CallbackDispatcher:
+    """Run callbacks in the configured mode and keep time statistics per callback.
+
+    In task and thread mode every callback has its own queue of up to queue_size
+    calls, drained in order by a task that only runs while the queue is not empty,
+    so a slow callback delays only its own calls. Calls are given a key, e.g. the
+    device and message ID, that the latest overflow policy uses to keep only the
+    newest call for a key. Calls made with a merge function, e.g. change
+    callbacks whose arguments cannot simply be replaced by a later call, are
+    merged into the queued call with the same key under every policy and are
+    never dropped, so they take at most one place in the queue per key.
+
+    Owners of callbacks register them with subscribe and unsubscribe, the
+    statistics and queue of a callback are dropped once it has no registrations.
+    """
+
+    def __init__(
+        self,
+        mode: CallbackMode | str = CallbackMode.INLINE,
+        queue_size: int = 100,
+        overflow: OverflowPolicy | str = OverflowPolicy.LATEST,
+        threads: int = 4,
+    ) -> None:
+        """Init a dispatcher, threads is the size of the pool used in thread mode."""
+        self.mode = CallbackMode(mode)
+        self.overflow = OverflowPolicy(overflow)
+        if queue_size < 1:
+            raise ValueError("Callback queue size must be at least 1.")
+        self._queue_size = queue_size
+        self._threads = threads
+        self._executor: ThreadPoolExecutor | None = None
+        self._subscribers: dict[Callable, _Subscriber] = {}
+        self._keys = itertools.count()  # Keys for calls that are never replaced
+        self._full: set[_Subscriber] = set()  # Over queue_size, only with the block policy
+        self._room = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()  # Awaitables returned by inline callbacks
+
+    def _subscriber(self, callback: Callable) -> _Subscriber:
+        subscriber = self._subscribers.get(callback)
+        if subscriber is None:
+            name = getattr(callback, "__qualname__", None) or repr(callback)
+            subscriber = self._subscribers[callback] = _Subscriber(callback, name)
+        return subscriber
+
+    def subscribe(self, callback: Callable) -> None:
+        """Register a callback, every subscribe needs a matching unsubscribe."""
+        self._subscriber(callback).references += 1
+
+    def unsubscribe(self, callback: Callable) -> None:
+        """Drop a registration of callback, its queued calls and statistics go with the last one."""
+        subscriber = self._subscribers.get(callback)
+        if subscriber is None:
+            return
+        subscriber.references -= 1
+        if subscriber.references > 0:
+            return
+        del self._subscribers[callback]
+        subscriber.queue.clear()
+        if subscriber.task is not None:
+            subscriber.task.cancel()
+        if subscriber in self._full:
+            self._full.discard(subscriber)
+            if not self._full:
+                self._room.set()
+
+    def call(
+        self,
+        callback: Callable,
+        *args: Any,
+        key: Hashable | None = None,
+        merge: Callable[[tuple, tuple], tuple] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Call callback(*args, **kwargs) now in inline mode, otherwise queue the call.
+
+        With merge and a key, a call queued with the same key runs once with
+        merge(queued_args, args) as its arguments instead.
+        """
+        subscriber = self._subscriber(callback)
+        if self.mode == CallbackMode.INLINE:
+            self._run_inline(subscriber, args, kwargs)
+            return
+        queue = subscriber.queue
+        droppable = merge is None or key is None
+        if not droppable:
+            if (queued := queue.get(key)) is not None:
+                queue[key] = (merge(queued[0], args), kwargs, False)
+                return
+        elif self.overflow != OverflowPolicy.LATEST or key is None:
+            key = next(self._keys)
+        elif key in queue:
+            # The queued call has not run yet, it runs with the latest arguments in its place
+            queue[key] = (args, kwargs, droppable)
+            subscriber.dropped += 1
+            return
+        if len(queue) >= self._queue_size:
+            if self.overflow == OverflowPolicy.BLOCK:
+                self._full.add(subscriber)
+                self._room.clear()
+            elif (oldest := next((queued for queued, (*_, drop) in queue.items() if drop), None)) is not None:
+                del queue[oldest]
+                subscriber.dropped += 1
+        queue[key] = (args, kwargs, droppable)
+        if subscriber.task is None:
+            subscriber.task = asyncio.create_task(self._drain(subscriber))
+
+    def _run_inline(self, subscriber: _Subscriber, args: tuple, kwargs: dict[str, Any]) -> None:
+        start = time.perf_counter()
+        try:
+            result = subscriber.callback(*args, **kwargs)
+            if isawaitable(result):
+                task = asyncio.ensure_future(result)
+                self._tasks.add(task)
+                task.add_done_callback(functools.partial(self._inline_task_done, subscriber))
+        except Exception:
+            subscriber.errors += 1
+            _LOGGER.exception("Error in callback %s", subscriber.name)
+        finally:
+            self._record(subscriber, time.perf_counter() - start)
+
+    def _inline_task_done(self, subscriber: _Subscriber, task: asyncio.Future) -> None:
+        """Count and log an error raised by the awaitable an inline callback returned."""
+        self._tasks.discard(task)
+        if not task.cancelled() and (ex := task.exception()) is not None:
+            subscriber.errors += 1
+            _LOGGER.error("Error in callback %s", subscriber.name, exc_info=ex)
+
+    async def _drain(self, subscriber: _Subscriber) -> None:
+        """Run the queued calls of a subscriber in order until its queue is empty."""
+        loop = asyncio.get_running_loop()
+        try:
+            while subscriber.queue:
+                _, (args, kwargs, _) = subscriber.queue.popitem(last=False)
+                if subscriber in self._full and len(subscriber.queue) < self._queue_size:
+                    self._full.discard(subscriber)
+                    if not self._full:
+                        self._room.set()
+                start = time.perf_counter()
+                try:
+                    if self.mode == CallbackMode.THREAD and not asyncio.iscoroutinefunction(subscriber.callback):
+                        if self._executor is None:
+                            self._executor = ThreadPoolExecutor(self._threads, thread_name_prefix="nasa-callback")
+                        await loop.run_in_executor(
+                            self._executor, functools.partial(subscriber.callback, *args, **kwargs)
+                        )
+                    else:
+                        result = subscriber.callback(*args, **kwargs)
+                        if isawaitable(result):
+                            await result
+                except Exception:
+                    subscriber.errors += 1
+                    _LOGGER.exception("Error in callback %s", subscriber.name)
+                finally:
+                    self._record(subscriber, time.perf_counter() - start)
+        finally:
+            subscriber.task = None
+
+    @staticmethod
+    def _record(subscriber: _Subscriber, elapsed: float) -> None:
+        subscriber.calls += 1
+        subscriber.total_time += elapsed
+        if elapsed > subscriber.max_time:
+            subscriber.max_time = elapsed
+
+    @property
+    def blocked(self) -> bool:
+        """Return True if a queue is over its size with the block policy."""
+        return bool(self._full)
+
+    async def wait_for_room(self) -> None:
+        """Wait until every queue is back within its size, used by the receive path with the block policy."""
+        while self._full:
+            await self._room.wait()
+
+    def statistics(self) -> list[HandlerStatistics]:
+        """Return the calls and time spent of every callback."""
+        return [
+            HandlerStatistics(
+                name=subscriber.name,
+                calls=subscriber.calls,
+                errors=subscriber.errors,
+                dropped=subscriber.dropped,
+                queued=len(subscriber.queue),
+                total_time=subscriber.total_time,
+                max_time=subscriber.max_time,
+            )
+            for subscriber in self._subscribers.values()
+        ]
+
+    async def close(self) -> None:
+        """Drop queued calls, stop the queue tasks, the awaitables of inline callbacks and the thread pool."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        for subscriber in self._subscribers.values():
+            subscriber.queue.clear()
+            if subscriber.task is not None:
+                subscriber.task.cancel()
+                tasks.append(subscriber.task)
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._full.clear()
+        self._room.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -10,7 +10,9 @@ from .helpers import Address
 from .protocol.enum import DataType, AddressClass
 from .protocol.parser import NasaPacketParser
 from .nasa_client import NasaClient
+from .polling import PollScheduler
 from .protocol.factory import SendMessage
+from .store import ValueSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,7 +38,15 @@ class SamsungNasa:
         )
         self.parser = NasaPacketParser(_new_device_handler=self._new_device_handler, config=self.config)
         self.parser.set_pending_read_handler(self.client._mark_read_received)
+        self.parser.set_reply_handler(self.client._handle_reply)
         self.client.set_receive_event_handler(self.parser.parse_packet)
+        self.poll_scheduler = PollScheduler(
+            self.parser,
+            self.client.nasa_read,
+            jitter=self.config.poll_jitter,
+            pack_ahead=self.config.poll_pack_ahead,
+            outstanding=self.client.outstanding_reads,
+        )
         self.new_device_event_handler = new_device_event_handler
         if self.config.device_addresses is not None:
             for address in self.config.device_addresses:
@@ -73,6 +83,7 @@ class SamsungNasa:
     async def start(self):
         """Start the NASA protocol."""
         await self.client.connect()
+        self.poll_scheduler.start()
         # if self.client.is_connected:
         # Perform a "poke"
         # await self.client.send_message(
@@ -81,9 +92,17 @@ class SamsungNasa:
         #     messages=[SendMessage(0x4242, bytes.fromhex("FFFF"))],
         # )
 
+    def value_snapshot(self) -> dict[str, ValueSnapshot]:
+        """Return a snapshot of the value store of every device by address, needs value_store in the config."""
+        return {
+            address: device.values.snapshot() for address, device in self.devices.items() if device.values is not None
+        }
+
     async def stop(self):
         """Stop the NASA protocol."""
+        await self.poll_scheduler.stop()
         await self.client.disconnect()
+        await self.parser.dispatcher.close()
 
     async def start_autodiscovery(self):
         """Start NASA autodiscovery."""
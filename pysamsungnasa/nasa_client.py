@@ -1,16 +1,26 @@
 """TCP Modbus client."""
 
 import binascii
+import dataclasses
 import logging
 import asyncio
-import struct
 
 from asyncio import iscoroutinefunction
+from collections.abc import Hashable, Mapping
 
+from .coalescing import MAX_MESSAGES_PER_PACKET, ReadCoalescer
+from .correlation import RequestTracker, Response
+from .pending import PendingKey, PendingRead, PendingRequests, PendingWrite
+from .retry import RetryTimers
 from .device import NasaDevice
+from .protocol.frame import Frame, FrameDecoder, FrameEncoder, FramingStatistics
+from .protocol.pacing import TxPacer
+from .protocol.trace import RX, TX, FrameTrace
+from .protocol.txqueue import TxPriority, TxQueue
 from .protocol.enum import DataType
-from .protocol.factory import build_message
+from .protocol.encoder import FrameTemplate, FrameTemplateCache, OutgoingPacket, address_bytes
 from .protocol.factory.types import SendMessage
+from .protocol.packet import MessageEvent, PacketHeader
 from .serial_client import SerialClient
 from .config import NasaConfig
 from .helpers import bin2hex, hex2bin
@@ -25,14 +35,11 @@ class NasaClient:
     _queue_processor_task: asyncio.Task | None = None
     _writer_task: asyncio.Task | None = None
     _retry_manager_task: asyncio.Task | None = None
-    _tx_queue: asyncio.Queue[bytes] | None = None
-    _rx_queue: asyncio.Queue[bytes] | None = None
-    _rx_buffer = b""
+    _tx_queue: TxQueue | None = None
+    _rx_queue: asyncio.Queue[Frame] | None = None
     _last_rx_time: float = 0.0
     _packet_number_counter: int = 0
-    _pending_reads: dict = {}  # Track pending read requests for retry logic
     _queued_reads: dict = {}  # Queue of read requests per destination waiting to be sent
-    _pending_writes: dict = {}  # Track pending write requests for retry logic
 
     def __init__(
         self,
@@ -55,6 +62,26 @@ class NasaClient:
         self._disconnect_event_handler = disconnect_event_handler
         self._config = config
         self._address = config.address
+        self._address_bytes = address_bytes(self._address)
+        self._decoder = FrameDecoder(
+            max_buffer_size=config.max_buffer_size, log_buffer_messages=config.log_buffer_messages
+        )
+        self._frame_templates = (
+            FrameTemplateCache(config.frame_template_cache_size) if config.frame_template_cache_size > 0 else None
+        )
+        self._trace = FrameTrace(config.trace_buffer_size) if config.trace_buffer_size > 0 else None
+        self._requests = RequestTracker(str(self._address))
+        self._pending_reads: PendingRequests[PendingRead] = PendingRequests()  # Tracked for retry logic
+        self._pending_writes: PendingRequests[PendingWrite] = PendingRequests()
+        self._retry_timers = RetryTimers()
+        self._read_coalescer = ReadCoalescer(config.read_coalesce_window, self._send_read)
+        self._queued_read_tasks: set[asyncio.Task] = set()  # Queued reads being sent, see _mark_read_received
+        self._pacer = TxPacer(
+            baudrate=config.client_baudrate,
+            idle_gap=config.tx_idle_gap,
+            rate=config.tx_rate_limit,
+            burst=config.tx_burst,
+        )
         self._last_rx_time = asyncio.get_running_loop().time()
 
     @property
@@ -81,6 +108,10 @@ class NasaClient:
         await self._end_writer_session()
         await self._end_read_queue_session()
         await self._end_retry_manager_session()
+        self._read_coalescer.close()
+        for task in list(self._queued_read_tasks):
+            task.cancel()
+        self._requests.fail_all(ConnectionError("Connection to the NASA bus was lost"))
 
         if self._disconnect_event_handler:
             try:
@@ -123,101 +154,54 @@ class NasaClient:
         """Disconnect from the server."""
         await self._client.disconnect()
 
-    async def _read_buffer_handler(self, message: bytes):
-        """Read buffer handler."""
-        self._rx_buffer += message
-        if len(self._rx_buffer) > self._config.max_buffer_size:
-            _LOGGER.error(
-                "Max buffer sized reached %s/%s",
-                len(self._rx_buffer),
-                self._config.max_buffer_size,
-            )
-            self._rx_buffer = b""
-            return
-        while True:
-            if not self._rx_buffer:
-                break
-
-            stx_index = self._rx_buffer.find(b"\x32")
-
-            if stx_index == -1:
-                if self._config.log_buffer_messages:
-                    _LOGGER.debug("No STX found, clearing buffer")
-                self._rx_buffer = b""
-                break
-
-            if stx_index > 0:
-                if self._config.log_buffer_messages:
-                    _LOGGER.debug("Skipping %d bytes of garbage", stx_index)
-                self._rx_buffer = self._rx_buffer[stx_index:]
-
-            if len(self._rx_buffer) < 3:
-                if self._config.log_buffer_messages:
-                    _LOGGER.debug("Not enough data for header, waiting for more.")
-                break
-
-            expected_packet_len = 0
-            try:
-                _, packet_len_val = struct.unpack_from(">BH", self._rx_buffer)
-
-                if packet_len_val > self._config.max_buffer_size:
-                    _LOGGER.debug(
-                        "Parsed packet length %d exceeds max size %d. Assuming parse error.",
-                        packet_len_val,
-                        self._config.max_buffer_size,
-                    )
-                    self._rx_buffer = self._rx_buffer[1:]
-                    continue
-
-                expected_packet_len = packet_len_val + 2  # + STX and ETX
-
-                if len(self._rx_buffer) < expected_packet_len:
-                    # If the expected packet is suspiciously large, check if there's
-                    # another STX marker nearby (indicating a malformed packet)
-                    if expected_packet_len > 2000 and len(self._rx_buffer) > 500:
-                        # Look for the next STX within a reasonable distance
-                        next_stx = self._rx_buffer.find(b"\x32", 1)  # Start searching after current STX
-                        if next_stx > 0 and next_stx < 300:
-                            # Found another STX marker nearby - current packet is likely malformed
-                            self._rx_buffer = self._rx_buffer[next_stx:]
-                            continue
-
-                    if self._config.log_buffer_messages:
-                        _LOGGER.debug(
-                            "Incomplete packet. Have %d, need %d. Waiting for more data.",
-                            len(self._rx_buffer),
-                            expected_packet_len,
-                        )
-                    break
+    @property
+    def rx_statistics(self) -> FramingStatistics:
+        """Return RX framing counters."""
+        return self._decoder.statistics
 
-                packet = self._rx_buffer[:expected_packet_len]
+    @property
+    def tx_queue_depths(self) -> dict[TxPriority, int]:
+        """Return the number of frames waiting to be sent in each priority class."""
+        if self._tx_queue is None:
+            return dict.fromkeys(TxPriority, 0)
+        return self._tx_queue.depths
 
-                if packet[-1] != 0x34:
-                    if self._config.log_buffer_messages:
-                        _LOGGER.debug("Invalid ETX. Got 0x%02x, expected 0x34.", packet[-1])
-                    self._rx_buffer = self._rx_buffer[1:]
-                    continue
+    @property
+    def pending_reads(self) -> Mapping[PendingKey, PendingRead]:
+        """Return a read-only view of the reads waiting for a response, by destination and message IDs."""
+        return self._pending_reads.records
 
-                if self._rx_queue:
-                    await self._rx_queue.put(packet)
-                    if self._config.log_buffer_messages:
-                        _LOGGER.debug(
-                            "Received complete packet and queued for processing (pending=%s): %s",
-                            self._rx_queue.qsize(),
-                            bin2hex(packet),
-                        )
+    @property
+    def pending_writes(self) -> Mapping[PendingKey, PendingWrite]:
+        """Return a read-only view of the writes waiting for an ACK, by destination and message IDs."""
+        return self._pending_writes.records
 
-                self._rx_buffer = self._rx_buffer[expected_packet_len:]
+    @property
+    def trace(self) -> FrameTrace | None:
+        """Return the trace of recent frames, None unless trace_buffer_size is set in the config."""
+        return self._trace
 
-            except struct.error:
-                _LOGGER.debug("Struct unpack failed. Likely not a valid packet. Discarding STX and continuing.")
-                self._rx_buffer = self._rx_buffer[1:]
+    async def _read_buffer_handler(self, message: bytes):
+        """Read buffer handler."""
+        self._last_rx_time = asyncio.get_running_loop().time()
+        self._pacer.on_rx(self._last_rx_time)
+        self._decoder.log_buffer_messages = self._config.log_buffer_messages
+        for frame in self._decoder.feed(message):
+            if self._trace is not None:
+                self._trace.record(RX, frame.raw)
+            if self._rx_queue is None:
                 continue
+            try:
+                self._rx_queue.put_nowait(frame)
             except asyncio.QueueFull:
                 _LOGGER.warning("RX queue is full. Packet dropped.")
-                if expected_packet_len > 0:
-                    self._rx_buffer = self._rx_buffer[expected_packet_len:]
                 continue
+            if self._config.log_buffer_messages:
+                _LOGGER.debug(
+                    "Received complete packet and queued for processing (pending=%s): %s",
+                    self._rx_queue.qsize(),
+                    bin2hex(frame.raw),
+                )
 
     async def _start_writer_session(self) -> bool:
         """Start writer task from queue."""
@@ -227,7 +211,7 @@ class NasaClient:
         if not self.is_connected:
             _LOGGER.error("Cannot start writer session: not connected or no socket writer.")
             return False
-        self._tx_queue = asyncio.Queue()
+        self._tx_queue = TxQueue(self._config.tx_max_queue_wait)
         self._writer_task = asyncio.create_task(self._writer())
         _LOGGER.debug("Writer session started.")
         return True
@@ -303,8 +287,8 @@ class NasaClient:
         if self._retry_manager_task and not self._retry_manager_task.done():
             _LOGGER.error("Retry manager task already running.")
             return True
-        if not self._config.enable_read_retries:
-            _LOGGER.debug("Read retries are disabled in config.")
+        if not self._config.enable_read_retries and not self._config.enable_write_retries:
+            _LOGGER.debug("Retries are disabled in config.")
             return False
         self._retry_manager_task = asyncio.create_task(self._retry_manager())
         _LOGGER.debug("Retry manager session started.")
@@ -328,6 +312,8 @@ class NasaClient:
                         e,
                     )
             _LOGGER.debug("Retry manager session ended.")
+        # Pending requests keep their state, their timers are set again when the next session starts
+        self._retry_timers.cancel_all()
         return task_was_present
 
     async def _read_queue_processor(self):
@@ -342,53 +328,26 @@ class NasaClient:
                 if self._rx_queue:
                     try:
                         # Use a timeout to allow the loop to check _connection_status
-                        packet = await asyncio.wait_for(self._rx_queue.get(), timeout=1.0)
+                        frame = await asyncio.wait_for(self._rx_queue.get(), timeout=1.0)
                         self._rx_queue.task_done()
                     except asyncio.TimeoutError:
                         if not self.is_connected and self._rx_queue.empty():
                             break  # Exit if disconnected and queue is now empty
                         continue  # Loop again to check _connection_status or get next item
 
-                    # Validate packet structure
-                    if len(packet) < 6 or packet[0] != 0x32 or packet[-1] != 0x34:
-                        _LOGGER.error(
-                            "QueueProcessor: Invalid packet structure: %s",
-                            bin2hex(packet),
-                        )
-                        continue
                     try:
-                        packet_crc_from_msg = struct.unpack_from(">H", packet, -3)[0]
-                        # Extract message data (from after STX+Size to before CRC+ETX)
-                        # Packet: [STX] [Size-H] [Size-L] [Data...] [CRC-H] [CRC-L] [ETX]
-                        # Index:  [0]   [1]      [2]      [3...]    [-3]    [-2]    [-1]
-                        packet_data = packet[3:-3]
-                        packet_crc = binascii.crc_hqx(packet_data, 0)
-
-                        if packet_crc != packet_crc_from_msg:
-                            _LOGGER.error(
-                                "QueueProcessor: Invalid CRC expected %s got %s",
-                                hex(packet_crc),
-                                hex(packet_crc_from_msg),
-                            )
-                            continue
-
+                        # Frames have already passed the CRC check in the decoder.
                         if self._rx_event_handler and callable(self._rx_event_handler):
                             if iscoroutinefunction(self._rx_event_handler):
-                                await self._rx_event_handler(packet_data)
+                                await self._rx_event_handler(frame)
                             else:
-                                self._rx_event_handler(packet_data)
+                                self._rx_event_handler(frame)
 
-                    except struct.error as e:
-                        _LOGGER.error(
-                            "QueueProcessor: Struct unpack error during packet processing: %s. Packet: %s.",
-                            e,
-                            bin2hex(packet),
-                        )
                     except Exception as ex:
                         _LOGGER.exception(
                             "QueueProcessor: Exception while processing a packet: %s. Packet: %s.",
                             ex,
-                            bin2hex(packet),
+                            bin2hex(frame.raw),
                         )
             except asyncio.CancelledError:
                 _LOGGER.info("Queue processor task was cancelled.")
@@ -417,10 +376,14 @@ class NasaClient:
                         # Re-queue or discard? For now, discard and log.
                         break  # Exit writer as connection is likely lost
 
-                    _LOGGER.debug("Writer: Writing data: %s", bin2hex(cmd))
+                    if _LOGGER.isEnabledFor(logging.DEBUG):
+                        _LOGGER.debug("Writer: Writing data: %s", bin2hex(cmd))
+                    await self._wait_for_bus()
+                    if self._trace is not None:
+                        self._trace.record(TX, cmd)
+                    self._pacer.on_tx(asyncio.get_running_loop().time(), len(cmd))
                     self._client.writer.write(cmd)
                     await self._client.writer.drain()  # Crucial for flow control
-                    await asyncio.sleep(0.05)  # delay 50ms to prevent overloading the protocol.
                     if self._tx_event_handler:
                         try:
                             self._tx_event_handler(cmd)
@@ -441,11 +404,36 @@ class NasaClient:
                 await self._handle_disconnection(ex)  # Treat as critical failure
                 break
 
+    async def _wait_for_bus(self) -> None:
+        """Wait until the pacer allows the next frame.
+
+        The rate limit is always respected. Waiting for an idle bus is given up after
+        tx_max_idle_wait, as the bus may get busy again every time it is checked.
+        """
+        loop = asyncio.get_running_loop()
+        if (delay := self._pacer.rate_delay(loop.time())) > 0:
+            await asyncio.sleep(delay)
+        give_up = loop.time() + self._config.tx_max_idle_wait
+        while (delay := self._pacer.idle_delay(loop.time())) > 0:
+            remaining = give_up - loop.time()
+            if remaining <= 0:
+                _LOGGER.debug("Writer: Bus has not been idle for %ss, sending anyway.", self._config.tx_max_idle_wait)
+                return
+            await asyncio.sleep(min(delay, remaining))
+
     async def send_command(
         self,
-        message: list[str],
+        message: list[OutgoingPacket | FrameTemplate | str],
+        priority: TxPriority = TxPriority.INTERACTIVE,
+        key: Hashable | None = None,
     ) -> int | bytes | None:
-        """Send a command to the NASA device."""
+        """Send a command to the NASA device.
+
+        Each command is an OutgoingPacket, a FrameTemplate or packet data as hex
+        with a {CUR_PACK_NUM} placeholder, as returned by build_message. Frames are
+        queued in the priority class given, a key drops queued frames with the same
+        key in the same or a lower class.
+        """
         if not self.is_connected or self._tx_queue is None:
             return None
 
@@ -456,18 +444,15 @@ class NasaClient:
         for msg in message:
             self._packet_number_counter = (self._packet_number_counter + 1) % 256
             last_packet_number = self._packet_number_counter
-            current_packet_num_hex = f"{self._packet_number_counter:02x}"
-            msg = msg.format(CUR_PACK_NUM=current_packet_num_hex)
 
             try:
-                data_bytes = hex2bin(msg)
-                crc_val = binascii.crc_hqx(data_bytes, 0)
-                crc_hex = f"{crc_val:04x}"
-                packet_size_hex = f"{(len(data_bytes) + 4):04x}"
-                full_packet_hex = f"32{packet_size_hex}{msg}{crc_hex}34"  # STX, Size, Data, CRC, ETX
-                data = hex2bin(full_packet_hex)
-                await self._tx_queue.put(data)
-                _LOGGER.debug("Command enqueued (no reply): %s", bin2hex(data))
+                if isinstance(msg, (OutgoingPacket, FrameTemplate)):
+                    data = msg.encode(self._packet_number_counter)
+                else:
+                    data = FrameEncoder.encode(hex2bin(msg.format(CUR_PACK_NUM=f"{self._packet_number_counter:02x}")))
+                await self._tx_queue.put(data, priority, key)
+                if _LOGGER.isEnabledFor(logging.DEBUG):
+                    _LOGGER.debug("Command enqueued (no reply): %s", bin2hex(data))
             except (binascii.Error, ValueError) as e:
                 self._packet_number_counter = (self._packet_number_counter - 1) % 256
                 _LOGGER.error("Error encoding command %s: %s", msg, e)
@@ -488,8 +473,14 @@ class NasaClient:
         destination: NasaDevice | str,
         request_type: DataType = DataType.REQUEST,
         messages: list[SendMessage] | None = None,
+        priority: TxPriority | None = None,
     ) -> int | bytes | None:
-        """Send a message to the device using the client."""
+        """Send a message to the device using the client.
+
+        Reads are sent as polls and everything else as interactive unless a priority
+        is given. The frame supersedes a queued frame with the same destination, type
+        and message IDs.
+        """
         if not self.is_connected:
             _LOGGER.error("Cannot send message, client is not connected.")
             return
@@ -503,81 +494,121 @@ class NasaClient:
         if messages is None:
             raise ValueError("At least one message is required.")
         try:
-            packet_number = await self.send_command(
-                [
-                    build_message(
-                        source=str(self._config.address),
-                        destination=destination_address,
-                        data_type=request_type,
-                        messages=messages,
-                    )
-                ],
-            )
+            packet = OutgoingPacket.create(self._address_bytes, destination_address, request_type, messages)
+            if priority is None:
+                priority = TxPriority.POLL if request_type == DataType.READ else TxPriority.INTERACTIVE
+            key = (packet.destination, request_type, tuple(message.MESSAGE_ID for message in packet.messages))
+            if request_type == DataType.READ and self._frame_templates is not None:
+                # Polls repeat the same READ packets, only the packet number and CRC change
+                packet_number = await self.send_command([self._frame_templates.template(packet)], priority, key)
+            else:
+                packet_number = await self.send_command([packet], priority, key)
 
             # Track requests for retry logic if enabled.
-            # If an entry already exists (e.g. resend from retry manager),
+            # If the request is already tracked (e.g. resend from retry manager),
             # preserve attempt/backoff state instead of resetting to zero.
             if packet_number is not None:
                 current_time = asyncio.get_running_loop().time()
+                message_ids = tuple(msg.MESSAGE_ID for msg in messages)
                 if request_type in (DataType.WRITE, DataType.REQUEST) and self._config.enable_write_retries:
-                    # Track all messages in the packet together using packet_number as key
-                    message_ids = [msg.MESSAGE_ID for msg in messages]
-                    write_key = f"{destination_address}_{packet_number}"
-                    existing_write = self._pending_writes.get(write_key)
+                    write = PendingWrite(
+                        destination=destination_address,
+                        message_ids=message_ids,
+                        packet_number=packet_number,
+                        last_attempt_time=current_time,
+                        next_retry_time=current_time + self._config.write_retry_interval,
+                        retry_interval=self._config.write_retry_interval,
+                        messages=tuple(messages),  # Full messages are kept for retries
+                        data_type=request_type,
+                    )
+                    existing_write = self._pending_writes.get(write.key)
                     if existing_write is None:
-                        self._pending_writes[write_key] = {
-                            "destination": destination_address,
-                            "message_ids": message_ids,
-                            "messages": messages,  # Store full SendMessage objects for retry
-                            "data_type": request_type,
-                            "packet_number": packet_number,
-                            "attempts": 0,
-                            "last_attempt_time": current_time,
-                            "next_retry_time": current_time + self._config.write_retry_interval,
-                            "retry_interval": self._config.write_retry_interval,
-                        }
+                        self._retry_timers.schedule((DataType.WRITE, write.key), write.next_retry_time)
                     else:
-                        # Keep retry counters/backoff, only refresh payload metadata and packet number.
-                        existing_write["destination"] = destination_address
-                        existing_write["message_ids"] = message_ids
-                        existing_write["messages"] = messages
-                        existing_write["data_type"] = request_type
-                        existing_write["packet_number"] = packet_number
-                        existing_write["last_attempt_time"] = current_time
+                        # Keep retry counters/backoff, only refresh payload and packet number.
+                        write = dataclasses.replace(
+                            existing_write,
+                            message_ids=message_ids,
+                            messages=write.messages,
+                            data_type=request_type,
+                            packet_number=packet_number,
+                            last_attempt_time=current_time,
+                        )
+                    self._pending_writes.add(write)
                 elif request_type == DataType.READ and self._config.enable_read_retries:
-                    message_ids = [msg.MESSAGE_ID for msg in messages]
-                    read_key = f"{destination_address}_{tuple(sorted(message_ids))}"
-                    existing_read = self._pending_reads.get(read_key)
+                    read = PendingRead(
+                        destination=destination_address,
+                        message_ids=message_ids,
+                        packet_number=packet_number,
+                        last_attempt_time=current_time,
+                        next_retry_time=current_time + self._config.read_retry_interval,
+                        retry_interval=self._config.read_retry_interval,
+                    )
+                    existing_read = self._pending_reads.get(read.key)
                     if existing_read is None:
-                        self._pending_reads[read_key] = {
-                            "destination": destination_address,
-                            "messages": message_ids,
-                            "packet_number": packet_number,
-                            "attempts": 0,
-                            "last_attempt_time": current_time,
-                            "next_retry_time": current_time + self._config.read_retry_interval,
-                            "retry_interval": self._config.read_retry_interval,
-                        }
+                        self._retry_timers.schedule((DataType.READ, read.key), read.next_retry_time)
                     else:
                         # Keep retry counters/backoff, only refresh packet number and timing metadata.
-                        existing_read["destination"] = destination_address
-                        existing_read["messages"] = message_ids
-                        existing_read["packet_number"] = packet_number
-                        existing_read["last_attempt_time"] = current_time
+                        read = dataclasses.replace(
+                            existing_read,
+                            message_ids=message_ids,
+                            packet_number=packet_number,
+                            last_attempt_time=current_time,
+                        )
+                    self._pending_reads.add(read)
 
             return packet_number
         except Exception as e:
             _LOGGER.exception("Error sending message to device %s: %s", destination_address, e)
 
+    async def request(
+        self,
+        destination: NasaDevice | str,
+        request_type: DataType,
+        messages: list[SendMessage],
+        timeout: float | None = None,
+    ) -> Response:
+        """Send a message and wait for the RESPONSE or ACK to it.
+
+        Unlike nasa_read, the request is sent on its own rather than merged with other
+        reads. Raises NackError if the device answers with a NACK, TimeoutError if no
+        reply arrives within timeout (request_timeout by default) and ConnectionError
+        if the message could not be sent.
+        """
+        destination_address = destination if isinstance(destination, str) else destination.address
+        packet_number = await self.send_message(destination_address, request_type, messages)
+        if not isinstance(packet_number, int):
+            raise ConnectionError(f"Could not send request to {destination_address}")
+        reply = self._requests.track(
+            destination_address,
+            packet_number,
+            [message.MESSAGE_ID for message in messages],
+            self._config.request_timeout if timeout is None else timeout,
+        )
+        return await reply
+
+    def _handle_reply(self, header: PacketHeader, events: list[MessageEvent]) -> None:
+        """Resolve the request a RESPONSE, ACK or NACK answers (reply handler for the parser)."""
+        self._requests.handle_reply(header, events)
+
     async def nasa_read(self, msgs: list[int], destination: NasaDevice | str = "B0FF20") -> int | bytes | None:
-        """Send read requests to a device to read data."""
+        """Send read requests to a device to read data.
+
+        Reads to the same destination requested within read_coalesce_window are merged
+        into packets of up to 10 message IDs. Returns the packet number of the packet
+        carrying the first message ID.
+        """
         dest_addr = destination if isinstance(destination, str) else destination.address
 
         # Check if there's already a pending read to this destination
         if self._config.enable_read_retries:
-            has_pending_read = any(read_info["destination"] == dest_addr for read_info in self._pending_reads.values())
-            if has_pending_read:
-                # Queue this read to be sent after the current one completes
+            if self._pending_reads.has_destination(dest_addr):
+                # Queue this read to be sent after the current one completes, message IDs already
+                # pending or queued are not queued again so the queue stays bounded
+                outstanding = self.outstanding_reads(dest_addr)
+                msgs = [msg for msg in dict.fromkeys(msgs) if msg not in outstanding]
+                if not msgs:
+                    return None
                 if dest_addr not in self._queued_reads:
                     self._queued_reads[dest_addr] = []
                 self._queued_reads[dest_addr].append(msgs)
@@ -589,10 +620,23 @@ class NasaClient:
                 )
                 return None
 
+        return await self._read_coalescer.read(dest_addr, msgs)
+
+    def outstanding_reads(self, destination: str) -> set[int]:
+        """Return the message IDs of destination that are pending, queued or waiting to be sent."""
+        outstanding = set(self._read_coalescer.pending(destination))
+        for read in self._pending_reads.for_destination(destination):
+            outstanding.update(read.message_ids)
+        for msgs in self._queued_reads.get(destination, ()):
+            outstanding.update(msgs)
+        return outstanding
+
+    async def _send_read(self, destination: str, message_ids: list[int]) -> int | None:
+        """Send one READ packet for the read coalescer."""
         return await self.send_message(
             destination=destination,
             request_type=DataType.READ,
-            messages=[SendMessage(MESSAGE_ID=imn, PAYLOAD=b"\x05\xa5\xa5\xa5") for imn in msgs],
+            messages=[SendMessage(MESSAGE_ID=imn, PAYLOAD=b"") for imn in message_ids],  # READ payloads are zeros
         )
 
     async def nasa_write(
@@ -607,37 +651,24 @@ class NasaClient:
             messages=[message],
         )
 
-    def _clear_pending_write(self, destination: str, message_numbers: list[int]) -> list[str]:
+    def _clear_pending_write(self, destination: str, message_numbers: list[int]) -> list[PendingKey]:
         """Clear pending write requests for a destination when an ACK is received.
 
+        A write is cleared when all of its message IDs are in the ACK.
+
         Args:
             destination: The destination address
-            message_numbers: List of message IDs in the ACK packet. If empty, clears all pending writes for the destination.
+            message_numbers: List of message IDs in the ACK packet. If empty, clears all pending
+                writes for the destination.
 
         Returns the list of write keys that were cleared.
         """
         cleared_keys = []
-        keys_to_delete = []
-
-        for write_key, write_info in self._pending_writes.items():
-            if write_info["destination"] == destination:
-                # If message_numbers is provided and not empty, only clear writes if all messages in the packet are ACKed
-                # If message_numbers is empty, clear all pending writes for this destination (ACK without specific message IDs)
-                if message_numbers:
-                    # Check if all message IDs in this packet were acknowledged
-                    packet_message_ids = write_info.get("message_ids", [])
-                    if all(msg_id in message_numbers for msg_id in packet_message_ids):
-                        keys_to_delete.append(write_key)
-                        cleared_keys.append(write_key)
-                else:
-                    # Empty message_numbers means ACK for all messages from this destination
-                    keys_to_delete.append(write_key)
-                    cleared_keys.append(write_key)
-
-        for key in keys_to_delete:
-            del self._pending_writes[key]
-            _LOGGER.debug("Cleared pending write request for key %s", key)
-
+        for write in self._pending_writes.answered_by(destination, message_numbers):
+            self._pending_writes.pop(write.key)
+            self._retry_timers.cancel((DataType.WRITE, write.key))
+            cleared_keys.append(write.key)
+            _LOGGER.debug("Cleared pending write request for messages %s to %s", write.message_ids, destination)
         return cleared_keys
 
     async def _mark_write_received(self, destination: str, message_numbers: list[int]) -> None:
@@ -658,10 +689,10 @@ class NasaClient:
 
     def _clear_pending_read(self, destination: str, message_numbers: list[int]) -> bool:
         """Clear a pending read request when a response is received with matching message numbers."""
-        # Create a key from the sorted message numbers, same as when we track the request
-        read_key = f"{destination}_{tuple(sorted(message_numbers))}"
-        if read_key in self._pending_reads:
-            del self._pending_reads[read_key]
+        # The key is the destination and the sorted message numbers, same as when we track the request
+        read_key = (destination, tuple(sorted(message_numbers)))
+        if self._pending_reads.pop(read_key) is not None:
+            self._retry_timers.cancel((DataType.READ, read_key))
             _LOGGER.debug("Cleared pending read request for messages %s from %s", message_numbers, destination)
             return True
         return False
@@ -682,21 +713,31 @@ class NasaClient:
             if self._clear_pending_read(destination, message_numbers):
                 _LOGGER.debug("Read response received for messages %s from %s", message_numbers, destination)
 
-        # Process any queued reads for this destination
-        await self._process_queued_reads(destination)
+        # Send any queued reads for this destination in their own task, nasa_read waits for the
+        # coalesce window and this is called from the RX path
+        if self._queued_reads.get(destination):
+            task = asyncio.create_task(self._process_queued_reads(destination))
+            self._queued_read_tasks.add(task)
+            task.add_done_callback(self._queued_read_tasks.discard)
 
     async def _process_queued_reads(self, destination: str) -> None:
-        """Process queued reads for a destination after a response is received."""
-        if destination not in self._queued_reads or not self._queued_reads[destination]:
+        """Process queued reads for a destination after a response is received.
+
+        Queued reads are merged into one packet of up to 10 message IDs.
+        """
+        queue = self._queued_reads.get(destination)
+        if not queue:
             return
 
-        # Get the next queued read
-        queued_msgs = self._queued_reads[destination].pop(0)
+        queued_msgs = list(queue.pop(0))
+        while queue and len(set(queued_msgs).union(queue[0])) <= MAX_MESSAGES_PER_PACKET:
+            queued_msgs.extend(queue.pop(0))
+        queued_msgs = list(dict.fromkeys(queued_msgs))
         _LOGGER.debug(
             "Processing queued read for messages %s to %s (remaining in queue: %d)",
             queued_msgs,
             destination,
-            len(self._queued_reads[destination]),
+            len(queue),
         )
 
         # Send the queued read
@@ -706,123 +747,27 @@ class NasaClient:
             _LOGGER.error("Error processing queued read: %s", e)
 
     async def _retry_manager(self):
-        """Manage retry logic for pending read and write requests."""
+        """Retry pending read and write requests as their timers fall due.
+
+        Each pending request has its own timer, so a retry is sent when it is due
+        and the manager waits without doing anything while none is.
+        """
         _LOGGER.debug("Retry manager task started.")
+        # Requests tracked while no session was running get their timers now
+        for read in self._pending_reads:
+            if (DataType.READ, read.key) not in self._retry_timers:
+                self._retry_timers.schedule((DataType.READ, read.key), read.next_retry_time)
+        for write in self._pending_writes:
+            if (DataType.WRITE, write.key) not in self._retry_timers:
+                self._retry_timers.schedule((DataType.WRITE, write.key), write.next_retry_time)
+
         while self.is_connected:
             try:
-                await asyncio.sleep(1.0)  # Check every second
-
-                current_time = asyncio.get_running_loop().time()
-
-                # Handle read retries
-                if self._config.enable_read_retries and self._pending_reads:
-                    reads_to_retry = []
-                    reads_to_remove = []
-                    abandoned_destinations = set()
-
-                    # Identify reads that need to be retried
-                    for read_key, read_info in list(self._pending_reads.items()):
-                        if current_time >= read_info["next_retry_time"]:
-                            if read_info["attempts"] < self._config.read_retry_max_attempts:
-                                reads_to_retry.append(read_info)
-                            else:
-                                # Max retries exceeded
-                                _LOGGER.warning(
-                                    "Abandoning read request %s to %s after %d attempts",
-                                    read_info["packet_number"],
-                                    read_info["destination"],
-                                    read_info["attempts"],
-                                )
-                                reads_to_remove.append(read_key)
-                                abandoned_destinations.add(read_info["destination"])
-
-                    # Remove reads that have exceeded max attempts
-                    for read_key in reads_to_remove:
-                        del self._pending_reads[read_key]
-
-                    # Process queued reads for abandoned destinations
-                    for destination in abandoned_destinations:
-                        await self._process_queued_reads(destination)
-
-                    # Retry the reads
-                    for read_info in reads_to_retry:
-                        read_info["attempts"] += 1
-                        read_info["last_attempt_time"] = current_time
-                        read_info["retry_interval"] *= self._config.read_retry_backoff_factor
-                        read_info["next_retry_time"] = current_time + read_info["retry_interval"]
-
-                        _LOGGER.debug(
-                            "Retrying read request to %s (attempt %d/%d, interval=%.1fs)",
-                            read_info["destination"],
-                            read_info["attempts"],
-                            self._config.read_retry_max_attempts,
-                            read_info["retry_interval"],
-                        )
-
-                        # Resend the read request
-                        try:
-                            await self.send_message(
-                                destination=read_info["destination"],
-                                request_type=DataType.READ,
-                                messages=[
-                                    SendMessage(MESSAGE_ID=msg_id, PAYLOAD=b"\x05\xa5\xa5\xa5")
-                                    for msg_id in read_info["messages"]
-                                ],
-                            )
-                        except Exception as e:
-                            _LOGGER.error("Error retrying read request: %s", e)
-
-                # Handle write retries
-                if self._config.enable_write_retries and self._pending_writes:
-                    writes_to_retry = []
-                    writes_to_remove = []
-
-                    # Identify writes that need to be retried
-                    for write_key, write_info in list(self._pending_writes.items()):
-                        if current_time >= write_info["next_retry_time"]:
-                            if write_info["attempts"] < self._config.write_retry_max_attempts:
-                                writes_to_retry.append((write_key, write_info))
-                            else:
-                                # Max retries exceeded
-                                _LOGGER.warning(
-                                    "Abandoning write request %s (message %s) to %s after %d attempts",
-                                    write_info["packet_number"],
-                                    write_info["message_id"],
-                                    write_info["destination"],
-                                    write_info["attempts"],
-                                )
-                                writes_to_remove.append(write_key)
-
-                    # Remove writes that have exceeded max attempts
-                    for write_key in writes_to_remove:
-                        del self._pending_writes[write_key]
-
-                    # Retry the writes
-                    for write_key, write_info in writes_to_retry:
-                        write_info["attempts"] += 1
-                        write_info["last_attempt_time"] = current_time
-                        write_info["retry_interval"] *= self._config.write_retry_backoff_factor
-                        write_info["next_retry_time"] = current_time + write_info["retry_interval"]
-
-                        _LOGGER.debug(
-                            "Retrying write request (messages %s) to %s (attempt %d/%d, interval=%.1fs)",
-                            write_info["message_ids"],
-                            write_info["destination"],
-                            write_info["attempts"],
-                            self._config.write_retry_max_attempts,
-                            write_info["retry_interval"],
-                        )
-
-                        # Resend all messages in the packet together
-                        try:
-                            await self.send_message(
-                                destination=write_info["destination"],
-                                request_type=write_info["data_type"],
-                                messages=write_info["messages"],
-                            )
-                        except Exception as e:
-                            _LOGGER.error("Error retrying write request: %s", e)
-
+                request_type, key = await self._retry_timers.next_due()
+                if request_type == DataType.READ:
+                    await self._retry_read(key)
+                else:
+                    await self._retry_write(key)
             except asyncio.CancelledError:
                 _LOGGER.info("Retry manager task was cancelled.")
                 break
@@ -830,3 +775,98 @@ class NasaClient:
                 _LOGGER.exception("Error in retry manager: %s", e)
 
         _LOGGER.debug("Retry manager task finished.")
+
+    async def _retry_read(self, read_key: PendingKey) -> None:
+        """Resend a pending read whose timer is due, or abandon it after read_retry_max_attempts."""
+        read = self._pending_reads.get(read_key)
+        if read is None or not self._config.enable_read_retries:
+            return
+        if read.attempts >= self._config.read_retry_max_attempts:
+            _LOGGER.warning(
+                "Abandoning read request %s to %s after %d attempts",
+                read.packet_number,
+                read.destination,
+                read.attempts,
+            )
+            self._pending_reads.pop(read_key)
+            await self._process_queued_reads(read.destination)
+            return
+
+        current_time = asyncio.get_running_loop().time()
+        retry_interval = read.retry_interval * self._config.read_retry_backoff_factor
+        read = dataclasses.replace(
+            read,
+            attempts=read.attempts + 1,
+            last_attempt_time=current_time,
+            retry_interval=retry_interval,
+            next_retry_time=current_time + retry_interval,
+        )
+        self._pending_reads.add(read)
+        self._retry_timers.schedule((DataType.READ, read_key), read.next_retry_time)
+
+        _LOGGER.debug(
+            "Retrying read request to %s (attempt %d/%d, interval=%.1fs)",
+            read.destination,
+            read.attempts,
+            self._config.read_retry_max_attempts,
+            read.retry_interval,
+        )
+
+        # Resend the read request
+        try:
+            await self.send_message(
+                destination=read.destination,
+                request_type=DataType.READ,
+                messages=[SendMessage(MESSAGE_ID=msg_id, PAYLOAD=b"") for msg_id in read.message_ids],
+                priority=TxPriority.RETRY,
+            )
+        except Exception as e:
+            _LOGGER.error("Error retrying read request: %s", e)
+
+    async def _retry_write(self, write_key: PendingKey) -> None:
+        """Resend a pending write whose timer is due, or abandon it after write_retry_max_attempts."""
+        write = self._pending_writes.get(write_key)
+        if write is None or not self._config.enable_write_retries:
+            return
+        if write.attempts >= self._config.write_retry_max_attempts:
+            _LOGGER.warning(
+                "Abandoning write request %s (messages %s) to %s after %d attempts",
+                write.packet_number,
+                write.message_ids,
+                write.destination,
+                write.attempts,
+            )
+            self._pending_writes.pop(write_key)
+            return
+
+        current_time = asyncio.get_running_loop().time()
+        retry_interval = write.retry_interval * self._config.write_retry_backoff_factor
+        write = dataclasses.replace(
+            write,
+            attempts=write.attempts + 1,
+            last_attempt_time=current_time,
+            retry_interval=retry_interval,
+            next_retry_time=current_time + retry_interval,
+        )
+        self._pending_writes.add(write)
+        self._retry_timers.schedule((DataType.WRITE, write_key), write.next_retry_time)
+
+        _LOGGER.debug(
+            "Retrying write request (messages %s) to %s (attempt %d/%d, interval=%.1fs)",
+            write.message_ids,
+            write.destination,
+            write.attempts,
+            self._config.write_retry_max_attempts,
+            write.retry_interval,
+        )
+
+        # Resend all messages in the packet together, the resend updates the same record
+        try:
+            await self.send_message(
+                destination=write.destination,
+                request_type=write.data_type,
+                messages=list(write.messages),
+                priority=TxPriority.RETRY,
+            )
+        except Exception as e:
+            _LOGGER.error("Error retrying write request: %s", e)
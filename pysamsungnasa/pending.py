@@ -0,0 +1,133 @@
+"""Requests sent to devices that are waiting for a response or ACK."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Generic, TypeVar
+
+from .protocol.enum import DataType
+from .protocol.factory.types import SendMessage
+
+PendingKey = tuple[str, tuple[int, ...]]
+
+
+@dataclass(frozen=True, slots=True)
+class PendingRequest:
+    """A request waiting for an answer, with the state used to retry it."""
+
+    destination: str
+    message_ids: tuple[int, ...]
+    packet_number: int
+    last_attempt_time: float
+    next_retry_time: float
+    retry_interval: float
+    attempts: int = 0
+
+    @property
+    def key(self) -> PendingKey:
+        """Return the destination and the sorted message IDs, a request sent again has the same key."""
+        return self.destination, tuple(sorted(self.message_ids))
+
+
+@dataclass(frozen=True, slots=True)
+class PendingRead(PendingRequest):
+    """A READ waiting for its RESPONSE."""
+
+
+@dataclass(frozen=True, slots=True)
+class PendingWrite(PendingRequest):
+    """A WRITE or REQUEST waiting for its ACK."""
+
+    messages: tuple[SendMessage, ...] = ()
+    data_type: DataType = DataType.WRITE
+
+
+_R = TypeVar("_R", bound=PendingRequest)
+
+
+class PendingRequests(Generic[_R]):
+    """Pending requests by key, indexed by destination and by destination and message ID.
+
+    Records are immutable, an update replaces the record with the same key. Adding,
+    finding and removing a request are dict accesses, so answering one does not
+    depend on how many requests other devices have pending.
+    """
+
+    def __init__(self) -> None:
+        """Init with no requests."""
+        self._records: dict[PendingKey, _R] = {}
+        self._by_destination: dict[str, dict[PendingKey, None]] = {}
+        self._by_message: dict[tuple[str, int], dict[PendingKey, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._records
+
+    def __iter__(self) -> Iterator[_R]:
+        return iter(list(self._records.values()))
+
+    @property
+    def records(self) -> Mapping[PendingKey, _R]:
+        """Return a read-only view of the requests by key."""
+        return MappingProxyType(self._records)
+
+    def get(self, key: PendingKey) -> _R | None:
+        """Return the request with key, None if there is none."""
+        return self._records.get(key)
+
+    def add(self, record: _R) -> None:
+        """Add a request or replace the one with the same key."""
+        key = record.key
+        if key not in self._records:
+            self._by_destination.setdefault(record.destination, {})[key] = None
+            for message_id in key[1]:
+                self._by_message.setdefault((record.destination, message_id), {})[key] = None
+        self._records[key] = record
+
+    def pop(self, key: PendingKey) -> _R | None:
+        """Remove and return the request with key, None if there is none."""
+        record = self._records.pop(key, None)
+        if record is None:
+            return None
+        destination, message_ids = key
+        keys = self._by_destination[destination]
+        del keys[key]
+        if not keys:
+            del self._by_destination[destination]
+        for message_id in message_ids:
+            keys = self._by_message[(destination, message_id)]
+            del keys[key]
+            if not keys:
+                del self._by_message[(destination, message_id)]
+        return record
+
+    def has_destination(self, destination: str) -> bool:
+        """Return True if a request to destination is pending."""
+        return destination in self._by_destination
+
+    def for_destination(self, destination: str) -> list[_R]:
+        """Return the requests pending for destination."""
+        return [self._records[key] for key in self._by_destination.get(destination, ())]
+
+    def answered_by(self, destination: str, message_ids: Iterable[int]) -> list[_R]:
+        """Return the requests to destination whose message IDs are all in message_ids.
+
+        An empty message_ids answers every request to destination.
+        """
+        message_ids = set(message_ids)
+        if not message_ids:
+            return self.for_destination(destination)
+        candidates: dict[PendingKey, None] = {}
+        for message_id in message_ids:
+            candidates.update(self._by_message.get((destination, message_id), {}))
+        return [self._records[key] for key in candidates if message_ids.issuperset(key[1])]
+
+    def clear(self) -> None:
+        """Remove every request."""
+        self._records.clear()
+        self._by_destination.clear()
+        self._by_message.clear()
@@ -0,0 +1,231 @@
+"""Poll device attributes, each at its own interval."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+
+from collections.abc import Awaitable, Callable, Collection, Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .coalescing import MAX_MESSAGES_PER_PACKET, chunk_message_ids
+from .protocol.factory.types import BaseMessage
+from .protocol.packet import MessageEvent
+
+if TYPE_CHECKING:
+    from .device import NasaDevice
+    from .protocol.parser import NasaPacketParser
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True, eq=False)
+class _Poll:
+    destination: str
+    message_id: int
+    interval: float
+    added: float
+    due: float
+    polls: int = 0
+    refreshes: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class PollStatistics:
+    """How often one message of one device was asked for and how often it was received."""
+
+    destination: str
+    message_id: int
+    interval: float
+    polls: int  # READ packets that carried the message
+    refreshes: int  # Values received, from responses and notifications
+    requested_rate: float  # Refreshes per second asked for
+    achieved_rate: float  # Refreshes per second received since the poll was added
+
+
+class PollScheduler:
+    """Send READs for device messages as they fall due.
+
+    Every message has its own interval. The messages due for a device are packed
+    into READ packets of up to 10, and a packet with room left is filled with
+    messages that fall due within pack_ahead of their interval. A value received
+    from a notification counts as a poll, so messages the device reports on its
+    own are not read again until their interval has passed. Intervals are spread
+    by jitter so polls added together do not stay in step. Messages that
+    outstanding(destination) reports as still waiting for a response are skipped
+    until their next interval, so a device that does not answer is not sent more
+    and more reads.
+    """
+
+    def __init__(
+        self,
+        parser: NasaPacketParser,
+        read: Callable[[list[int], str], Awaitable[Any]],
+        jitter: float = 0.1,
+        pack_ahead: float = 0.25,
+        outstanding: Callable[[str], Collection[int]] | None = None,
+    ) -> None:
+        """Init a scheduler that sends reads with read(message_ids, destination), e.g. NasaClient.nasa_read.
+
+        outstanding(destination) returns the message IDs of destination still waiting
+        for a response, e.g. NasaClient.outstanding_reads.
+        """
+        self._parser = parser
+        self._read = read
+        self._outstanding = outstanding
+        self._jitter = jitter
+        self._pack_ahead = pack_ahead
+        self._polls: dict[tuple[str, int], _Poll] = {}
+        self._listeners: dict[int, int] = {}  # Polls per message ID with an event listener
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._running = False
+        self.reads = 0  # READ packets sent
+
+    def __len__(self) -> int:
+        return len(self._polls)
+
+    def _next_due(self, now: float, interval: float) -> float:
+        return now + interval * (1 + random.uniform(-self._jitter, self._jitter))
+
+    def add(
+        self, destination: NasaDevice | str, messages: Iterable[type[BaseMessage] | int], interval: float
+    ) -> None:
+        """Poll messages of destination every interval seconds, replacing their previous interval."""
+        if interval <= 0:
+            raise ValueError("Poll interval must be positive.")
+        address = (destination if isinstance(destination, str) else destination.address).upper()
+        now = asyncio.get_running_loop().time()
+        for message in messages:
+            message_id = message if isinstance(message, int) else message.MESSAGE_ID
+            poll = self._polls.get((address, message_id))
+            if poll is None:
+                # The first poll is spread over the jitter too
+                due = now + interval * random.uniform(0, self._jitter)
+                self._polls[(address, message_id)] = _Poll(address, message_id, interval, now, due)
+                if self._listeners.get(message_id, 0) == 0:
+                    self._parser.add_event_listener(message_id, self._handle_event)
+                self._listeners[message_id] = self._listeners.get(message_id, 0) + 1
+            else:
+                poll.interval = interval
+                poll.due = min(poll.due, now + interval)
+        self._wakeup.set()
+        self._start_task()
+
+    def remove(self, destination: NasaDevice | str, messages: Iterable[type[BaseMessage] | int] | None = None) -> None:
+        """Stop polling messages of destination, or all of its messages if messages is None."""
+        address = (destination if isinstance(destination, str) else destination.address).upper()
+        if messages is None:
+            message_ids = [message_id for dest, message_id in self._polls if dest == address]
+        else:
+            message_ids = [message if isinstance(message, int) else message.MESSAGE_ID for message in messages]
+        for message_id in message_ids:
+            if self._polls.pop((address, message_id), None) is None:
+                continue
+            self._listeners[message_id] -= 1
+            if self._listeners[message_id] == 0:
+                del self._listeners[message_id]
+                self._parser.remove_event_listener(message_id, self._handle_event)
+
+    def statistics(self) -> list[PollStatistics]:
+        """Return the requested and achieved refresh rate of every poll."""
+        now = asyncio.get_running_loop().time()
+        return [
+            PollStatistics(
+                destination=poll.destination,
+                message_id=poll.message_id,
+                interval=poll.interval,
+                polls=poll.polls,
+                refreshes=poll.refreshes,
+                requested_rate=1 / poll.interval,
+                achieved_rate=poll.refreshes / (now - poll.added) if now > poll.added else 0.0,
+            )
+            for poll in self._polls.values()
+        ]
+
+    def _handle_event(self, event: MessageEvent) -> None:
+        """Count a received value as a refresh and push the next poll back (event listener for the parser)."""
+        poll = self._polls.get((event.header.source.upper(), event.message_number))
+        if poll is None:
+            return
+        poll.refreshes += 1
+        poll.due = self._next_due(asyncio.get_running_loop().time(), poll.interval)
+
+    def start(self) -> None:
+        """Start polling, the task only runs while there is something to poll."""
+        self._running = True
+        self._start_task()
+
+    def _start_task(self) -> None:
+        if self._running and self._polls and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop polling, the polls are kept for the next start."""
+        self._running = False
+        if self._task is not None:
+            task = self._task
+            self._task = None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        """Send the polls that are due, then sleep until the next one is."""
+        loop = asyncio.get_running_loop()
+        while self._polls:
+            self._wakeup.clear()
+            now = loop.time()
+            due = [poll for poll in self._polls.values() if poll.due <= now]
+            if due:
+                await self._send(due, now)
+                continue
+            timeout = min(poll.due for poll in self._polls.values()) - now
+            try:
+                async with asyncio.timeout(timeout):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                pass
+
+    async def _send(self, due: list[_Poll], now: float) -> None:
+        """Send the due polls, one READ per 10 messages for each destination."""
+        by_destination: dict[str, list[_Poll]] = {}
+        for poll in due:
+            by_destination.setdefault(poll.destination, []).append(poll)
+        reads = []
+        for destination, polls in by_destination.items():
+            outstanding = self._outstanding(destination) if self._outstanding is not None else ()
+            if outstanding:
+                for poll in polls:
+                    if poll.message_id in outstanding:
+                        poll.due = self._next_due(now, poll.interval)
+                polls = [poll for poll in polls if poll.message_id not in outstanding]
+                if not polls:
+                    continue
+            room = -len(polls) % MAX_MESSAGES_PER_PACKET
+            if room:
+                # Fill the last packet with the polls of this destination that are due soonest
+                early = sorted(
+                    (
+                        poll
+                        for poll in self._polls.values()
+                        if poll.destination == destination
+                        and now < poll.due <= now + self._pack_ahead * poll.interval
+                        and poll.message_id not in outstanding
+                    ),
+                    key=lambda poll: poll.due,
+                )
+                polls.extend(early[:room])
+            for poll in polls:
+                poll.polls += 1
+                poll.due = self._next_due(now, poll.interval)
+            for message_ids in chunk_message_ids(poll.message_id for poll in polls):
+                reads.append(self._read(message_ids, destination))
+        self.reads += len(reads)
+        for result in await asyncio.gather(*reads, return_exceptions=True):
+            if isinstance(result, Exception):
+                _LOGGER.error("Error sending poll: %s", result)
@@ -1 +1,6 @@
 """NASA Protocol Helpers."""
+
+from .frame import Frame, FrameDecoder, FrameEncoder, FramingStatistics
+from .trace import FrameTrace, TraceRecord
+
+__all__ = ["Frame", "FrameDecoder", "FrameEncoder", "FramingStatistics", "FrameTrace", "TraceRecord"]
@@ -0,0 +1,93 @@
+"""Receive buffer used to frame NASA packets in place."""
+
+from __future__ import annotations
+
+import struct
+
+
+class RxBuffer:
+    """Fixed-capacity byte buffer with read and write cursors.
+
+    Incoming chunks are appended at the write cursor and frames are consumed
+    from the read cursor without reallocating or re-slicing the backlog. The
+    unread region is only moved back to the start of the buffer when a write
+    would run past the end, so each received byte is copied a bounded number
+    of times regardless of how large a burst is.
+
+    Views returned by `view` point into the buffer and are only valid until
+    the next call to `write`, `consume` or `clear`; copy them with `bytes()`
+    if they need to outlive the current framing pass.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Init a receive buffer."""
+        if capacity <= 0:
+            raise ValueError("Buffer capacity must be greater than zero.")
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self.compacted_bytes = 0  # Total bytes moved while compacting, useful for benchmarks
+
+    def __len__(self) -> int:
+        """Return the number of unread bytes."""
+        return self._end - self._start
+
+    def __getitem__(self, index: int) -> int:
+        """Return the unread byte at index."""
+        if not 0 <= index < len(self):
+            raise IndexError("RxBuffer index out of range")
+        return self._buffer[self._start + index]
+
+    @property
+    def capacity(self) -> int:
+        """Return the buffer capacity."""
+        return len(self._buffer)
+
+    def write(self, data: bytes) -> bool:
+        """Append data to the buffer, returns False if it does not fit."""
+        size = len(data)
+        if self._end + size > len(self._buffer):
+            self._compact()
+            if self._end + size > len(self._buffer):
+                return False
+        self._view[self._end : self._end + size] = data
+        self._end += size
+        return True
+
+    def consume(self, count: int) -> None:
+        """Advance the read cursor by count bytes."""
+        self._start = min(self._start + count, self._end)
+        if self._start == self._end:
+            # Nothing left unread, rewind both cursors for free.
+            self._start = self._end = 0
+
+    def clear(self) -> None:
+        """Discard all unread data."""
+        self._start = self._end = 0
+
+    def find(self, value: int, offset: int = 0) -> int:
+        """Return the offset of the next byte equal to value, or -1."""
+        index = self._buffer.find(value, self._start + offset, self._end)
+        return index if index == -1 else index - self._start
+
+    def unpack_from(self, fmt: struct.Struct, offset: int = 0) -> tuple:
+        """Unpack a struct from the unread data at offset."""
+        if offset + fmt.size > len(self):
+            raise struct.error(f"unpack_from requires {fmt.size} bytes at offset {offset}, have {len(self) - offset}")
+        return fmt.unpack_from(self._buffer, self._start + offset)
+
+    def view(self, offset: int, length: int) -> memoryview:
+        """Return a view over length unread bytes starting at offset."""
+        start = self._start + offset
+        return self._view[start : min(start + length, self._end)]
+
+    def _compact(self) -> None:
+        """Move unread data to the start of the buffer."""
+        if self._start == 0:
+            return
+        length = self._end - self._start
+        self._view[0:length] = self._view[self._start : self._end]
+        self.compacted_bytes += length
+        self._start = 0
+        self._end = length
@@ -0,0 +1,180 @@
+"""Binary encoder for outgoing NASA packets."""
+
+from __future__ import annotations
+
+import binascii
+import struct
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from ..helpers import Address
+from .enum import DataType, PacketType
+from .factory.table import PAYLOAD_SIZES
+from .factory.types import SendMessage
+from .frame import ETX, STX
+from .packet import HEADER_LENGTH
+
+# Per NOTES.md: bit 7 = packet information, bits 6-5 = protocol version 2, bits 4-3 = retry count 0
+INFO_BYTE = 0x80 | (2 << 5) | (0 << 3)
+PACKET_NUMBER_OFFSET = 3 + 8  # Frame offset of the packet number, after STX, size, addresses, info and type
+
+_FRAME_START = struct.Struct(">BH")  # STX, size
+_HEADER = struct.Struct(">3s3sBBBB")  # Source, destination, info, packet/data type, packet number, dataset count
+_MESSAGE_ID = struct.Struct(">H")
+_FRAME_END = struct.Struct(">HB")  # CRC, ETX
+_FRAME_CRC = struct.Struct(">H")
+
+
+def address_bytes(address: str | bytes | Address) -> bytes:
+    """Return a device address as its three bytes, e.g. "200000" as b"\\x20\\x00\\x00"."""
+    if isinstance(address, bytes):
+        data = address
+    else:
+        data = bytes.fromhex(str(address))
+    if len(data) != 3:
+        raise ValueError(f"Invalid address: {address!r}")
+    return data
+
+
+@dataclass(frozen=True, slots=True)
+class OutgoingPacket:
+    """A packet waiting to be sent, encoded straight into frame bytes.
+
+    The packet number is only known when the packet is sent, so it is passed to
+    `encode`. The hex forms are only built when asked for, for logging and the CLI.
+    """
+
+    source: bytes
+    destination: bytes
+    data_type: DataType
+    messages: tuple[SendMessage, ...]
+    packet_type: PacketType = PacketType.NORMAL
+
+    @classmethod
+    def create(
+        cls,
+        source: str | bytes | Address,
+        destination: str | bytes | Address,
+        data_type: DataType,
+        messages: Iterable[SendMessage],
+    ) -> OutgoingPacket:
+        """Create a packet from addresses in any form, raises ValueError if there are no messages."""
+        messages = tuple(messages)
+        if not messages:
+            raise ValueError("At least one message is required to build.")
+        return cls(address_bytes(source), address_bytes(destination), data_type, messages)
+
+    def _payload_sizes(self) -> list[int]:
+        """Return the payload size of every message.
+
+        READ requests carry a zero payload whose size is encoded in bits 9 and 10
+        of the message number, structures carry none.
+        """
+        if self.data_type == DataType.READ:
+            return [PAYLOAD_SIZES[(message.MESSAGE_ID >> 9) & 0x3] for message in self.messages]
+        return [len(message.PAYLOAD) for message in self.messages]
+
+    def encode(self, packet_number: int) -> bytearray:
+        """Return the complete frame: STX, size, header, datasets, CRC and ETX."""
+        sizes = self._payload_sizes()
+        data_length = HEADER_LENGTH + 2 * len(sizes) + sum(sizes)
+        frame = bytearray(data_length + 6)
+        _FRAME_START.pack_into(frame, 0, STX, data_length + 4)  # Data, size and CRC
+        _HEADER.pack_into(
+            frame,
+            3,
+            self.source,
+            self.destination,
+            INFO_BYTE,
+            (self.packet_type.value << 4) | self.data_type.value,
+            packet_number,
+            len(sizes),
+        )
+        offset = 3 + HEADER_LENGTH
+        read = self.data_type == DataType.READ
+        for message, size in zip(self.messages, sizes):
+            _MESSAGE_ID.pack_into(frame, offset, message.MESSAGE_ID)
+            offset += 2
+            if not read:  # READ payloads are left as the zeros the buffer starts with
+                frame[offset : offset + size] = message.PAYLOAD
+            offset += size
+        _FRAME_END.pack_into(frame, offset, binascii.crc_hqx(memoryview(frame)[3:offset], 0), ETX)
+        return frame
+
+    def packet_data(self, packet_number: int) -> bytes:
+        """Return the packet data, the frame without STX, size, CRC and ETX."""
+        return bytes(self.encode(packet_number)[3:-3])
+
+    def hex(self, packet_number: int) -> str:
+        """Return the packet data as upper case hex."""
+        return self.packet_data(packet_number).hex().upper()
+
+    def hex_template(self) -> str:
+        """Return the packet data as upper case hex with a {CUR_PACK_NUM} placeholder for the packet number."""
+        packet_hex = self.hex(0)
+        offset = (PACKET_NUMBER_OFFSET - 3) * 2
+        return packet_hex[:offset] + "{CUR_PACK_NUM}" + packet_hex[offset + 2 :]
+
+
+@dataclass(frozen=True, slots=True)
+class FrameTemplate:
+    """An encoded frame that only needs its packet number and CRC filled in when it is sent."""
+
+    frame: bytes
+
+    def encode(self, packet_number: int) -> bytearray:
+        """Return a copy of the frame with packet_number and its CRC."""
+        frame = bytearray(self.frame)
+        frame[PACKET_NUMBER_OFFSET] = packet_number
+        _FRAME_CRC.pack_into(frame, len(frame) - 3, binascii.crc_hqx(memoryview(frame)[3:-3], 0))
+        return frame
+
+
+class FrameTemplateCache:
+    """Least recently used cache of encoded READ frames.
+
+    A READ packet only depends on its addresses and message IDs, its payloads are
+    zeros sized by the message IDs, so polls that repeat the same request reuse
+    the encoded frame and only patch the packet number and CRC.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """Init a cache holding up to maxsize templates."""
+        if maxsize <= 0:
+            raise ValueError("Cache size must be greater than zero.")
+        self.maxsize = maxsize
+        self._templates: OrderedDict[tuple, FrameTemplate] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def template(self, packet: OutgoingPacket) -> FrameTemplate:
+        """Return the template for a READ packet, encoding it on a miss."""
+        if packet.data_type != DataType.READ:
+            raise ValueError(f"Only READ packets can be cached, got {packet.data_type}.")
+        key = (
+            packet.source,
+            packet.destination,
+            packet.packet_type,
+            tuple(message.MESSAGE_ID for message in packet.messages),
+        )
+        template = self._templates.get(key)
+        if template is not None:
+            self.hits += 1
+            self._templates.move_to_end(key)
+            return template
+        self.misses += 1
+        template = self._templates[key] = FrameTemplate(bytes(packet.encode(0)))
+        if len(self._templates) > self.maxsize:
+            self._templates.popitem(last=False)
+            self.evictions += 1
+        return template
+
+    def clear(self) -> None:
+        """Drop all templates."""
+        self._templates.clear()
@@ -5,16 +5,20 @@ from __future__ import annotations
 import logging
 
 from .messages import MESSAGE_PARSERS
-from .parser import parse_message
+from .parser import decode_message, parse_message
+from .table import DECODE_TABLE, DecodeEntry, MessageFlags
 from .types import SendMessage
-from ..enum import DataType, PacketType
-from ...helpers import bin2hex
+from ..enum import DataType
 
 
 _LOGGER = logging.getLogger(__name__)
 
 __all__ = [
+    "DECODE_TABLE",
+    "DecodeEntry",
+    "MessageFlags",
     "build_message",
+    "decode_message",
     "get_nasa_message_name",
     "get_nasa_message_id",
     "parse_message",
@@ -23,47 +27,14 @@ __all__ = [
 
 
 def build_message(source: str, destination: str, data_type: DataType, messages: list[SendMessage]) -> str:
-    """Build a message to send to a device."""
-    _LOGGER.debug("Building message from %s to %s with %d sub-messages", source, destination, len(messages))
-    if not messages:
-        raise ValueError("At least one message is required to build.")
-    msg_parts = []
-    msg_parts.append(source)
-    msg_parts.append(destination)
-    # Per NOTES.md: bit 7=1, proto ver (bits 6,5), retry (bits 4,3)
-    command_byte1_val = (
-        0x80  # packetInformation (assuming it's true for normal packets)
-        | (2 << 5)  # protocolVersion = 2
-        | (0 << 3)  # retryCount = 0
-    )
-    msg_parts.append(f"{command_byte1_val:02x}")  # Packet Info/ProtoVer/Retry (1 byte)
+    """Build a message to send to a device as hex, with a {CUR_PACK_NUM} placeholder for the packet number.
 
-    # Per NOTES.md: byte 10 is a single byte for Packet Type and Data Type
-    byte10_val = (PacketType.NORMAL.value << 4) | data_type.value
-    msg_parts.append(f"{byte10_val:02x}")
+    Kept for the CLI dump format, OutgoingPacket encodes the same packet straight to frame bytes.
+    """
+    from ..encoder import OutgoingPacket  # The encoder depends on this package
 
-    msg_parts.append("{CUR_PACK_NUM}")  # Packet Number (1 byte, to be filled later)
-    msg_parts.append(f"{len(messages):02x}")  # Capacity (Number of Messages)
-    for msg in messages:
-        msg_parts.append(f"{msg.MESSAGE_ID:04x}")  # Message Number
-        payload = msg.PAYLOAD
-        if data_type == DataType.READ:
-            ## Generate dummy payload
-            # The payload size for a READ request is encoded in the message number.
-            # Bits 9 and 10 of the message number determine the size.
-            kind = ((msg.MESSAGE_ID >> 8) & 0x06) >> 1
-            size = 0
-            if kind == 0:  # e.g. bool, enum
-                size = 1
-            elif kind == 1:  # e.g. temperature
-                size = 2
-            elif kind == 2:  # e.g. long var
-                size = 4
-            payload = b"\x00" * size
-            msg_parts.append(bin2hex(payload))  # Message Payload in hex
-        else:
-            msg_parts.append(bin2hex(msg.PAYLOAD))  # Message Payload in hex
-    return "".join(msg_parts).upper()
+    _LOGGER.debug("Building message from %s to %s with %d sub-messages", source, destination, len(messages))
+    return OutgoingPacket.create(source, destination, data_type, messages).hex_template()
 
 
 def get_nasa_message_name(message_number: int) -> str | None:
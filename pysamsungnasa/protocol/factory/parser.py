@@ -2,7 +2,7 @@
 
 import logging
 import struct
-from . import MESSAGE_PARSERS
+from .table import DECODE_TABLE, DecodeEntry
 from .types import BaseMessage, RawMessage
 from ...helpers import bin2hex
 
@@ -18,13 +18,13 @@ def parse_message(
         message_number: The message ID to parse
         payload: The raw message payload bytes
         message_parsers: Dictionary mapping message numbers to parser classes.
-                        If None, will attempt to use the global MESSAGE_PARSERS.
+                        If None, the precompiled DECODE_TABLE built from MESSAGE_PARSERS is used.
 
     Returns:
         Parsed message instance
     """
     if message_parsers is None:
-        message_parsers = MESSAGE_PARSERS
+        return decode_message(DECODE_TABLE[message_number], payload)
 
     parser_class = message_parsers.get(message_number)
     if not parser_class:
@@ -42,6 +42,20 @@ def parse_message(
     return parser
 
 
+def decode_message(entry: DecodeEntry, payload: bytes) -> BaseMessage:
+    """Decode a message payload using its decode table entry, falling back to a raw message on error."""
+    try:
+        return entry.parser(payload)
+    except Exception as e:
+        _LOGGER.exception(
+            "Error parsing packet for %s (%s): %s",
+            entry.message_id,
+            bin2hex(payload) if isinstance(payload, bytes) else str(payload),
+            e,
+        )
+        return RawMessage.parse_payload(payload)
+
+
 def parse_tlv_structure(struct_payload: bytes) -> dict:
     """Parse TLV-encoded structure data from raw bytes.
 
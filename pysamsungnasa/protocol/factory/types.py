@@ -4,15 +4,19 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
+from collections.abc import Callable
 from typing import ClassVar, Optional, Any
+import functools
 import logging
 import struct
-from abc import ABC
+from abc import ABC, ABCMeta
 
 from ..enum import SamsungEnum
 
 _LOGGER = logging.getLogger(__name__)
 
+_UNDECODED: Any = object()  # Sentinel for a lazy message whose payload has not been decoded yet
+
 
 @dataclass
 class SendMessage:
@@ -22,9 +26,31 @@ class SendMessage:
     PAYLOAD: bytes  # pylint: disable=invalid-name
 
 
-class BaseMessage(ABC):
+class _MessageMeta(ABCMeta):
+    """Metaclass that gives every message class empty __slots__ unless it declares its own.
+
+    There are hundreds of message classes and devices keep one instance per attribute, so
+    instances only carry the slots declared on BaseMessage and no per-instance __dict__.
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        namespace.setdefault("__slots__", ())
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+@functools.cache
+def _is_fsv_class(cls: type[BaseMessage]) -> bool:
+    """Return True if messages of cls are FSV configuration messages, read from the decode table flags."""
+    from .table import MessageFlags, message_flags  # The table is built from the classes in this module
+
+    return MessageFlags.FSV in message_flags(cls)
+
+
+class BaseMessage(ABC, metaclass=_MessageMeta):
     """Base class for all NASA protocol messages."""
 
+    __slots__ = ("_value", "RAW_PAYLOAD", "_options", "_parser")
+
     MESSAGE_ID: ClassVar[Optional[int]] = None
     MESSAGE_NAME: ClassVar[Optional[str]] = None
     MESSAGE_ENUM: ClassVar[Optional[type[SamsungEnum]]] = None
@@ -32,17 +58,69 @@ class BaseMessage(ABC):
     UNIT_OF_MEASUREMENT: ClassVar[Optional[str]] = None
 
     def __init__(self, value: Any, raw_payload: bytes = b"", options: Optional[list[str]] = None):
-        self.VALUE = value  # pylint: disable=invalid-name
+        self._value = value
         self.RAW_PAYLOAD = raw_payload  # pylint: disable=invalid-name
-        self.OPTIONS = options  # pylint: disable=invalid-name
+        self._options = options
+        self._parser: Callable[[bytes], BaseMessage] | None = None
+
+    @classmethod
+    def lazy(cls, payload: bytes, parser: Callable[[bytes], BaseMessage] | None = None) -> "BaseMessage":
+        """Return a message that keeps the raw payload and only decodes it on first access.
+
+        parser defaults to parse_payload; the decoded VALUE and OPTIONS are cached on the message.
+        """
+        message = cls.__new__(cls)
+        message._value = _UNDECODED
+        message.RAW_PAYLOAD = payload
+        message._options = None
+        message._parser = parser if parser is not None else cls.parse_payload
+        return message
+
+    def _decode(self) -> None:
+        """Decode the raw payload of a lazy message."""
+        assert self._parser is not None
+        try:
+            decoded = self._parser(self.RAW_PAYLOAD)
+        except Exception as e:
+            _LOGGER.exception("Error parsing packet for %s (%s): %s", self.MESSAGE_ID, self.RAW_PAYLOAD.hex(), e)
+            self._value = self.RAW_PAYLOAD.hex() if self.RAW_PAYLOAD else None
+        else:
+            self._value = decoded._value
+            self._options = decoded._options
+        self._parser = None
+
+    @property
+    def is_decoded(self) -> bool:
+        """Return True if the payload has been decoded into VALUE."""
+        return self._value is not _UNDECODED
+
+    @property
+    def VALUE(self) -> Any:  # pylint: disable=invalid-name
+        """Return the decoded value, decoding a lazy message on first access."""
+        if self._value is _UNDECODED:
+            self._decode()
+        return self._value
+
+    @VALUE.setter
+    def VALUE(self, value: Any) -> None:  # pylint: disable=invalid-name
+        self._value = value
+        self._parser = None
+
+    @property
+    def OPTIONS(self) -> Optional[list[str]]:  # pylint: disable=invalid-name
+        """Return the possible values of an enum message."""
+        if self._value is _UNDECODED:
+            self._decode()
+        return self._options
+
+    @OPTIONS.setter
+    def OPTIONS(self, options: Optional[list[str]]) -> None:  # pylint: disable=invalid-name
+        self._options = options
 
     @property
     def is_fsv_message(self) -> bool:
         """Return True if this message is an FSV configuration message."""
-        if self.MESSAGE_NAME is None:
-            return False
-        assert self.__doc__ is not None
-        return "FSV" in (self.MESSAGE_NAME.upper() or self.__doc__.upper())
+        return _is_fsv_class(type(self))
 
     @property
     def as_dict(self) -> dict:
@@ -187,6 +265,21 @@ class FloatMessage(BaseMessage):
 class EnumMessage(BaseMessage):
     """Parser for enum messages."""
 
+    _enum_options: ClassVar[Optional[list[str]]] = None
+
+    @classmethod
+    def enum_options(cls) -> list[str]:
+        """Return the MESSAGE_ENUM member names, built once per class and shared by every instance.
+
+        The list is shared, treat it as read-only.
+        """
+        options = cls.__dict__.get("_enum_options")
+        if options is None:
+            assert cls.MESSAGE_ENUM is not None
+            options = [option.name for option in cls.MESSAGE_ENUM]
+            cls._enum_options = options
+        return options
+
     @classmethod
     def parse_payload(cls, payload: bytes) -> "EnumMessage":
         """Parse the payload into an enum value."""
@@ -199,13 +292,13 @@ class EnumMessage(BaseMessage):
         if enum_cls.has_value(payload[0]):
             return cls(
                 value=enum_cls._value2member_map_[payload[0]],  # type: ignore[attr-defined]
-                options=[option.name for option in enum_cls],
+                options=cls.enum_options(),
                 raw_payload=payload,
             )
         else:
             return cls(
                 value=cls.ENUM_DEFAULT,
-                options=[option.name for option in enum_cls],
+                options=cls.enum_options(),
                 raw_payload=payload,
             )
 
@@ -0,0 +1,202 @@
+"""Sans-IO NASA frame decoder and encoder."""
+
+from __future__ import annotations
+
+import binascii
+import logging
+import struct
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from .buffer import RxBuffer
+from .packet import HEADER_LENGTH, PacketHeader
+
+_LOGGER = logging.getLogger(__name__)
+
+STX = 0x32
+ETX = 0x34
+MIN_FRAME_LENGTH = 3 + HEADER_LENGTH + 3  # STX, size, header, CRC and ETX with no datasets
+MAX_FRAME_LENGTH = 1500  # Largest frame seen on the bus, anything longer is a corrupt size field
+
+_FRAME_HEADER = struct.Struct(">BH")  # STX, packet size
+_FRAME_SIZE = struct.Struct(">H")
+_FRAME_CRC = struct.Struct(">H")
+
+
+@dataclass
+class FramingStatistics:
+    """Counters describing the RX framing state."""
+
+    received_bytes: int = 0  # Bytes fed into the framer
+    frames: int = 0  # Frames with a valid STX, length, ETX and CRC
+    skipped_bytes: int = 0  # Bytes discarded while searching for a frame
+    resyncs: int = 0  # Frame candidates rejected by the length, ETX or CRC check
+    crc_errors: int = 0  # Frame candidates rejected by the CRC check
+    overflows: int = 0  # Times the buffer was cleared because it was full
+
+
+@dataclass(frozen=True, slots=True)
+class Frame:
+    """A complete NASA frame.
+
+    Layout: [STX] [Size-H] [Size-L] [Data...] [CRC-H] [CRC-L] [ETX]
+
+    Frames produced by `FrameDecoder` have passed the CRC check and carry the
+    parsed packet header.
+    """
+
+    raw: bytes
+    header: PacketHeader
+
+    @property
+    def data(self) -> bytes:
+        """Return the packet data between the size field and the CRC."""
+        return self.raw[3:-3]
+
+    @property
+    def crc(self) -> int:
+        """Return the CRC carried by the frame."""
+        return _FRAME_CRC.unpack_from(self.raw, len(self.raw) - 3)[0]
+
+    @property
+    def calculated_crc(self) -> int:
+        """Return the CRC calculated over the packet data."""
+        return binascii.crc_hqx(memoryview(self.raw)[3:-3], 0)
+
+    @property
+    def is_crc_valid(self) -> bool:
+        """Return True if the carried CRC matches the packet data."""
+        return self.crc == self.calculated_crc
+
+
+class FrameDecoder:
+    """Split a byte stream into NASA frames.
+
+    The decoder does no I/O, chunks are passed in with `feed` as they arrive
+    from any transport and complete frames are returned. Bytes are framed in
+    place inside a fixed-capacity `RxBuffer`; a frame candidate with an
+    implausible length, a bad ETX or a bad CRC is rejected by skipping to the
+    next STX, so each byte is searched at most once even on a noisy bus and
+    a corrupt length field never swallows the frames after it.
+    """
+
+    def __init__(self, max_buffer_size: int = 262144, log_buffer_messages: bool = False) -> None:
+        """Init a frame decoder."""
+        self._buffer = RxBuffer(max_buffer_size)
+        self._max_frame_length = min(MAX_FRAME_LENGTH, max_buffer_size)
+        self.log_buffer_messages = log_buffer_messages
+        self.statistics = FramingStatistics()
+
+    def __len__(self) -> int:
+        """Return the number of buffered bytes not yet framed."""
+        return len(self._buffer)
+
+    def reset(self) -> None:
+        """Discard any partially received frame."""
+        self._buffer.clear()
+
+    def feed(self, chunk: bytes) -> Iterator[Frame]:
+        """Add a chunk of received bytes and return an iterator over the complete frames.
+
+        The chunk is buffered immediately, frames are only consumed from the
+        buffer as the iterator is advanced.
+        """
+        self.statistics.received_bytes += len(chunk)
+        if not self._buffer.write(chunk):
+            _LOGGER.error(
+                "Max buffer sized reached %s/%s",
+                len(self._buffer) + len(chunk),
+                self._buffer.capacity,
+            )
+            self.statistics.overflows += 1
+            self.statistics.skipped_bytes += len(self._buffer) + len(chunk)
+            self._buffer.clear()
+        return self._frames()
+
+    def _resync(self, reason: str, value: int | str) -> None:
+        """Drop the frame candidate at the head of the buffer and skip to the next plausible STX."""
+        next_stx = self._buffer.find(STX, 1)
+        skipped = len(self._buffer) if next_stx == -1 else next_stx
+        self._buffer.consume(skipped)
+        self.statistics.resyncs += 1
+        self.statistics.skipped_bytes += skipped
+        if self.log_buffer_messages:
+            _LOGGER.debug("%s %s, skipped %d bytes to the next STX.", reason, value, skipped)
+
+    def _frames(self) -> Iterator[Frame]:
+        """Yield every complete frame in the buffer."""
+        buffer = self._buffer
+        stats = self.statistics
+        # Every pass either emits a frame, consumes at least one byte or stops, and each byte is
+        # searched at most once, so framing is linear in the input even on a noisy bus.
+        while buffer:
+            stx_index = buffer.find(STX)
+
+            if stx_index == -1:
+                if self.log_buffer_messages:
+                    _LOGGER.debug("No STX found, clearing buffer")
+                stats.skipped_bytes += len(buffer)
+                buffer.clear()
+                return
+
+            if stx_index > 0:
+                if self.log_buffer_messages:
+                    _LOGGER.debug("Skipping %d bytes of garbage", stx_index)
+                stats.skipped_bytes += stx_index
+                buffer.consume(stx_index)
+
+            if len(buffer) < 3:
+                if self.log_buffer_messages:
+                    _LOGGER.debug("Not enough data for header, waiting for more.")
+                return
+
+            _, packet_len_val = buffer.unpack_from(_FRAME_HEADER)
+            expected_packet_len = packet_len_val + 2  # + STX and ETX
+
+            if not MIN_FRAME_LENGTH <= expected_packet_len <= self._max_frame_length:
+                self._resync("Implausible packet length", expected_packet_len)
+                continue
+
+            if len(buffer) < expected_packet_len:
+                if self.log_buffer_messages:
+                    _LOGGER.debug(
+                        "Incomplete packet. Have %d, need %d. Waiting for more data.",
+                        len(buffer),
+                        expected_packet_len,
+                    )
+                return
+
+            if buffer[expected_packet_len - 1] != ETX:
+                self._resync("Invalid ETX", buffer[expected_packet_len - 1])
+                continue
+
+            (crc,) = buffer.unpack_from(_FRAME_CRC, expected_packet_len - 3)
+            calculated_crc = binascii.crc_hqx(buffer.view(3, expected_packet_len - 6), 0)
+            if crc != calculated_crc:
+                _LOGGER.warning("Invalid CRC expected %s got %s", hex(calculated_crc), hex(crc))
+                stats.crc_errors += 1
+                self._resync("Invalid CRC", hex(crc))
+                continue
+
+            stats.frames += 1
+            # The view is only valid until the buffer is consumed, hand out a copy.
+            raw = bytes(buffer.view(0, expected_packet_len))
+            frame = Frame(raw, PacketHeader.parse(raw[3 : 3 + HEADER_LENGTH]))
+            buffer.consume(expected_packet_len)
+            yield frame
+
+
+class FrameEncoder:
+    """Wrap NASA packet data into frames."""
+
+    @staticmethod
+    def encode(packet_data: bytes) -> bytes:
+        """Return packet data wrapped with STX, size, CRC and ETX."""
+        frame = bytearray(len(packet_data) + 6)
+        frame[0] = STX
+        _FRAME_SIZE.pack_into(frame, 1, len(packet_data) + 4)  # Data, size and CRC
+        frame[3:-3] = packet_data
+        _FRAME_CRC.pack_into(frame, len(frame) - 3, binascii.crc_hqx(packet_data, 0))
+        frame[-1] = ETX
+        return bytes(frame)
@@ -0,0 +1,94 @@
+"""Transmit pacing for the half-duplex NASA bus."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+BITS_PER_BYTE = 11  # Start bit, 8 data bits, even parity and a stop bit
+
+
+@dataclass
+class TokenBucket:
+    """Limit the average send rate while allowing short bursts.
+
+    The bucket holds up to `capacity` tokens and refills at `rate` tokens per second,
+    each frame sent takes one token.
+    """
+
+    rate: float
+    capacity: float
+    tokens: float = field(init=False)
+    updated: float = field(default=0.0, init=False)
+
+    def __post_init__(self) -> None:
+        """Start with a full bucket."""
+        if self.rate <= 0 or self.capacity < 1:
+            raise ValueError("Token bucket needs a positive rate and room for at least one token.")
+        self.tokens = self.capacity
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Return the seconds until a token is available."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        """Take a token for a frame sent at now."""
+        self._refill(now)
+        self.tokens -= 1
+
+
+class TxPacer:
+    """Decide when the next frame can be sent without colliding with other traffic.
+
+    The bus is treated as busy while a frame is on the wire, which takes
+    `BITS_PER_BYTE / baudrate` seconds per byte, and until `idle_gap` seconds after
+    the last byte was received or sent. An optional token bucket caps the average
+    send rate. The pacer does no I/O, times come from the caller's clock.
+    """
+
+    def __init__(
+        self,
+        baudrate: int,
+        idle_gap: float,
+        rate: float = 0.0,
+        burst: int = 1,
+    ) -> None:
+        """Init a pacer, a rate of 0 disables the token bucket."""
+        if baudrate <= 0:
+            raise ValueError("Baudrate must be greater than zero.")
+        self.baudrate = baudrate
+        self.idle_gap = idle_gap
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self.last_rx_time = float("-inf")
+        self.tx_busy_until = float("-inf")  # When the last frame sent has left the wire
+
+    def wire_time(self, length: int) -> float:
+        """Return the seconds length bytes take on the wire."""
+        return length * BITS_PER_BYTE / self.baudrate
+
+    def on_rx(self, now: float) -> None:
+        """Record that bytes were received at now."""
+        self.last_rx_time = now
+
+    def on_tx(self, now: float, length: int) -> None:
+        """Record that a frame of length bytes was written at now."""
+        self.tx_busy_until = max(now, self.tx_busy_until) + self.wire_time(length)
+        if self.bucket is not None:
+            self.bucket.consume(now)
+
+    def idle_delay(self, now: float) -> float:
+        """Return the seconds until the bus has been idle for idle_gap."""
+        return max(max(self.last_rx_time, self.tx_busy_until) + self.idle_gap - now, 0.0)
+
+    def rate_delay(self, now: float) -> float:
+        """Return the seconds until the rate limit allows another frame."""
+        return self.bucket.delay(now) if self.bucket is not None else 0.0
+
+    def delay(self, now: float) -> float:
+        """Return the seconds to wait before the next frame can be sent, 0 if it can be sent now."""
+        return max(self.idle_delay(now), self.rate_delay(now))
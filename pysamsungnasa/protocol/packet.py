@@ -0,0 +1,119 @@
+"""NASA packet header and per-dataset events."""
+
+from __future__ import annotations
+
+import functools
+
+from dataclasses import dataclass
+from typing import Any
+
+from ..helpers import bin2hex
+from .enum import AddressClass, DataType, PacketType
+from .factory.types import BaseMessage
+
+HEADER_LENGTH = 10  # Source, destination, info byte, packet/data type, packet number and dataset count
+
+# Enum members by value, a dict lookup is much cheaper than calling the enum on every packet
+_ADDRESS_CLASSES = {member.value: member for member in AddressClass}
+_PACKET_TYPES = {member.value: member for member in PacketType}
+_DATA_TYPES = {member.value: member for member in DataType}
+
+
+@functools.lru_cache(maxsize=256)
+def _address(raw: bytes) -> str:
+    """Return a 3 byte address as hex, a bus only has a handful of addresses so the strings are cached."""
+    return bin2hex(raw)
+
+
+@dataclass(frozen=True, slots=True)
+class PacketHeader:
+    """The fixed header at the start of NASA packet data.
+
+    Layout: [Src x3] [Dst x3] [Info] [PacketType|DataType] [PacketNumber] [DatasetCount]
+    """
+
+    source: str
+    source_class: AddressClass
+    dest: str
+    dest_class: AddressClass
+    is_info: int
+    protocol_version: int
+    retry_counter: int
+    packet_type: PacketType
+    payload_type: DataType
+    packet_number: int
+    dataset_count: int
+
+    @classmethod
+    def parse(cls, packet_data: bytes) -> PacketHeader:
+        """Parse the header from packet data, raises ValueError if it is too short."""
+        if len(packet_data) < HEADER_LENGTH:
+            raise ValueError(f"Packet data too short for a header: {len(packet_data)} bytes")
+        info = packet_data[6]
+        return cls(
+            source=_address(packet_data[0:3]).upper(),
+            source_class=_ADDRESS_CLASSES.get(packet_data[0], AddressClass.UNKNOWN),
+            dest=_address(packet_data[3:6]),
+            dest_class=_ADDRESS_CLASSES.get(packet_data[3], AddressClass.UNKNOWN),
+            is_info=(info & 0x80) >> 7,
+            protocol_version=(info & 0x60) >> 5,
+            retry_counter=(info & 0x18) >> 3,
+            packet_type=_PACKET_TYPES.get(packet_data[7] >> 4, PacketType.UNKNOWN),
+            payload_type=_DATA_TYPES.get(packet_data[7] & 0xF, DataType.UNKNOWN),
+            packet_number=packet_data[8],
+            dataset_count=packet_data[9],
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class MessageEvent:
+    """One dataset of a received packet.
+
+    The header is shared by every event from the same packet.
+    """
+
+    header: PacketHeader
+    message_number: int
+    message: BaseMessage
+
+    @property
+    def formatted_message_number(self) -> str:
+        """Return the message number as a hex string, e.g. 0x4000."""
+        return f"0x{self.message_number:04x}"
+
+    def as_kwargs(self) -> dict[str, Any]:
+        """Return the event as the keyword arguments passed to kwargs style handlers."""
+        header = self.header
+        return {
+            "source": header.source,
+            "source_class": header.source_class,
+            "dest": header.dest,
+            "dest_class": header.dest_class,
+            "isInfo": header.is_info,
+            "protocolVersion": header.protocol_version,
+            "retryCounter": header.retry_counter,
+            "packetType": header.packet_type,
+            "payloadType": header.payload_type,
+            "packetNumber": header.packet_number,
+            "formattedMessageNumber": self.formatted_message_number,
+            "messageNumber": self.message_number,
+            "packet": self.message,
+        }
+
+    @classmethod
+    def from_kwargs(cls, kwargs: dict[str, Any]) -> MessageEvent:
+        """Build an event from kwargs style handler arguments, missing header fields get defaults."""
+        header = PacketHeader(
+            source=str(kwargs.get("source", "")).upper(),
+            source_class=kwargs.get("source_class", AddressClass.UNKNOWN),
+            dest=str(kwargs.get("dest", "")),
+            dest_class=kwargs.get("dest_class", AddressClass.UNKNOWN),
+            is_info=kwargs.get("isInfo", 0),
+            protocol_version=kwargs.get("protocolVersion", 0),
+            retry_counter=kwargs.get("retryCounter", 0),
+            packet_type=kwargs.get("packetType", PacketType.UNKNOWN),
+            payload_type=kwargs.get("payloadType", DataType.UNKNOWN),
+            packet_number=kwargs.get("packetNumber", 0),
+            dataset_count=1,
+        )
+        return cls(header, kwargs["messageNumber"], kwargs["packet"])
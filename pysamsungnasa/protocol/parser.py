@@ -8,12 +8,57 @@ import logging
 import struct
 
 from ..config import NasaConfig
+from ..dispatch import CallbackDispatcher
 from ..helpers import bin2hex
-from .enum import PacketType, DataType, AddressClass
-from .factory import parse_message, get_nasa_message_name
+from .enum import PacketType, DataType
+from .factory import DECODE_TABLE, DecodeEntry, MessageFlags
+from .factory.table import PAYLOAD_SIZES
+from .frame import Frame
+from .packet import HEADER_LENGTH, MessageEvent, PacketHeader
 
 _LOGGER = logging.getLogger(__name__)
 
+_MESSAGE_ID = struct.Struct(">H")
+# For incoming messages, we process NOTIFICATIONs, WRITEs, RESPONSEs and ACKs
+_PROCESSED_TYPES = frozenset((DataType.NOTIFICATION, DataType.WRITE, DataType.RESPONSE, DataType.ACK))
+
+
+class InvalidPacketError(ValueError):
+    """Raised when the datasets of a packet do not match its dataset count or size."""
+
+
+def read_datasets(buffer: bytes, offset: int, end: int, dataset_count: int) -> list[tuple[DecodeEntry, bytes]]:
+    """Split the datasets of a packet into decode table entries and raw payloads.
+
+    Walks buffer from offset (the first dataset) up to end (the start of the CRC for a
+    frame, or the end of the packet data) without decoding any values. Raises
+    InvalidPacketError if a dataset does not fit before end, e.g. when the dataset
+    count is wrong, rather than reading the CRC and ETX as datasets.
+    """
+    datasets = []
+    table = DECODE_TABLE
+    for index in range(dataset_count):
+        if offset + 2 > end:
+            raise InvalidPacketError(f"Packet ends before dataset {index + 1} of {dataset_count}: " + bin2hex(buffer))
+        (message_number,) = _MESSAGE_ID.unpack_from(buffer, offset)
+        # The size is encoded in the message ID, so the table is only consulted for datasets that fit
+        payload_size = PAYLOAD_SIZES[(message_number >> 9) & 0x3]
+        if not payload_size:
+            if dataset_count != 1:
+                raise InvalidPacketError("Invalid encoded packet containing a struct: " + bin2hex(buffer))
+            # The structure takes up the rest of the packet, StructureMessage parses the raw TLV data
+            payload_end = end
+        else:
+            payload_end = offset + 2 + payload_size
+            if payload_end > end:
+                raise InvalidPacketError(
+                    f"Packet ends inside dataset {index + 1} of {dataset_count} "
+                    f"(message {message_number:#06x}): " + bin2hex(buffer)
+                )
+        datasets.append((table[message_number], buffer[offset + 2 : payload_end]))
+        offset = payload_end
+    return datasets
+
 
 class NasaPacketParser:
     """Represents a NASA Packet Parser."""
@@ -25,25 +70,41 @@ class NasaPacketParser:
     ) -> None:
         """Init a NASA Packet Parser."""
         self._config = config
-        self._device_handlers: dict[str, list] = {}
-        self._packet_listeners: dict[int, list] = {}
+        self._device_handlers: dict[str, list] = {}  # kwargs style, see MessageEvent.as_kwargs
+        self._device_event_handlers: dict[str, list[Callable[[MessageEvent], None]]] = {}
+        self._device_packet_handlers: dict[str, list[Callable[[PacketHeader], None]]] = {}
+        self._packet_listeners: dict[int, list] = {}  # kwargs style
+        self._event_listeners: dict[int, list[Callable[[MessageEvent], None]]] = {}
         self._new_device_handler = _new_device_handler
         self._pending_read_handler: Callable | None = None  # Callback for handling received read responses
+        self._reply_handler: Callable[[PacketHeader, list[MessageEvent]], object] | None = None
         self._packet_event = Event()
-        self._latest_packet_data: bytes | None = None
+        self.dispatcher = CallbackDispatcher(
+            mode=config.callback_mode,
+            queue_size=config.callback_queue_size,
+            overflow=config.callback_overflow,
+            threads=config.callback_threads,
+        )
+        self._latest_packet: Frame | bytes | None = None
 
     async def get_raw_packet_stream(self):
         """A generator that yields raw packet bytes as they arrive."""
         while True:
             await self._packet_event.wait()
             self._packet_event.clear()
-            if self._latest_packet_data is not None:
-                yield self._latest_packet_data
+            if isinstance(self._latest_packet, Frame):
+                yield self._latest_packet.data
+            elif self._latest_packet is not None:
+                yield self._latest_packet
 
     def set_pending_read_handler(self, handler: Callable | None) -> None:
         """Set the pending read handler callback."""
         self._pending_read_handler = handler
 
+    def set_reply_handler(self, handler: Callable[[PacketHeader, list[MessageEvent]], object] | None) -> None:
+        """Set the callback given the header and events of every RESPONSE, ACK and NACK, after devices are updated."""
+        self._reply_handler = handler
+
     def add_device_handler(self, address: str, callback):
         """Add the device handler."""
         self._device_handlers.setdefault(address, [])
@@ -56,40 +117,82 @@ class NasaPacketParser:
         if callback in self._device_handlers[address]:
             self._device_handlers[address].remove(callback)
 
+    def add_device_event_handler(self, address: str, callback: Callable[[MessageEvent], None]):
+        """Add a device handler that is called with a MessageEvent for every dataset from address."""
+        self._device_event_handlers.setdefault(address, [])
+        if callback not in self._device_event_handlers[address]:
+            self._device_event_handlers[address].append(callback)
+
+    def remove_device_event_handler(self, address: str, callback: Callable[[MessageEvent], None]):
+        """Remove a device event handler."""
+        self._device_event_handlers.setdefault(address, [])
+        if callback in self._device_event_handlers[address]:
+            self._device_event_handlers[address].remove(callback)
+
+    def add_device_packet_handler(self, address: str, callback: Callable[[PacketHeader], None]):
+        """Add a handler that is called with the header of every packet from address, after its datasets."""
+        self._device_packet_handlers.setdefault(address, [])
+        if callback not in self._device_packet_handlers[address]:
+            self._device_packet_handlers[address].append(callback)
+
+    def remove_device_packet_handler(self, address: str, callback: Callable[[PacketHeader], None]):
+        """Remove a device packet handler."""
+        self._device_packet_handlers.setdefault(address, [])
+        if callback in self._device_packet_handlers[address]:
+            self._device_packet_handlers[address].remove(callback)
+
+    def add_event_listener(self, message_number: int, callback: Callable[[MessageEvent], None]):
+        """Add a listener that is called with a MessageEvent for message_number from any source."""
+        self._event_listeners.setdefault(message_number, [])
+        if callback not in self._event_listeners[message_number]:
+            self._event_listeners[message_number].append(callback)
+            self.dispatcher.subscribe(callback)
+
+    def remove_event_listener(self, message_number: int, callback: Callable[[MessageEvent], None]):
+        """Remove an event listener."""
+        self._event_listeners.setdefault(message_number, [])
+        if callback in self._event_listeners[message_number]:
+            self._event_listeners[message_number].remove(callback)
+            self.dispatcher.unsubscribe(callback)
+
     def add_packet_listener(self, message_number: int, callback):
         """Add a packet listener."""
         self._packet_listeners.setdefault(message_number, [])
         if callback not in self._packet_listeners[message_number]:
             self._packet_listeners[message_number].append(callback)
+            self.dispatcher.subscribe(callback)
 
     def remove_packet_listener(self, message_number: int, callback):
         """Remove a packet listener."""
         self._packet_listeners.setdefault(message_number, [])
         if callback in self._packet_listeners[message_number]:
             self._packet_listeners[message_number].remove(callback)
+            self.dispatcher.unsubscribe(callback)
 
-    async def _process_packet(self, *nargs, **kwargs: str | bytes | PacketType | DataType | int | list[list]):
+    async def _process_packet(self, header: PacketHeader, datasets: list[tuple[DecodeEntry, bytes]]):
         """Process a packet."""
-        source_address = str(kwargs["source"]).upper()
-        dest_address = str(kwargs["dest"])
-        payload_type = kwargs["payloadType"]
-        packet_type = kwargs["packetType"]
+        source_address = header.source
+        dest_address = header.dest
+        payload_type = header.payload_type
+        packet_type = header.packet_type
 
-        if kwargs["packetType"] != PacketType.NORMAL:
+        if packet_type != PacketType.NORMAL:
             _LOGGER.error("Ignoring packet due to non-NORMAL packet type: %s", packet_type)
             return
 
+        # One gate for all debug logging of the packet
+        debug = _LOGGER.isEnabledFor(logging.DEBUG)
         # Filter based on payload type and source/destination
         should_process = False
-        # For incoming messages, we process NOTIFICATIONs, WRITEs, and RESPONSEs
-        if payload_type in [DataType.NOTIFICATION, DataType.WRITE, DataType.RESPONSE, DataType.ACK]:
+        if payload_type in _PROCESSED_TYPES:
             should_process = True
-            _LOGGER.debug(
-                "Processing incoming packet (type=%s, payload=%s) from %s.",
-                packet_type,
-                payload_type,
-                source_address,
-            )
+            if debug:
+                _LOGGER.debug(
+                    "Processing incoming packet (type=%s, payload=%s) from %s.",
+                    packet_type,
+                    payload_type,
+                    source_address,
+                )
         elif payload_type == DataType.REQUEST:
             # Incoming REQUESTs are currently ignored as per original logic's implicit filter
             _LOGGER.debug("Ignoring incoming packet with payload type REQUEST from %s.", source_address)
@@ -99,17 +202,22 @@ class NasaPacketParser:
             _LOGGER.warning(
                 "Received NACK from %s for packet number %s.",
                 source_address,
-                kwargs["packetNumber"],
+                header.packet_number,
             )
             # Notify pending read handler about the NACK
             if self._pending_read_handler:
-                message_numbers = [ds[0] for ds in kwargs.get("dataSets", []) if isinstance(ds, list) and len(ds) > 0]
+                message_numbers = [entry.message_id for entry, _ in datasets]
                 try:
                     result = self._pending_read_handler(source_address, message_numbers)
                     if iscoroutinefunction(self._pending_read_handler):
                         await result
                 except Exception as e:
                     _LOGGER.error("Error in pending_read_handler: %s", e)
+            if self._reply_handler is not None:
+                try:
+                    self._reply_handler(header, [])
+                except Exception as e:
+                    _LOGGER.error("Error in reply handler: %s", e)
             # Return early - NACKs don't have valid dataSets to process
             return
         else:
@@ -125,13 +233,8 @@ class NasaPacketParser:
         # Note: NACK is handled separately above to avoid processing invalid dataSets
         if payload_type in [DataType.RESPONSE, DataType.ACK] and self._pending_read_handler:
             # For both RESPONSE and ACK packets, extract message numbers from the datasets
-            message_numbers = []
-            for ds in kwargs.get("dataSets", []):  # type: ignore
-                if isinstance(ds, list) and len(ds) > 0:
-                    message_numbers.append(ds[0])
-
-            # Call handler with the extracted message numbers
             # Empty message_numbers is valid for ACK packets that acknowledge without specific message IDs
+            message_numbers = [entry.message_id for entry, _ in datasets]
             try:
                 result = self._pending_read_handler(source_address, message_numbers)
                 # Handle async callbacks
@@ -140,87 +243,53 @@ class NasaPacketParser:
             except Exception as e:
                 _LOGGER.error("Error in pending_read_handler: %s", e)
 
-        for ds in kwargs["dataSets"]:  # type: ignore
-            if not isinstance(ds, list):
-                _LOGGER.warning("Invalid data set: %s", ds)
-                continue
-            msg_number = ds[0]
-            formatted_msg_number = f"0x{msg_number:04x}"
-            # Check if this is a structure message by checking if the payload is bytes
-            if len(ds) >= 3 and isinstance(ds[2], bytes):
-                # Structure message: index 2 contains raw bytes that StructureMessage will parse
-                struct_payload = ds[2]
-                description = ds[1]
-                # Pass raw bytes to StructureMessage for parsing
-                try:
-                    parsed_message = parse_message(msg_number, struct_payload)
-                    if (
-                        str(self._config.address) == kwargs["dest"]
-                        or self._config.log_all_messages
-                        or kwargs["dest"] in self._config.devices_to_log
-                    ):
-                        _LOGGER.debug(
-                            "Parsed structure message %s (%s): %s",
-                            formatted_msg_number,
-                            description,
-                            {**parsed_message.as_dict},
-                        )
-                except Exception as e:
-                    _LOGGER.error("Failed to parse structure message %s (%s): %s", formatted_msg_number, description, e)
-                    continue
-            elif len(ds) >= 4:
-                # Normal message: index 3 contains the value_bytes
-                payload_bytes = ds[3]
-                description = ds[1]
-                try:
-                    parsed_message = parse_message(ds[0], payload_bytes)
-                    if (
-                        str(self._config.address) == kwargs["dest"]
-                        or self._config.log_all_messages
-                        or kwargs["dest"] in self._config.devices_to_log
-                        or ds[0] in self._config.messages_to_log
-                    ):
-                        _LOGGER.debug(
-                            "Parsed message %s (%s): %s",
-                            formatted_msg_number,
-                            description,
-                            {**parsed_message.as_dict, "raw_payload": payload_bytes.hex()},
-                        )
-                except Exception as e:
-                    _LOGGER.error("Failed to parse message %s (%s): %s", formatted_msg_number, description, e)
-                    continue
-            else:
-                _LOGGER.warning("Invalid data set: %s", ds)
-                continue
-
-            # Prepare arguments for handlers
-            handler_kwargs = {
-                "source": source_address,
-                "source_class": kwargs.get("source_class", AddressClass.UNKNOWN),
-                "dest": dest_address,
-                "dest_class": kwargs.get("dest_class", AddressClass.UNKNOWN),
-                "isInfo": kwargs["isInfo"],
-                "protocolVersion": kwargs["protocolVersion"],
-                "retryCounter": kwargs["retryCounter"],
-                "packetType": packet_type,
-                "payloadType": payload_type,
-                "packetNumber": kwargs["packetNumber"],
-                "formattedMessageNumber": formatted_msg_number,
-                "messageNumber": msg_number,
-                "packet": parsed_message,
-            }
+        # The log filter is only consulted when debug logging is on
+        log_filter = self._config.log_filter if debug else None
+        log_dest = log_filter is not None and log_filter.logs_dest(dest_address)
+        # Handlers are looked up once per packet, every dataset of a packet comes from the same source,
+        # and again after the new device handler has run for an unknown source.
+        device_handlers = self._device_handlers.get(source_address)
+        device_event_handlers = self._device_event_handlers.get(source_address)
+        known_source = device_handlers is not None or device_event_handlers is not None
+        # Replies are passed on with their events once every handler has seen them
+        reply_events: list[MessageEvent] | None = (
+            [] if self._reply_handler is not None and payload_type in (DataType.RESPONSE, DataType.ACK) else None
+        )
+        for entry, payload_bytes in datasets:
+            msg_number = entry.message_id
+            # Decoding is deferred until something reads the value, most notifications are never read.
+            event = MessageEvent(header, msg_number, entry.lazy(payload_bytes))
+            if reply_events is not None:
+                reply_events.append(event)
+            if log_filter is not None and (log_dest or msg_number in log_filter.messages):
+                _LOGGER.debug(
+                    "Parsed %s %s (%s): %s",
+                    "structure message" if entry.flags & MessageFlags.STRUCTURE else "message",
+                    event.formatted_message_number,
+                    entry.name,
+                    {**event.message.as_dict, "raw_payload": payload_bytes.hex()},
+                )
 
-            # Dispatch to the appropriate device handler(s)
-            target_handler_address: str = source_address
+            # kwargs for the kwargs style handlers, only built if one of them is registered
+            handler_kwargs = None
 
-            if target_handler_address in self._device_handlers:
-                for handler in self._device_handlers[target_handler_address]:
+            # Dispatch to the appropriate device handler(s)
+            if known_source:
+                for handler in device_event_handlers or ():
                     try:
-                        handler(**handler_kwargs)
+                        handler(event)
                     except Exception as e:
-                        _LOGGER.error("Error in device %s handler: %s", target_handler_address, e)
+                        _LOGGER.error("Error in device %s handler: %s", source_address, e)
+                if device_handlers:
+                    handler_kwargs = event.as_kwargs()
+                    for handler in device_handlers:
+                        try:
+                            handler(**handler_kwargs)
+                        except Exception as e:
+                            _LOGGER.error("Error in device %s handler: %s", source_address, e)
             elif self._new_device_handler is not None:
                 # Only call new device handler for incoming packets from unknown sources
+                handler_kwargs = event.as_kwargs()
                 try:
                     if callable(self._new_device_handler) and not iscoroutinefunction(self._new_device_handler):
                         self._new_device_handler(**handler_kwargs)
@@ -228,97 +297,63 @@ class NasaPacketParser:
                         await self._new_device_handler(**handler_kwargs)
                 except Exception as e:
                     _LOGGER.exception("Error in new device event handler: %s", e)
+                # The handler usually registers the device, the rest of the packet goes to it
+                device_handlers = self._device_handlers.get(source_address)
+                device_event_handlers = self._device_event_handlers.get(source_address)
+                known_source = device_handlers is not None or device_event_handlers is not None
 
             # some devices can mirror the state of another device (indoor units for current action)
             # broadcast this via the packet handlers
+            if msg_number in self._event_listeners:
+                for listener in self._event_listeners[msg_number]:
+                    self.dispatcher.call(listener, event, key=(source_address, msg_number))
             if msg_number in self._packet_listeners:
+                if handler_kwargs is None:
+                    handler_kwargs = event.as_kwargs()
                 for listener in self._packet_listeners[msg_number]:
-                    listener(**handler_kwargs)
+                    self.dispatcher.call(listener, key=(source_address, msg_number), **handler_kwargs)
+
+        if datasets and (device_packet_handlers := self._device_packet_handlers.get(source_address)):
+            for handler in device_packet_handlers:
+                try:
+                    handler(header)
+                except Exception as e:
+                    _LOGGER.error("Error in device %s packet handler: %s", source_address, e)
+
+        if reply_events is not None:
+            try:
+                self._reply_handler(header, reply_events)
+            except Exception as e:
+                _LOGGER.error("Error in reply handler: %s", e)
 
-    async def parse_packet(self, packet_data: bytes):
-        """Parse a NASA packet and process its contents."""
-        self._latest_packet_data = packet_data
+        if self.dispatcher.blocked:
+            # Callbacks are behind with the block overflow policy, stop reading until they catch up
+            await self.dispatcher.wait_for_room()
+
+    async def parse_packet(self, packet: Frame | bytes):
+        """Parse a NASA packet and process its contents.
+
+        Accepts either a `Frame` from the frame decoder, whose header has already
+        been parsed, or raw packet data.
+        """
+        if isinstance(packet, Frame):
+            # Walk the frame in place rather than copying out the packet data.
+            header = packet.header
+            buffer = packet.raw
+            offset, end = 3 + HEADER_LENGTH, len(buffer) - 3
+        else:
+            if len(packet) < HEADER_LENGTH:
+                return  # too short
+            header = PacketHeader.parse(packet)
+            buffer = packet
+            offset, end = HEADER_LENGTH, len(buffer)
+        self._latest_packet = packet
         self._packet_event.set()
 
-        if len(packet_data) < 3 + 3 + 1 + 1 + 1 + 1:
-            return  # too short
-        source_address = bin2hex(packet_data[0:3])
-        try:
-            source_class = AddressClass(packet_data[0])
-        except ValueError:
-            source_class = AddressClass.UNKNOWN
-        destination_address = bin2hex(packet_data[3:6])
-        try:
-            destination_class = AddressClass(packet_data[3])
-        except ValueError:
-            destination_class = AddressClass.UNKNOWN
-        is_info = (packet_data[6] & 0x80) >> 7
-        protocol_version = (packet_data[6] & 0x60) >> 5
-        retry_count = (packet_data[6] & 0x18) >> 3
-        try:
-            packet_type = PacketType(packet_data[7] >> 4)
-        except ValueError:
-            packet_type = PacketType.UNKNOWN
         try:
-            payload_type = DataType(packet_data[7] & 0xF)
-        except ValueError:
-            payload_type = DataType.UNKNOWN
-        packet_number = packet_data[8]
-        dataset_count = packet_data[9]
-
-        datasets = []
-        offset = 10
-        seen_message_count = 0
-        message_number = None
-        for i in range(0, dataset_count):
-            seen_message_count += 1
-            message_type_kind = (packet_data[offset] & 0x6) >> 1
-            if message_type_kind == 0:
-                payload_size = 1
-            elif message_type_kind == 1:
-                payload_size = 2
-            elif message_type_kind == 2:
-                payload_size = 4
-            elif message_type_kind == 3:
-                if dataset_count != 1:
-                    raise BaseException("Invalid encoded packet containing a struct: " + bin2hex(packet_data))
-                # Extract message number from first two bytes
-                message_number = struct.unpack(">H", packet_data[offset : offset + 2])[0]
-                # Pass raw structure data (everything after message number) directly to StructureMessage
-                struct_payload = packet_data[offset + 2 :]
-                try:
-                    message_description = get_nasa_message_name(message_number)
-                except Exception:
-                    message_description = "STRUCTURE"
-                # Store the structure with raw bytes for StructureMessage to parse
-                datasets.append([message_number, message_description, struct_payload])
-                offset += 2 + len(struct_payload)
-                continue
-            else:
-                raise BaseException("Invalid message type kind value")
-            message_number = struct.unpack(">H", packet_data[offset : offset + 2])[0]
-            value = packet_data[offset + 2 : offset + 2 + payload_size]
-            value_hex = bin2hex(value)
-            try:
-                message_description = get_nasa_message_name(message_number)
-            except Exception:
-                message_description = "UNSPECIFIED"
-            datasets.append([message_number, message_description, value_hex, value])
-            offset += 2 + payload_size
-
-        if seen_message_count != dataset_count:
-            raise BaseException("Not every message processed")
-
-        await self._process_packet(
-            source=source_address,
-            source_class=source_class,
-            dest=destination_address,
-            dest_class=destination_class,
-            isInfo=is_info,
-            protocolVersion=protocol_version,
-            retryCounter=retry_count,
-            packetType=packet_type,
-            payloadType=payload_type,
-            packetNumber=packet_number,
-            dataSets=datasets,
-        )
+            datasets = read_datasets(buffer, offset, end, header.dataset_count)
+        except InvalidPacketError as ex:
+            _LOGGER.warning("Dropping packet from %s: %s", header.source, ex)
+            return
+
+        await self._process_packet(header, datasets)
@@ -0,0 +1,65 @@
+"""In-memory trace of recent NASA frames."""
+
+from __future__ import annotations
+
+import time
+
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from ..helpers import bin2hex
+
+RX = "rx"
+TX = "tx"
+
+
+@dataclass(frozen=True, slots=True)
+class TraceRecord:
+    """A frame captured by a FrameTrace."""
+
+    timestamp: float  # time.time() when the frame was recorded
+    direction: str  # RX or TX
+    raw: bytes  # The complete frame, STX to ETX
+
+    def __str__(self) -> str:
+        return f"{self.timestamp:.3f} {self.direction} {bin2hex(self.raw)}"
+
+
+class FrameTrace:
+    """Fixed-size ring of the most recently received and sent frames.
+
+    Recording only appends a reference to the raw frame bytes, no formatting is
+    done until the trace is dumped, so it can stay enabled in production and be
+    inspected after a problem is seen.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Init a frame trace holding up to size frames."""
+        if size <= 0:
+            raise ValueError("Trace size must be greater than zero.")
+        self._frames: deque[tuple[float, str, bytes]] = deque(maxlen=size)
+
+    @property
+    def size(self) -> int:
+        """Return the maximum number of frames held."""
+        return self._frames.maxlen  # type: ignore[return-value]
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __iter__(self) -> Iterator[TraceRecord]:
+        for timestamp, direction, raw in tuple(self._frames):
+            yield TraceRecord(timestamp, direction, raw)
+
+    def record(self, direction: str, raw: bytes) -> None:
+        """Record a frame, the oldest frame is dropped once the trace is full."""
+        self._frames.append((time.time(), direction, raw))
+
+    def clear(self) -> None:
+        """Drop all recorded frames."""
+        self._frames.clear()
+
+    def dump(self) -> str:
+        """Return the recorded frames oldest first, one line per frame."""
+        return "\n".join(str(record) for record in self)
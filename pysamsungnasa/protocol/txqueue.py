@@ -0,0 +1,140 @@
+"""Priority queue for frames waiting to be sent."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from collections import deque
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+
+class TxPriority(IntEnum):
+    """Send classes, lower values are sent first."""
+
+    INTERACTIVE = 0  # Writes and requests made by the user
+    RETRY = 1  # Resends from the retry manager
+    POLL = 2  # Reads
+
+
+@dataclass(slots=True)
+class _TxEntry:
+    frame: bytes
+    priority: TxPriority
+    key: Hashable | None
+    enqueued: float
+    dropped: bool = field(default=False)
+
+
+class TxQueue:
+    """Queue of encoded frames, served by priority class.
+
+    Frames are sent highest class first and in order within a class. So a lower
+    class is not starved, a frame that has waited `max_wait` seconds or more is
+    sent before newer frames of any class. A frame queued with a key supersedes
+    frames with the same key still queued in the same or a lower class, which are
+    dropped. It has the get/task_done/join interface of asyncio.Queue for the writer.
+    """
+
+    def __init__(self, max_wait: float = 2.0, clock: Callable[[], float] = time.monotonic) -> None:
+        """Init an empty queue, clock gives the time frames were queued."""
+        self.max_wait = max_wait
+        self._clock = clock
+        self._queues: dict[TxPriority, deque[_TxEntry]] = {priority: deque() for priority in TxPriority}
+        self._depths: dict[TxPriority, int] = dict.fromkeys(TxPriority, 0)
+        self._keys: dict[Hashable, _TxEntry] = {}
+        self._not_empty = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._unfinished = 0
+        self.dropped = 0  # Frames superseded before they were sent
+
+    def qsize(self) -> int:
+        """Return the number of frames waiting to be sent."""
+        return sum(self._depths.values())
+
+    def empty(self) -> bool:
+        """Return True if no frames are waiting."""
+        return self.qsize() == 0
+
+    def depth(self, priority: TxPriority) -> int:
+        """Return the number of frames waiting in a class."""
+        return self._depths[priority]
+
+    @property
+    def depths(self) -> dict[TxPriority, int]:
+        """Return the number of frames waiting in each class."""
+        return dict(self._depths)
+
+    def put_nowait(
+        self, frame: bytes, priority: TxPriority = TxPriority.INTERACTIVE, key: Hashable | None = None
+    ) -> None:
+        """Queue a frame, dropping queued frames it supersedes."""
+        entry = _TxEntry(frame, priority, key, self._clock())
+        if key is not None:
+            previous = self._keys.get(key)
+            if previous is not None and not previous.dropped and previous.priority >= priority:
+                previous.dropped = True
+                self._depths[previous.priority] -= 1
+                self.dropped += 1
+                self.task_done()
+            self._keys[key] = entry
+        self._queues[priority].append(entry)
+        self._depths[priority] += 1
+        self._unfinished += 1
+        self._finished.clear()
+        self._not_empty.set()
+
+    async def put(
+        self, frame: bytes, priority: TxPriority = TxPriority.INTERACTIVE, key: Hashable | None = None
+    ) -> None:
+        """Queue a frame, the queue is unbounded so this never waits."""
+        self.put_nowait(frame, priority, key)
+
+    def _next_queue(self) -> deque[_TxEntry] | None:
+        """Return the queue to take the next frame from, None if all are empty."""
+        for queue in self._queues.values():
+            while queue and queue[0].dropped:
+                queue.popleft()
+        heads = [queue for queue in self._queues.values() if queue]
+        if not heads:
+            return None
+        overdue = self._clock() - self.max_wait
+        oldest = min(heads, key=lambda queue: queue[0].enqueued)
+        if oldest[0].enqueued <= overdue:
+            return oldest
+        return heads[0]
+
+    def get_nowait(self) -> bytes:
+        """Return the next frame, raises asyncio.QueueEmpty if there is none."""
+        queue = self._next_queue()
+        if queue is None:
+            self._not_empty.clear()
+            raise asyncio.QueueEmpty
+        entry = queue.popleft()
+        self._depths[entry.priority] -= 1
+        if entry.key is not None and self._keys.get(entry.key) is entry:
+            del self._keys[entry.key]
+        return entry.frame
+
+    async def get(self) -> bytes:
+        """Wait for and return the next frame."""
+        while True:
+            try:
+                return self.get_nowait()
+            except asyncio.QueueEmpty:
+                await self._not_empty.wait()
+
+    def task_done(self) -> None:
+        """Mark a frame taken from the queue as handled."""
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    async def join(self) -> None:
+        """Wait until every queued frame has been handled."""
+        await self._finished.wait()
@@ -0,0 +1,53 @@
+"""Deadline timers for requests waiting to be retried."""
+
+from __future__ import annotations
+
+import asyncio
+
+from collections.abc import Hashable
+
+
+class RetryTimers:
+    """One timer per pending request, each fires exactly when its retry is due.
+
+    Timers are `loop.call_at` handles, kept in the event loop's own deadline heap,
+    so nothing runs while no retry is due. A due key is put on a queue that the
+    retry manager waits on.
+    """
+
+    def __init__(self) -> None:
+        """Init with no timers."""
+        self._handles: dict[Hashable, asyncio.TimerHandle] = {}
+        self._due: asyncio.Queue[Hashable] = asyncio.Queue()
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._handles
+
+    def schedule(self, key: Hashable, when: float) -> None:
+        """Fire key at when, in event loop time, replacing its previous timer."""
+        self.cancel(key)
+        self._handles[key] = asyncio.get_running_loop().call_at(when, self._fire, key)
+
+    def cancel(self, key: Hashable) -> None:
+        """Stop the timer for key, if there is one."""
+        if (handle := self._handles.pop(key, None)) is not None:
+            handle.cancel()
+
+    def cancel_all(self) -> None:
+        """Stop every timer and forget keys that are due but not taken yet."""
+        for handle in self._handles.values():
+            handle.cancel()
+        self._handles.clear()
+        while not self._due.empty():
+            self._due.get_nowait()
+
+    def _fire(self, key: Hashable) -> None:
+        del self._handles[key]
+        self._due.put_nowait(key)
+
+    async def next_due(self) -> Hashable:
+        """Wait for the next key that is due."""
+        return await self._due.get()
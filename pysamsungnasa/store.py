@@ -0,0 +1,151 @@
+"""Keep the latest numeric value of every attribute of a device in flat arrays."""
+
+from __future__ import annotations
+
+import functools
+
+from array import array
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+
+from .protocol.factory.types import BaseMessage, BoolMessage, EnumMessage, FloatMessage, IntegerMessage
+
+_NumericReader = Callable[[bytes], tuple[int, float]]
+
+_MAX_PAYLOAD = 4  # Numeric payloads are 1, 2 or 4 bytes, longer ones would not fit the raw column
+
+
+@functools.cache
+def _numeric_reader(message_class: type[BaseMessage]) -> _NumericReader | None:
+    """Return a function reading (raw, value) from a payload of message_class, or None if it is not numeric.
+
+    Only classes that inherit parse_payload unchanged are read, their value is known
+    from the payload alone; classes with their own parse_payload are left out.
+    """
+    parse_payload = message_class.parse_payload.__func__  # type: ignore[attr-defined]
+    if parse_payload is FloatMessage.parse_payload.__func__:
+        signed = message_class.SIGNED  # type: ignore[attr-defined]
+        arithmetic = message_class.ARITHMETIC  # type: ignore[attr-defined]
+
+        def read_float(payload: bytes) -> tuple[int, float]:
+            raw = int.from_bytes(payload, "big", signed=signed)
+            return raw, float(raw) * arithmetic
+
+        return read_float
+    if parse_payload is EnumMessage.parse_payload.__func__:
+        return lambda payload: (payload[0], float(payload[0]))
+    if parse_payload is BoolMessage.parse_payload.__func__:
+        return lambda payload: (payload[0], 1.0 if payload[0] else 0.0)
+    if parse_payload is IntegerMessage.parse_payload.__func__:
+
+        def read_integer(payload: bytes) -> tuple[int, float]:
+            raw = int.from_bytes(payload, "big")
+            return raw, float(raw)
+
+        return read_integer
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class ValueSnapshot:
+    """Copies of the columns of a ValueStore, one entry per message ID in the same order."""
+
+    message_ids: array  # "H"
+    values: array  # "d", the decoded value, enum members and booleans as their number
+    raw: array  # "q", the payload as an integer
+    timestamps: array  # "d", seconds since the epoch the value was last received, changed or not
+    sequences: array  # "Q", sequence number of the last change
+
+
+class ValueStore:
+    """Latest numeric value of every attribute, in parallel arrays with one slot per message ID.
+
+    A message ID gets the next free slot the first time it is seen and keeps it, so an
+    update is a dict lookup and four array writes. Every change takes the next
+    sequence number of the store, so changed_since(sequence) returns what changed
+    after a snapshot. Only float, enum, bool and integer messages are stored, the
+    values are read straight from the raw payload without decoding the message.
+    """
+
+    def __init__(self) -> None:
+        """Init an empty store."""
+        self._slots: dict[int, int] = {}
+        self.message_ids = array("H")
+        self.values = array("d")
+        self.raw = array("q")
+        self.timestamps = array("d")
+        self.sequences = array("Q")
+        self.sequence = 0  # Sequence number of the last change
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, message_id: object) -> bool:
+        return message_id in self._slots
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._slots)
+
+    def slot(self, message_id: int) -> int | None:
+        """Return the index of message_id in the columns, or None if it has not been stored."""
+        return self._slots.get(message_id)
+
+    def update(self, message_id: int, value: float, raw: int, timestamp: float) -> None:
+        """Store a new value for message_id."""
+        self.sequence += 1
+        slot = self._slots.get(message_id)
+        if slot is None:
+            self._slots[message_id] = len(self.message_ids)
+            self.message_ids.append(message_id)
+            self.values.append(value)
+            self.raw.append(raw)
+            self.timestamps.append(timestamp)
+            self.sequences.append(self.sequence)
+            return
+        self.values[slot] = value
+        self.raw[slot] = raw
+        self.timestamps[slot] = timestamp
+        self.sequences[slot] = self.sequence
+
+    def update_message(self, message_id: int, message: BaseMessage, timestamp: float) -> bool:
+        """Store the value of a received message, returns False if the message is not numeric."""
+        reader = _numeric_reader(type(message))
+        payload = message.RAW_PAYLOAD
+        if reader is None or not payload or len(payload) > _MAX_PAYLOAD:
+            return False
+        raw, value = reader(payload)
+        self.update(message_id, value, raw, timestamp)
+        return True
+
+    def touch(self, message_id: int, timestamp: float) -> None:
+        """Record that message_id was received again unchanged, only its timestamp moves."""
+        slot = self._slots.get(message_id)
+        if slot is not None:
+            self.timestamps[slot] = timestamp
+
+    def get(self, message_id: int, default: float | None = None) -> float | None:
+        """Return the stored value of message_id, or default."""
+        slot = self._slots.get(message_id)
+        return default if slot is None else self.values[slot]
+
+    def snapshot(self) -> ValueSnapshot:
+        """Return a copy of every column."""
+        return ValueSnapshot(
+            message_ids=array("H", self.message_ids),
+            values=array("d", self.values),
+            raw=array("q", self.raw),
+            timestamps=array("d", self.timestamps),
+            sequences=array("Q", self.sequences),
+        )
+
+    def as_dict(self) -> dict[int, float]:
+        """Return the stored values by message ID."""
+        return dict(zip(self.message_ids, self.values))
+
+    def changed_since(self, sequence: int) -> dict[int, float]:
+        """Return the values by message ID that changed after the given sequence number."""
+        return {
+            message_id: value
+            for message_id, value, changed in zip(self.message_ids, self.values, self.sequences)
+            if changed > sequence
+        }
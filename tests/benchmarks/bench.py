@@ -0,0 +1,345 @@
+"""Benchmark the RX pipeline with the ehs_mono fixture dumps.
+
+Every stage is timed on its own and end to end:
+
+- framing: FrameDecoder.feed over the byte stream, including the CRC check
+- crc: the CRC of every frame
+- parse_packet: NasaPacketParser.parse_packet of every frame, no handlers
+- parse_message: parse_message of every dataset
+- device: NasaDevice.handle_event with a device and a packet callback
+- end_to_end: bytes through the decoder and parser into devices with callbacks
+
+Run from the repository root:
+
+    python -m tests.benchmarks.bench                                   # print results
+    python -m tests.benchmarks.bench --save tests/benchmarks/baseline.json
+    python -m tests.benchmarks.bench --compare tests/benchmarks/baseline.json
+
+With --compare the exit code is 1 if a stage is slower than the baseline by more
+than --tolerance, or keeps more allocations per frame. Timings depend on the
+machine, refresh the baseline when running on different hardware.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import binascii
+import gc
+import json
+import struct
+import sys
+import time
+import tracemalloc
+
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.device import NasaDevice
+from pysamsungnasa.protocol import Frame, FrameDecoder
+from pysamsungnasa.protocol.factory import DECODE_TABLE, MessageFlags, parse_message
+from pysamsungnasa.protocol.packet import MessageEvent
+from pysamsungnasa.protocol.parser import NasaPacketParser
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "ehs_mono"
+
+REPEATS = 20  # Passes over the fixtures per timed run
+RUNS = 5  # Timed runs per stage, the fastest is reported
+TOLERANCE = 0.25  # Allowed throughput drop against a baseline
+ALLOCATION_TOLERANCE = 0.5  # Allowed increase of allocations per frame against a baseline
+
+
+def load_dump(path: Path) -> list[bytes]:
+    """Load a CLI device dump as a list of packet data (without framing)."""
+    packets = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        data = bytes.fromhex(line.strip())
+        # Dumps written by the CLI encode the packet number as two bytes, drop the high byte.
+        packets.append(data[:8] + data[9:])
+    return packets
+
+
+def wrap_frame(packet_data: bytes) -> bytes:
+    """Wrap packet data with STX, size, CRC and ETX."""
+    return (
+        b"\x32"
+        + struct.pack(">H", len(packet_data) + 4)
+        + packet_data
+        + struct.pack(">H", binascii.crc_hqx(packet_data, 0))
+        + b"\x34"
+    )
+
+
+def load_packets() -> list[bytes]:
+    """Return the packet data of every ehs_mono fixture dump."""
+    packets = []
+    for path in sorted(FIXTURES_DIR.glob("*_dump.hex")):
+        packets.extend(load_dump(path))
+    return packets
+
+
+@dataclass(frozen=True, slots=True)
+class BenchResult:
+    """Throughput and allocations of one stage."""
+
+    stage: str
+    frames: int  # Frames per pass over the fixtures
+    datasets: int  # Datasets per pass over the fixtures
+    frames_per_second: float
+    datasets_per_second: float
+    allocations_per_frame: float  # Memory blocks still allocated after one pass, per frame
+    allocated_bytes_per_frame: float  # Peak traced memory during one pass, per frame
+
+
+@dataclass(frozen=True, slots=True)
+class Regression:
+    """A stage that is worse than its baseline."""
+
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return f"{self.stage}: {self.metric} {self.current:,.1f} against a baseline of {self.baseline:,.1f}"
+
+
+class Pipeline:
+    """The fixture data prepared for each stage, and one pass of every stage."""
+
+    def __init__(self, packets: list[bytes]) -> None:
+        """Init the pipeline from packet data."""
+        self.loop = asyncio.new_event_loop()
+        self.packets = packets
+        self.raw_frames = [wrap_frame(packet) for packet in packets]
+        self.stream = b"".join(self.raw_frames)
+        self.frames: list[Frame] = list(FrameDecoder().feed(self.stream))
+        self.datasets = sum(frame.header.dataset_count for frame in self.frames)
+        self.config = NasaConfig()
+        self.callback_calls = 0
+
+        # Events as the parser dispatches them, captured once for the parse_message and device stages
+        self.events: list[MessageEvent] = []
+        capture = NasaPacketParser(self.config)
+        for source in {frame.header.source for frame in self.frames}:
+            capture.add_device_event_handler(source, self.events.append)
+        self.loop.run_until_complete(self._parse_all(capture, self.frames))
+        self.messages = [(event.message_number, event.message.RAW_PAYLOAD) for event in self.events]
+
+        self.parser = NasaPacketParser(self.config)
+        self.device_parser = NasaPacketParser(self.config)
+        self.devices: dict[str, NasaDevice] = {}
+        message_classes = {
+            DECODE_TABLE[event.message_number].message_class
+            for event in self.events
+            if DECODE_TABLE[event.message_number].flags & MessageFlags.KNOWN
+        }
+        for frame in self.frames:
+            header = frame.header
+            if header.source in self.devices:
+                continue
+            device = NasaDevice(
+                header.source, header.source_class, self.device_parser, self.config, None  # type: ignore[arg-type]
+            )
+            device.add_device_callback(self._callback)
+            for message_class in message_classes:
+                device.add_packet_event_callback(message_class, self._callback)
+            self.devices[header.source] = device
+
+    def close(self) -> None:
+        """Close the event loop used by the async stages."""
+        self.loop.close()
+
+    def _callback(self, *_args) -> None:
+        self.callback_calls += 1
+
+    @staticmethod
+    async def _parse_all(parser: NasaPacketParser, frames: list[Frame]) -> None:
+        for frame in frames:
+            await parser.parse_packet(frame)
+
+    def framing(self) -> list:
+        """Frame the byte stream."""
+        return list(FrameDecoder().feed(self.stream))
+
+    def crc(self) -> list:
+        """Calculate the CRC of every frame."""
+        crc_hqx = binascii.crc_hqx
+        return [crc_hqx(memoryview(raw)[3:-3], 0) for raw in self.raw_frames]
+
+    def parse_packet(self) -> list:
+        """Parse every frame without any handlers."""
+        self.loop.run_until_complete(self._parse_all(self.parser, self.frames))
+        return []
+
+    def parse_message(self) -> list:
+        """Decode every dataset."""
+        return [parse_message(message_number, payload) for message_number, payload in self.messages]
+
+    def device(self) -> list:
+        """Dispatch every dataset to its device."""
+        devices = self.devices
+        for event in self.events:
+            devices[event.header.source].handle_event(event)
+        return []
+
+    def end_to_end(self) -> list:
+        """Frame, parse and dispatch the byte stream to devices."""
+        frames = list(FrameDecoder().feed(self.stream))
+        self.loop.run_until_complete(self._parse_all(self.device_parser, frames))
+        return frames
+
+    @property
+    def stages(self) -> dict[str, Callable[[], list]]:
+        """Return every stage by name, in pipeline order."""
+        return {
+            "framing": self.framing,
+            "crc": self.crc,
+            "parse_packet": self.parse_packet,
+            "parse_message": self.parse_message,
+            "device": self.device,
+            "end_to_end": self.end_to_end,
+        }
+
+
+def _time_stage(stage: Callable[[], list], repeats: int) -> float:
+    """Return the seconds taken by repeats passes of a stage."""
+    started = time.perf_counter()
+    for _ in range(repeats):
+        stage()
+    return time.perf_counter() - started
+
+
+def _measure_allocations(stage: Callable[[], list], frames: int) -> tuple[float, float]:
+    """Return the memory blocks kept and the peak bytes traced during one pass, per frame."""
+    stage()  # Warm up caches such as the decode table and device attribute dicts
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        blocks = sys.getallocatedblocks()
+        result = stage()
+        blocks = sys.getallocatedblocks() - blocks
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    del result
+    return max(blocks, 0) / frames, peak / frames
+
+
+def run(
+    pipeline: Pipeline | None = None, repeats: int = REPEATS, runs: int = RUNS, stages: list[str] | None = None
+) -> list[BenchResult]:
+    """Run the benchmarks and return one result per stage."""
+    own_pipeline = pipeline is None
+    pipeline = pipeline or Pipeline(load_packets())
+    frames = len(pipeline.frames)
+    results = []
+    for name, stage in pipeline.stages.items():
+        if stages and name not in stages:
+            continue
+        allocations, allocated_bytes = _measure_allocations(stage, frames)
+        best = min(_time_stage(stage, repeats) for _ in range(runs))
+        results.append(
+            BenchResult(
+                stage=name,
+                frames=frames,
+                datasets=pipeline.datasets,
+                frames_per_second=frames * repeats / best,
+                datasets_per_second=pipeline.datasets * repeats / best,
+                allocations_per_frame=allocations,
+                allocated_bytes_per_frame=allocated_bytes,
+            )
+        )
+    if own_pipeline:
+        pipeline.close()
+    return results
+
+
+def compare(
+    results: list[BenchResult],
+    baseline: list[BenchResult],
+    tolerance: float = TOLERANCE,
+    allocation_tolerance: float = ALLOCATION_TOLERANCE,
+) -> list[Regression]:
+    """Return the stages that are slower, or allocate more, than their baseline."""
+    baseline_by_stage = {result.stage: result for result in baseline}
+    regressions = []
+    for result in results:
+        base = baseline_by_stage.get(result.stage)
+        if base is None:
+            continue
+        if result.frames_per_second < base.frames_per_second * (1 - tolerance):
+            regressions.append(
+                Regression(result.stage, "frames/s", base.frames_per_second, result.frames_per_second)
+            )
+        # Small absolute slack so stages that keep almost nothing do not fail on interpreter noise
+        if result.allocations_per_frame > base.allocations_per_frame * (1 + allocation_tolerance) + 1:
+            regressions.append(
+                Regression(result.stage, "allocations/frame", base.allocations_per_frame, result.allocations_per_frame)
+            )
+    return regressions
+
+
+def save(results: list[BenchResult], path: Path) -> None:
+    """Write results as a JSON baseline."""
+    payload = {
+        "python": sys.version.split()[0],
+        "results": [
+            {key: round(value, 2) if isinstance(value, float) else value for key, value in asdict(result).items()}
+            for result in results
+        ],
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+def load(path: Path) -> list[BenchResult]:
+    """Read results from a JSON baseline."""
+    return [BenchResult(**result) for result in json.loads(path.read_text(encoding="utf-8"))["results"]]
+
+
+def format_results(results: list[BenchResult], baseline: list[BenchResult] | None = None) -> str:
+    """Return the results as a table, with the change against the baseline if one is given."""
+    baseline_by_stage = {result.stage: result for result in baseline or ()}
+    lines = [f"{'stage':<14}{'frames/s':>12}{'datasets/s':>12}{'allocs/frame':>14}{'bytes/frame':>13}{'change':>9}"]
+    for result in results:
+        base = baseline_by_stage.get(result.stage)
+        change = f"{result.frames_per_second / base.frames_per_second - 1:+.0%}" if base else ""
+        lines.append(
+            f"{result.stage:<14}{result.frames_per_second:>12,.0f}{result.datasets_per_second:>12,.0f}"
+            f"{result.allocations_per_frame:>14.1f}{result.allocated_bytes_per_frame:>13,.0f}{change:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmarks from the command line."""
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--save", type=Path, help="write the results to a JSON baseline")
+    arg_parser.add_argument("--compare", type=Path, help="compare against a JSON baseline, exit 1 on a regression")
+    arg_parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed throughput drop (0.25)")
+    arg_parser.add_argument("--repeats", type=int, default=REPEATS, help="passes over the fixtures per run")
+    arg_parser.add_argument("--runs", type=int, default=RUNS, help="timed runs per stage, the fastest is kept")
+    arg_parser.add_argument("--stage", action="append", help="only run this stage, may be repeated")
+    args = arg_parser.parse_args(argv)
+
+    results = run(repeats=args.repeats, runs=args.runs, stages=args.stage)
+    baseline = load(args.compare) if args.compare else None
+    print(format_results(results, baseline))
+    if args.save:
+        save(results, args.save)
+    if baseline is not None:
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
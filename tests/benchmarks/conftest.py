@@ -0,0 +1,17 @@
+"""Fixtures for the benchmark suite."""
+
+import pytest
+
+from .bench import load_packets, wrap_frame
+
+
+@pytest.fixture(scope="session")
+def ehs_mono_packets() -> list[bytes]:
+    """Return the packet data of every ehs_mono fixture dump."""
+    return load_packets()
+
+
+@pytest.fixture(scope="session")
+def ehs_mono_frames(ehs_mono_packets) -> list[bytes]:
+    """Return every ehs_mono fixture packet as a complete frame."""
+    return [wrap_frame(packet) for packet in ehs_mono_packets]
@@ -0,0 +1,75 @@
+"""Benchmarks for dataset decoding."""
+
+import time
+
+import pytest
+
+from pysamsungnasa.protocol.factory import decode_message, parse_message
+from pysamsungnasa.protocol.factory.messages import MESSAGE_PARSERS
+from pysamsungnasa.protocol.packet import HEADER_LENGTH
+from pysamsungnasa.protocol.parser import read_datasets
+
+pytestmark = pytest.mark.slow
+
+REPEATS = 50
+
+
+def _decode_with_table(packets: list[bytes]) -> list:
+    """Walk and decode every dataset using the precompiled decode table."""
+    return [
+        decode_message(entry, payload)
+        for packet in packets
+        for entry, payload in read_datasets(packet, HEADER_LENGTH, len(packet), packet[9])
+    ]
+
+
+def _decode_with_parsers(packets: list[bytes]) -> list:
+    """Decode every dataset by looking up the parser class each time, as before the table existed."""
+    return [
+        parse_message(entry.message_id, payload, MESSAGE_PARSERS)
+        for packet in packets
+        for entry, payload in read_datasets(packet, HEADER_LENGTH, len(packet), packet[9])
+    ]
+
+
+def _wrap_lazily(packets: list[bytes]) -> list:
+    """Walk every dataset and wrap it in a lazy message, as the parser dispatches them."""
+    return [
+        entry.lazy(payload)
+        for packet in packets
+        for entry, payload in read_datasets(packet, HEADER_LENGTH, len(packet), packet[9])
+    ]
+
+
+def _datasets_per_second(decode, packets: list[bytes]) -> float:
+    """Return the best datasets/s over a few runs."""
+    datasets = sum(packet[9] for packet in packets) * REPEATS
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(REPEATS):
+            decode(packets)
+        best = min(best, time.perf_counter() - started)
+    return datasets / best
+
+
+def test_table_decodes_like_parsers(ehs_mono_packets):
+    """The decode table produces the same values as the parser classes."""
+    table = _decode_with_table(ehs_mono_packets)
+    parsers = _decode_with_parsers(ehs_mono_packets)
+    assert [type(message) for message in table] == [type(message) for message in parsers]
+    assert [message.RAW_PAYLOAD for message in table] == [message.RAW_PAYLOAD for message in parsers]
+
+
+@pytest.mark.benchmark
+def test_decode_throughput(ehs_mono_packets, record_property):
+    """Report datasets/s for the decode table against per-dataset parser lookup."""
+    record_property("table_datasets_per_second", round(_datasets_per_second(_decode_with_table, ehs_mono_packets)))
+    record_property("parser_datasets_per_second", round(_datasets_per_second(_decode_with_parsers, ehs_mono_packets)))
+
+
+@pytest.mark.benchmark
+def test_lazy_dispatch_throughput(ehs_mono_packets, record_property):
+    """Report datasets/s when messages are dispatched without decoding."""
+    record_property("lazy_datasets_per_second", round(_datasets_per_second(_wrap_lazily, ehs_mono_packets)))
+    record_property("decoded_datasets_per_second", round(_datasets_per_second(_decode_with_table, ehs_mono_packets)))
@@ -0,0 +1,65 @@
+"""Memory benchmarks for device attributes."""
+
+import gc
+import tracemalloc
+
+import pytest
+
+from pysamsungnasa.protocol.factory import DECODE_TABLE
+from pysamsungnasa.protocol.factory.messages import MESSAGE_PARSERS
+
+pytestmark = pytest.mark.slow
+
+ATTRIBUTES = 500
+# Budget per stored attribute, see docs/api/nasa-device.md
+BYTES_PER_ATTRIBUTE = 200
+
+
+def _attribute_ids() -> list[int]:
+    """Return message IDs with a fixed payload size, like the attributes of a typical device."""
+    return [message_id for message_id in sorted(MESSAGE_PARSERS) if DECODE_TABLE[message_id].payload_size][
+        :ATTRIBUTES
+    ]
+
+
+def _build_attributes(decode: bool) -> dict:
+    """Build an attributes dict as NasaDevice keeps it."""
+    attributes = {}
+    for message_id in _attribute_ids():
+        entry = DECODE_TABLE[message_id]
+        message = entry.lazy(bytes(entry.payload_size))
+        if decode:
+            message.VALUE  # pylint: disable=pointless-statement
+        attributes[message_id] = message
+    return attributes
+
+
+def _measure(decode: bool) -> int:
+    """Return the bytes allocated by a device's attributes."""
+    _build_attributes(decode)  # Warm up the decode table and shared enum options
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        attributes = _build_attributes(decode)
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    assert len(attributes) == ATTRIBUTES
+    return allocated
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("decode", [False, True], ids=["lazy", "decoded"])
+def test_device_attribute_memory(decode, record_property):
+    """A device with about 500 attributes stays within the per-attribute budget."""
+    allocated = _measure(decode)
+    record_property("bytes_per_attribute", allocated // ATTRIBUTES)
+    assert allocated / ATTRIBUTES < BYTES_PER_ATTRIBUTE
+
+
+def test_messages_have_no_instance_dict():
+    """Message instances only use slots."""
+    for message_id in _attribute_ids():
+        message = DECODE_TABLE[message_id].lazy(b"\x00")
+        assert not hasattr(message, "__dict__"), type(message).__name__
@@ -0,0 +1,80 @@
+"""Benchmarks for every stage of the RX pipeline, see bench.py for the command line runner."""
+
+from pathlib import Path
+
+import pytest
+
+from .bench import BenchResult, Pipeline, compare, format_results, load, main, run, save
+
+pytestmark = pytest.mark.slow
+
+BASELINE = Path(__file__).parent / "baseline.json"
+STAGES = ["framing", "crc", "parse_packet", "parse_message", "device", "end_to_end"]
+
+
+@pytest.fixture(scope="module")
+def pipeline(ehs_mono_packets):
+    """Return the benchmark pipeline for the ehs_mono fixtures."""
+    pipeline = Pipeline(ehs_mono_packets)
+    yield pipeline
+    pipeline.close()
+
+
+def _result(stage: str, frames_per_second: float, allocations_per_frame: float = 1.0) -> BenchResult:
+    return BenchResult(stage, 300, 300, frames_per_second, frames_per_second, allocations_per_frame, 100.0)
+
+
+def test_stages_process_every_frame(pipeline):
+    """Every stage sees all fixture frames and the device stage reaches the callbacks."""
+    assert len(pipeline.frames) == len(pipeline.packets) == 300
+    assert len(pipeline.framing()) == 300
+    assert len(pipeline.crc()) == 300
+    assert len(pipeline.parse_message()) == pipeline.datasets
+    calls = pipeline.callback_calls
+    pipeline.device()
+    assert pipeline.callback_calls > calls + pipeline.datasets  # Device callback plus packet callbacks
+    assert len(pipeline.end_to_end()) == 300
+
+
+@pytest.mark.benchmark
+def test_pipeline_throughput(pipeline, record_property):
+    """Report frames/s, datasets/s and allocations per frame for every stage against the baseline."""
+    results = run(pipeline, repeats=2, runs=2)
+    assert [result.stage for result in results] == STAGES
+    assert all(result.frames_per_second > 0 for result in results)
+    # Timings under coverage are not comparable with the baseline, run bench.py for a real comparison
+    record_property("results", format_results(results, load(BASELINE)))
+
+
+def test_compare_reports_regressions():
+    """A slower stage or one that keeps more allocations is reported, noise within tolerance is not."""
+    baseline = [_result("framing", 1000.0), _result("device", 1000.0, allocations_per_frame=4.0)]
+    current = [_result("framing", 900.0), _result("device", 500.0, allocations_per_frame=10.0), _result("new", 1.0)]
+    regressions = compare(current, baseline, tolerance=0.25)
+    assert [(regression.stage, regression.metric) for regression in regressions] == [
+        ("device", "frames/s"),
+        ("device", "allocations/frame"),
+    ]
+
+
+def test_baseline_round_trip(tmp_path):
+    """Results saved as a baseline load back unchanged."""
+    results = [_result("framing", 1000.25)]
+    path = tmp_path / "baseline.json"
+    save(results, path)
+    assert load(path) == results
+
+
+def test_baseline_covers_every_stage():
+    """The committed baseline has an entry for every stage."""
+    assert [result.stage for result in load(BASELINE)] == STAGES
+
+
+def test_command_line_compare(tmp_path, capsys):
+    """The command line runner exits with 1 when a stage regresses."""
+    path = tmp_path / "baseline.json"
+    save([_result("crc", float("inf"))], path)
+    assert main(["--stage", "crc", "--repeats", "1", "--runs", "1", "--compare", str(path)]) == 1
+    assert "REGRESSION crc" in capsys.readouterr().out
+    assert main(["--stage", "crc", "--repeats", "1", "--runs", "1", "--save", str(path)]) == 0
+    assert [result.stage for result in load(path)] == ["crc"]
@@ -0,0 +1,80 @@
+"""Benchmarks for RX framing."""
+
+import asyncio
+import random
+
+import pytest
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.nasa_client import NasaClient
+from pysamsungnasa.protocol.frame import FrameDecoder
+
+pytestmark = pytest.mark.slow
+
+REPEATS = 20
+
+
+def _random_chunks(stream: bytes, seed: int, max_chunk: int = 64) -> list[bytes]:
+    """Split a stream into random sized chunks."""
+    rng = random.Random(seed)
+    chunks = []
+    offset = 0
+    while offset < len(stream):
+        size = rng.randint(1, max_chunk)
+        chunks.append(stream[offset : offset + size])
+        offset += size
+    return chunks
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_random_chunks_frame_every_packet(ehs_mono_frames, seed):
+    """Feeding the dumps in random chunk sizes yields every frame, in order."""
+    decoder = FrameDecoder(max_buffer_size=4096)
+    frames = ehs_mono_frames * REPEATS
+    stream = b"".join(frames)
+    chunks = _random_chunks(stream, seed)
+
+    decoded = [frame.raw for chunk in chunks for frame in decoder.feed(chunk)]
+
+    assert decoded == frames
+    assert len(decoder) == 0
+    # Compaction only moves the trailing partial frame, so the total work stays linear in the input.
+    assert decoder._buffer.compacted_bytes <= len(stream)
+
+
+def test_single_burst_is_linear(ehs_mono_frames):
+    """A large burst (e.g. after a reconnect) is framed without copying the backlog."""
+    decoder = FrameDecoder()
+    frames = ehs_mono_frames * REPEATS
+    stream = b"".join(frames)
+
+    decoded = [frame.raw for frame in decoder.feed(stream)]
+
+    assert decoded == frames
+    assert decoder._buffer.compacted_bytes == 0
+
+
+def test_line_noise_is_skipped(ehs_mono_frames):
+    """Long runs of noise between frames are skipped without losing frames."""
+    decoder = FrameDecoder()
+    rng = random.Random(42)
+    noise = bytes(rng.choice(range(0x00, 0x32)) for _ in range(4096))
+    stream = noise + b"".join(ehs_mono_frames) + noise
+
+    decoded = [frame.raw for chunk in _random_chunks(stream, seed=7, max_chunk=256) for frame in decoder.feed(chunk)]
+
+    assert decoded == ehs_mono_frames
+
+
+async def test_client_queues_framed_packets(ehs_mono_frames):
+    """NasaClient queues every frame produced by its decoder."""
+    client = NasaClient(config=NasaConfig(device_path="socket://localhost:8000"))
+    client._rx_queue = asyncio.Queue()
+    for chunk in _random_chunks(b"".join(ehs_mono_frames), seed=5):
+        await client._read_buffer_handler(chunk)
+
+    queued = []
+    while not client._rx_queue.empty():
+        queued.append(client._rx_queue.get_nowait().raw)
+    assert queued == ehs_mono_frames
+    assert client.rx_statistics.frames == len(ehs_mono_frames)
@@ -0,0 +1,78 @@
+"""Benchmarks for RX resynchronization on adversarial input."""
+
+import random
+import time
+
+import pytest
+
+from pysamsungnasa.protocol.frame import FrameDecoder
+
+pytestmark = pytest.mark.slow
+
+CHUNK_SIZE = 1024
+SMALL = 16 * 1024
+LARGE = 4 * SMALL
+
+ADVERSARIAL_INPUTS = {
+    # Every byte is an STX and every length field is 0x3232 (too long)
+    "all_stx": lambda size: b"\x32" * size,
+    # Every candidate has a plausible 16 byte length but the ETX never matches
+    "plausible_length": lambda size: (b"\x32\x00\x0e" * (size // 3 + 1))[:size],
+    # Random bytes with a high density of STX and ETX bytes, candidates are only rejected by the CRC
+    "random_stx": lambda size: bytes(random.Random(size).choices((0x32, 0x34, 0x00, 0x05, 0x0E), k=size)),
+}
+
+
+def _feed(decoder: FrameDecoder, stream: bytes) -> tuple[list[bytes], float]:
+    """Feed a stream in fixed size chunks and return the frames and the elapsed time."""
+    frames = []
+    started = time.perf_counter()
+    for offset in range(0, len(stream), CHUNK_SIZE):
+        frames.extend(frame.raw for frame in decoder.feed(stream[offset : offset + CHUNK_SIZE]))
+    return frames, time.perf_counter() - started
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", ADVERSARIAL_INPUTS)
+def test_adversarial_input_is_linear(name, ehs_mono_frames, record_property):
+    """Resynchronizing costs a bounded amount of work per input byte."""
+    timings = {}
+    for size in (SMALL, LARGE):
+        decoder = FrameDecoder()
+        garbage = ADVERSARIAL_INPUTS[name](size)
+        stream = garbage + b"".join(ehs_mono_frames)
+        frames, elapsed = _feed(decoder, stream)
+        timings[size] = elapsed / len(stream)
+        stats = decoder.statistics
+
+        assert stats.frames == len(frames)
+        assert stats.received_bytes == len(stream)
+        # A rejected candidate never swallows the real frames after it
+        assert frames == ehs_mono_frames
+        assert stats.skipped_bytes == len(garbage)
+        # Each rejected candidate consumes at least one byte
+        assert stats.resyncs <= len(garbage)
+
+    # A quadratic resync would make the per-byte cost grow with the input size (4x here)
+    ratio = timings[LARGE] / timings[SMALL]
+    record_property("bytes_per_second", round(1 / timings[LARGE]))
+    record_property("per_byte_cost_ratio", round(ratio, 2))
+    assert ratio < 2.5
+
+
+def test_noise_between_frames_is_counted(ehs_mono_frames):
+    """Noise injected between frames is skipped and counted."""
+    decoder = FrameDecoder()
+    rng = random.Random(3)
+    stream = bytearray()
+    noise_bytes = 0
+    for frame in ehs_mono_frames:
+        noise = bytes(rng.randrange(256) for _ in range(rng.randint(0, 8)))
+        noise_bytes += len(noise)
+        stream += noise + frame
+    frames, _ = _feed(decoder, bytes(stream))
+
+    stats = decoder.statistics
+    assert stats.frames == len(frames)
+    assert frames == ehs_mono_frames
+    assert stats.skipped_bytes == noise_bytes
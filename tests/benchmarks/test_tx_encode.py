@@ -0,0 +1,60 @@
+"""Benchmarks for encoding outgoing packets."""
+
+import time
+
+import pytest
+
+from pysamsungnasa.helpers import hex2bin
+from pysamsungnasa.protocol import FrameEncoder
+from pysamsungnasa.protocol.encoder import OutgoingPacket
+from pysamsungnasa.protocol.enum import DataType
+from pysamsungnasa.protocol.factory import build_message
+from pysamsungnasa.protocol.factory.types import SendMessage
+
+pytestmark = pytest.mark.slow
+
+PACKETS = 2000
+# A typical poll, ten attributes read from one device
+MESSAGES = [SendMessage(MESSAGE_ID=message_id, PAYLOAD=b"\x05\xa5\xa5\xa5") for message_id in range(0x4200, 0x420A)]
+
+
+def _encode_binary() -> list:
+    """Encode poll packets with the binary encoder."""
+    return [
+        OutgoingPacket.create(b"\x80\xff\x01", "200000", DataType.READ, MESSAGES).encode(number % 256)
+        for number in range(PACKETS)
+    ]
+
+
+def _encode_hex() -> list:
+    """Encode poll packets through a build_message hex template, which send_command still accepts."""
+    return [
+        FrameEncoder.encode(
+            hex2bin(
+                build_message("80FF01", "200000", DataType.READ, MESSAGES).format(CUR_PACK_NUM=f"{number % 256:02x}")
+            )
+        )
+        for number in range(PACKETS)
+    ]
+
+
+def _packets_per_second(encode) -> float:
+    """Return the best packets/s over a few runs."""
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        encode()
+        best = min(best, time.perf_counter() - started)
+    return PACKETS / best
+
+
+def test_binary_encoding_matches_hex():
+    """Both encoders produce the same frames."""
+    assert _encode_binary() == _encode_hex()
+
+
+@pytest.mark.benchmark
+def test_encode_throughput(record_property):
+    """Report packets/s for the binary encoder against hex templates."""
+    record_property("binary_packets_per_second", round(_packets_per_second(_encode_binary)))
+    record_property("hex_packets_per_second", round(_packets_per_second(_encode_hex)))
@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import MagicMock, AsyncMock, Mock
 from pysamsungnasa.nasa_client import NasaClient
 from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.protocol.txqueue import TxQueue
 
 # Mock aiotelnet since it requires Python 3.13+
 sys.modules["aiotelnet"] = MagicMock()
@@ -28,7 +29,7 @@ async def nasa_client():
     client._client = Mock()
     client._client._is_connected = True
     client._client.writer = AsyncMock()
-    client._tx_queue = asyncio.Queue()
+    client._tx_queue = TxQueue()
     client._rx_queue = asyncio.Queue()
     return client
 
@@ -53,7 +54,7 @@ async def nasa_client_with_full_retry_config():
     client._client._is_connected = True
     client._client = Mock()
     client._client.writer = AsyncMock()
-    client._tx_queue = asyncio.Queue()
+    client._tx_queue = TxQueue()
     client._rx_queue = asyncio.Queue()
     return client
 
@@ -68,7 +69,7 @@ async def nasa_client_write_only():
     client._client._is_connected = True
     client._client = Mock()
     client._client.writer = AsyncMock()
-    client._tx_queue = asyncio.Queue()
+    client._tx_queue = TxQueue()
     client._rx_queue = asyncio.Queue()
     return client
 
@@ -83,6 +84,6 @@ async def nasa_client_read_only():
     client._client._is_connected = True
     client._client = Mock()
     client._client.writer = AsyncMock()
-    client._tx_queue = asyncio.Queue()
+    client._tx_queue = TxQueue()
     client._rx_queue = asyncio.Queue()
     return client
@@ -0,0 +1,98 @@
+"""Tests for the RX buffer."""
+
+import struct
+
+import pytest
+
+from pysamsungnasa.protocol.buffer import RxBuffer
+
+
+class TestRxBuffer:
+    """Tests for RxBuffer."""
+
+    def test_invalid_capacity(self):
+        """Test that a zero capacity is rejected."""
+        with pytest.raises(ValueError):
+            RxBuffer(0)
+
+    def test_write_and_consume(self):
+        """Test writing and consuming data."""
+        buffer = RxBuffer(16)
+        assert buffer.write(b"\x01\x02\x03")
+        assert len(buffer) == 3
+        assert buffer[0] == 0x01
+        buffer.consume(1)
+        assert len(buffer) == 2
+        assert bytes(buffer.view(0, 2)) == b"\x02\x03"
+
+    def test_consume_all_rewinds(self):
+        """Test that consuming everything rewinds the cursors."""
+        buffer = RxBuffer(8)
+        buffer.write(b"\x01\x02\x03\x04\x05\x06")
+        buffer.consume(6)
+        assert not buffer
+        # A full-capacity write now fits without compaction
+        assert buffer.write(b"\x00" * 8)
+        assert buffer.compacted_bytes == 0
+
+    def test_write_compacts_unread_data(self):
+        """Test that a write past the end moves unread data to the start."""
+        buffer = RxBuffer(8)
+        buffer.write(b"\x01\x02\x03\x04\x05\x06")
+        buffer.consume(4)
+        assert buffer.write(b"\x07\x08\x09\x0a")
+        assert buffer.compacted_bytes == 2
+        assert bytes(buffer.view(0, 6)) == b"\x05\x06\x07\x08\x09\x0a"
+
+    def test_write_overflow(self):
+        """Test that a write that cannot fit is rejected."""
+        buffer = RxBuffer(4)
+        buffer.write(b"\x01\x02\x03")
+        assert not buffer.write(b"\x04\x05")
+        assert len(buffer) == 3
+
+    def test_find(self):
+        """Test finding a byte relative to the read cursor."""
+        buffer = RxBuffer(16)
+        buffer.write(b"\x00\x32\x00\x32")
+        buffer.consume(1)
+        assert buffer.find(0x32) == 0
+        assert buffer.find(0x32, 1) == 2
+        assert buffer.find(0x34) == -1
+
+    def test_find_ignores_stale_bytes(self):
+        """Test that bytes beyond the write cursor are not searched."""
+        buffer = RxBuffer(8)
+        buffer.write(b"\x32\x32\x32")
+        buffer.consume(3)
+        buffer.write(b"\x00")
+        assert buffer.find(0x32) == -1
+
+    def test_unpack_from(self):
+        """Test unpacking a struct from unread data."""
+        header = struct.Struct(">BH")
+        buffer = RxBuffer(16)
+        buffer.write(b"\x00\x32\x00\x10")
+        buffer.consume(1)
+        assert buffer.unpack_from(header) == (0x32, 0x10)
+
+    def test_unpack_from_requires_enough_data(self):
+        """Test that unpacking past the write cursor raises struct.error."""
+        buffer = RxBuffer(16)
+        buffer.write(b"\x32\x00")
+        with pytest.raises(struct.error):
+            buffer.unpack_from(struct.Struct(">BH"))
+
+    def test_index_out_of_range(self):
+        """Test that indexing past the unread data raises IndexError."""
+        buffer = RxBuffer(16)
+        buffer.write(b"\x01")
+        with pytest.raises(IndexError):
+            _ = buffer[1]
+
+    def test_clear(self):
+        """Test clearing the buffer."""
+        buffer = RxBuffer(16)
+        buffer.write(b"\x01\x02")
+        buffer.clear()
+        assert len(buffer) == 0
@@ -0,0 +1,228 @@
+"""Tests for read coalescing."""
+
+import asyncio
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from pysamsungnasa.coalescing import MAX_MESSAGES_PER_PACKET, ReadCoalescer, WriteCoalescer, chunk_message_ids
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.nasa_client import NasaClient
+from pysamsungnasa.protocol.enum import DataType
+from pysamsungnasa.protocol.factory.types import SendMessage
+
+
+class TestChunkMessageIds:
+    """Tests for chunk_message_ids."""
+
+    def test_chunks_of_ten(self):
+        """Test that message IDs are split into packets of at most 10."""
+        chunks = chunk_message_ids(range(0x4000, 0x4000 + 25))
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+        assert MAX_MESSAGES_PER_PACKET == 10
+
+    def test_duplicates_dropped_in_order(self):
+        """Test that repeated message IDs are only read once, in the order first requested."""
+        assert chunk_message_ids([0x4001, 0x4000, 0x4001, 0x4002]) == [[0x4001, 0x4000, 0x4002]]
+
+    def test_empty(self):
+        """Test that no message IDs give no packets."""
+        assert chunk_message_ids([]) == []
+
+
+def _sender():
+    """Return a send callback that numbers packets from 1 and records what it sent."""
+    sent = []
+
+    async def send(destination, message_ids):
+        sent.append((destination, message_ids))
+        return len(sent)
+
+    return send, sent
+
+
+class TestReadCoalescer:
+    """Tests for ReadCoalescer."""
+
+    async def test_concurrent_reads_share_a_packet(self):
+        """Test that reads to one destination within the window are sent together."""
+        send, sent = _sender()
+        coalescer = ReadCoalescer(0.01, send)
+        results = await asyncio.gather(
+            coalescer.read("200000", [0x4000, 0x4001]),
+            coalescer.read("200000", [0x4001, 0x4002]),
+        )
+        assert sent == [("200000", [0x4000, 0x4001, 0x4002])]
+        assert results == [1, 1]
+        assert (coalescer.requested, coalescer.packets) == (2, 1)
+
+    async def test_destinations_are_separate(self):
+        """Test that reads to different destinations are never merged."""
+        send, sent = _sender()
+        coalescer = ReadCoalescer(0.01, send)
+        await asyncio.gather(coalescer.read("200000", [0x4000]), coalescer.read("200001", [0x4000]))
+        assert sorted(sent) == [("200000", [0x4000]), ("200001", [0x4000])]
+
+    async def test_large_batches_are_split(self):
+        """Test that more than 10 message IDs are split and each caller gets the packet carrying its IDs."""
+        send, sent = _sender()
+        coalescer = ReadCoalescer(0.01, send)
+        first, second = await asyncio.gather(
+            coalescer.read("200000", range(0x4000, 0x400A)),
+            coalescer.read("200000", range(0x400A, 0x4010)),
+        )
+        assert [len(message_ids) for _, message_ids in sent] == [10, 6]
+        assert (first, second) == (1, 2)
+
+    async def test_pending(self):
+        """Test that pending lists the message IDs waiting to be sent."""
+        send, sent = _sender()
+        coalescer = ReadCoalescer(0.01, send)
+        task = asyncio.create_task(coalescer.read("200000", [0x4000, 0x4001]))
+        await asyncio.sleep(0)
+        assert coalescer.pending("200000") == [0x4000, 0x4001]
+        await task
+        assert coalescer.pending("200000") == []
+
+    async def test_empty_read(self):
+        """Test that reading no message IDs sends nothing."""
+        send, sent = _sender()
+        assert await ReadCoalescer(0.01, send).read("200000", []) is None
+        assert sent == []
+
+    async def test_send_error_reaches_every_caller(self):
+        """Test that a failed send is raised to every caller in the batch."""
+        coalescer = ReadCoalescer(0.01, AsyncMock(side_effect=ConnectionError("gone")))
+        results = await asyncio.gather(
+            coalescer.read("200000", [0x4000]),
+            coalescer.read("200000", [0x4001]),
+            return_exceptions=True,
+        )
+        assert all(isinstance(result, ConnectionError) for result in results)
+
+    async def test_cancelled_caller_does_not_cancel_the_batch(self):
+        """Test that cancelling one caller still sends the read for the others."""
+        send, sent = _sender()
+        coalescer = ReadCoalescer(0.01, send)
+        cancelled = asyncio.create_task(coalescer.read("200000", [0x4000]))
+        other = asyncio.create_task(coalescer.read("200000", [0x4001]))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        assert await other == 1
+        assert sent == [("200000", [0x4000, 0x4001])]
+
+    async def test_close_fails_batches(self):
+        """Test that close fails reads that have not been sent with ConnectionError."""
+        send, sent = _sender()
+        coalescer = ReadCoalescer(10.0, send)
+        task = asyncio.create_task(coalescer.read("200000", [0x4000]))
+        await asyncio.sleep(0)
+        coalescer.close()
+        with pytest.raises(ConnectionError):
+            await task
+        assert sent == []
+        assert coalescer.pending("200000") == []
+
+
+def _write_sender():
+    """Return a write send callback that numbers packets from 1 and records what it sent."""
+    sent = []
+
+    async def send(destination, data_type, messages):
+        sent.append((destination, data_type, messages))
+        return len(sent)
+
+    return send, sent
+
+
+class TestWriteCoalescer:
+    """Tests for WriteCoalescer."""
+
+    async def test_writes_share_a_packet(self):
+        """Test that writes to one destination within the window are sent together."""
+        send, sent = _write_sender()
+        coalescer = WriteCoalescer(0.01, send)
+        results = await asyncio.gather(
+            coalescer.write("200000", DataType.WRITE, [SendMessage(0x4000, b"\x01")]),
+            coalescer.write("200000", DataType.WRITE, [SendMessage(0x4201, b"\x00\xdc")]),
+        )
+        assert results == [1, 1]
+        assert sent == [("200000", DataType.WRITE, [SendMessage(0x4000, b"\x01"), SendMessage(0x4201, b"\x00\xdc")])]
+
+    async def test_later_write_replaces_earlier(self):
+        """Test that only the latest value for a message ID is sent, in the position of the first write."""
+        send, sent = _write_sender()
+        coalescer = WriteCoalescer(0.01, send)
+        first = asyncio.create_task(coalescer.write("200000", DataType.WRITE, [SendMessage(0x4000, b"\x00")]))
+        second = asyncio.create_task(coalescer.write("200000", DataType.WRITE, [SendMessage(0x4001, b"\x01")]))
+        await asyncio.sleep(0)
+        assert coalescer.pending("200000") == [SendMessage(0x4000, b"\x00"), SendMessage(0x4001, b"\x01")]
+        third = await coalescer.write("200000", DataType.WRITE, [SendMessage(0x4000, b"\x01")])
+        assert (await first, await second, third) == (1, 1, 1)
+        assert sent == [("200000", DataType.WRITE, [SendMessage(0x4000, b"\x01"), SendMessage(0x4001, b"\x01")])]
+
+    async def test_data_types_are_separate(self):
+        """Test that WRITE and REQUEST messages are never sent in the same packet."""
+        send, sent = _write_sender()
+        coalescer = WriteCoalescer(0.01, send)
+        await asyncio.gather(
+            coalescer.write("200000", DataType.WRITE, [SendMessage(0x4000, b"\x01")]),
+            coalescer.write("200000", DataType.REQUEST, [SendMessage(0x4001, b"\x01")]),
+        )
+        assert {data_type for _, data_type, _ in sent} == {DataType.REQUEST, DataType.WRITE}
+
+    async def test_large_batches_are_split(self):
+        """Test that more than 10 distinct messages are sent in several packets."""
+        send, sent = _write_sender()
+        coalescer = WriteCoalescer(0.01, send)
+        await asyncio.gather(
+            *(coalescer.write("200000", DataType.WRITE, [SendMessage(0x4000 + i, b"\x01")]) for i in range(12))
+        )
+        assert [len(messages) for _, _, messages in sent] == [10, 2]
+
+
+class TestClientCoalescing:
+    """Tests for read coalescing in NasaClient."""
+
+    async def test_concurrent_nasa_reads_send_one_packet(self):
+        """Test that concurrent nasa_read calls to one device are sent as one READ packet."""
+        client = NasaClient(config=NasaConfig(device_path="socket://localhost:8000", enable_read_retries=False))
+        client.send_message = AsyncMock(return_value=7)
+        results = await asyncio.gather(
+            client.nasa_read([0x4000], "200000"),
+            client.nasa_read([0x4001], "200000"),
+            client.nasa_read([0x4002], "200000"),
+        )
+        assert results == [7, 7, 7]
+        client.send_message.assert_awaited_once()
+        kwargs = client.send_message.await_args.kwargs
+        assert kwargs["request_type"] == DataType.READ
+        assert [message.MESSAGE_ID for message in kwargs["messages"]] == [0x4000, 0x4001, 0x4002]
+
+    async def test_queued_reads_are_merged(self, nasa_client):
+        """Test that reads queued behind a pending read are sent together once it completes."""
+        nasa_client._queued_reads["200000"] = [[0x4000, 0x4001], [0x4001, 0x4002], list(range(0x4100, 0x4109))]
+        nasa_client.nasa_read = AsyncMock()
+        await nasa_client._process_queued_reads("200000")
+        nasa_client.nasa_read.assert_awaited_once_with([0x4000, 0x4001, 0x4002], destination="200000")
+        assert nasa_client._queued_reads["200000"] == [list(range(0x4100, 0x4109))]
+        nasa_client._queued_reads.clear()
+
+    async def test_response_does_not_wait_for_queued_read(self, nasa_client):
+        """Test that a response releases queued reads in a task instead of waiting for them to be sent."""
+        nasa_client._queued_reads["200000"] = [[0x4000]]
+        sent = asyncio.Event()
+
+        async def slow_read(msgs, destination):
+            await asyncio.sleep(0.05)
+            sent.set()
+
+        nasa_client.nasa_read = slow_read
+        await nasa_client._mark_read_received("200000", [])
+        assert not sent.is_set()
+        assert len(nasa_client._queued_read_tasks) == 1
+        await asyncio.wait_for(sent.wait(), 1.0)
+        await asyncio.sleep(0)
+        assert not nasa_client._queued_read_tasks
+        nasa_client._queued_reads.clear()
@@ -124,3 +124,43 @@ class TestNasaConfig:
         config = NasaConfig(max_buffer_size=1024000, log_buffer_messages=True)
         assert config.max_buffer_size == 1024000
         assert config.log_buffer_messages is True
+
+    def test_log_filter_matches_own_address_and_devices(self):
+        """Test that the log filter compares addresses case insensitively."""
+        config = NasaConfig(client_address=1, devices_to_log=["b0ff20"])
+        log_filter = config.log_filter
+        assert log_filter.logs_dest("80ff01")
+        assert log_filter.logs_dest("80FF01")
+        assert log_filter.logs_dest("B0FF20")
+        assert not log_filter.logs_dest("200000")
+
+    def test_log_filter_matches_messages(self):
+        """Test that messages_to_log are logged for any destination."""
+        config = NasaConfig(messages_to_log=[0x4000])
+        assert config.log_filter.should_log("200000", 0x4000)
+        assert not config.log_filter.should_log("200000", 0x4001)
+
+    def test_log_filter_log_all(self):
+        """Test that log_all_messages logs every destination."""
+        config = NasaConfig(log_all_messages=True)
+        assert config.log_filter.should_log("200000", 0x4001)
+
+    def test_log_filter_is_cached_until_options_change(self):
+        """Test that the log filter is reused until a logging option is changed."""
+        config = NasaConfig()
+        log_filter = config.log_filter
+        assert config.log_filter is log_filter
+        config.devices_to_log.append("200000")
+        assert config.log_filter is not log_filter
+        assert config.log_filter.logs_dest("200000")
+        config.log_all_messages = True
+        assert config.log_filter.log_all
+
+    def test_log_filter_cache_is_not_part_of_the_config(self):
+        """Test that the cached log filter is not an option: not accepted, shown or compared."""
+        config = NasaConfig()
+        config.log_filter  # pylint: disable=pointless-statement
+        assert "_log_filter" not in repr(config)
+        assert config == NasaConfig()
+        with pytest.raises(TypeError):
+            NasaConfig(_log_filter=None)
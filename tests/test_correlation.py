@@ -0,0 +1,154 @@
+"""Tests for request/response correlation."""
+
+import asyncio
+
+import pytest
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.correlation import NackError, RequestTracker, Response
+from pysamsungnasa.protocol.encoder import OutgoingPacket
+from pysamsungnasa.protocol.enum import DataType
+from pysamsungnasa.protocol.factory.types import SendMessage
+from pysamsungnasa.protocol.packet import MessageEvent, PacketHeader
+from pysamsungnasa.protocol.parser import NasaPacketParser
+
+
+def _reply(source, data_type, packet_number, messages=(), dest="80ff01"):
+    """Return the header and events of a reply from source to dest."""
+    packet = OutgoingPacket(bytes.fromhex(source), bytes.fromhex(dest), data_type, tuple(messages))
+    header = PacketHeader.parse(packet.packet_data(packet_number))
+    return header, [MessageEvent(header, message.MESSAGE_ID, None) for message in messages]
+
+
+class TestRequestTracker:
+    """Tests for RequestTracker."""
+
+    async def test_reply_with_packet_number(self):
+        """Test that a reply with the request's packet number resolves it."""
+        tracker = RequestTracker()
+        reply = tracker.track("200000", 5, [0x4000], timeout=1.0)
+        header, events = _reply("200000", DataType.RESPONSE, 5, [SendMessage(0x4000, b"\x01")])
+        assert tracker.handle_reply(header, events)
+        response = await reply
+        assert isinstance(response, Response)
+        assert response.header.packet_number == 5
+        assert list(response.messages) == [0x4000]
+        assert len(tracker) == 0
+
+    async def test_reply_matched_by_message_id(self):
+        """Test that a reply with another packet number goes to the oldest request for its message ID."""
+        tracker = RequestTracker()
+        first = tracker.track("200000", 5, [0x4000, 0x4001], timeout=1.0)
+        second = tracker.track("200000", 6, [0x4000], timeout=1.0)
+        header, events = _reply("200000", DataType.RESPONSE, 99, [SendMessage(0x4000, b"\x01")])
+        tracker.handle_reply(header, events)
+        assert first.done() and not second.done()
+        tracker.handle_reply(*_reply("200000", DataType.RESPONSE, 98, [SendMessage(0x4000, b"\x01")]))
+        assert (await second).header.packet_number == 98
+
+    async def test_reply_from_another_device_is_ignored(self):
+        """Test that only replies from the request's destination match."""
+        tracker = RequestTracker()
+        reply = tracker.track("200000", 5, [0x4000], timeout=1.0)
+        assert not tracker.handle_reply(*_reply("200001", DataType.RESPONSE, 5, [SendMessage(0x4000, b"\x01")]))
+        assert not reply.done()
+        tracker.fail_all(ConnectionError())
+
+    async def test_ack_without_datasets(self):
+        """Test that an ACK with no datasets is matched by packet number."""
+        tracker = RequestTracker()
+        reply = tracker.track("b0ff20", 7, [0x4000], timeout=1.0)
+        tracker.handle_reply(*_reply("B0FF20", DataType.ACK, 7))
+        assert (await reply).events == ()
+
+    async def test_nack(self):
+        """Test that a NACK fails the request with NackError."""
+        tracker = RequestTracker()
+        reply = tracker.track("200000", 5, [0x4000], timeout=1.0)
+        tracker.handle_reply(*_reply("200000", DataType.NACK, 5))
+        with pytest.raises(NackError) as ex:
+            await reply
+        assert (ex.value.destination, ex.value.packet_number) == ("200000", 5)
+        assert str(ex.value) == "Device 200000 sent a NACK for packet 5"
+        assert ex.value.args == ("200000", 5)
+
+    async def test_reply_to_another_address_is_ignored(self):
+        """Test that a reply sent to another address than the tracker's does not resolve a request."""
+        tracker = RequestTracker("80FF01")
+        reply = tracker.track("200000", 5, [0x4000], timeout=1.0)
+        message = SendMessage(0x4000, b"\x01")
+        assert not tracker.handle_reply(*_reply("200000", DataType.RESPONSE, 5, [message], dest="80ff02"))
+        assert not reply.done()
+        assert tracker.handle_reply(*_reply("200000", DataType.RESPONSE, 5, [message], dest="80ff01"))
+        assert reply.done()
+
+    async def test_known_packet_number_is_not_matched_by_message_id(self):
+        """Test that a reply with the packet number of another request is not given to a request by message ID."""
+        tracker = RequestTracker()
+        first = tracker.track("200000", 5, [0x4000], timeout=1.0)
+        second = tracker.track("200000", 6, [0x4001], timeout=1.0)
+        assert not tracker.handle_reply(*_reply("200000", DataType.RESPONSE, 6, [SendMessage(0x4000, b"\x01")]))
+        assert not first.done() and not second.done()
+        tracker.fail_all(ConnectionError())
+        for reply in (first, second):
+            with pytest.raises(ConnectionError):
+                await reply
+
+    async def test_timeout(self):
+        """Test that a request without a reply fails with TimeoutError and is forgotten."""
+        tracker = RequestTracker()
+        with pytest.raises(TimeoutError):
+            await tracker.track("200000", 5, [0x4000], timeout=0.01)
+        assert len(tracker) == 0
+        assert tracker._by_message == {}
+
+    async def test_cancelled_request_is_forgotten(self):
+        """Test that cancelling the reply future stops tracking the request."""
+        tracker = RequestTracker()
+        tracker.track("200000", 5, [0x4000], timeout=1.0).cancel()
+        await asyncio.sleep(0)  # Done callbacks run on the next loop iteration
+        assert len(tracker) == 0
+        assert not tracker.handle_reply(*_reply("200000", DataType.RESPONSE, 5, [SendMessage(0x4000, b"\x01")]))
+
+    async def test_packet_number_reuse_fails_the_older_request(self):
+        """Test that reusing a packet number before a reply fails the older request."""
+        tracker = RequestTracker()
+        old = tracker.track("200000", 5, [0x4000], timeout=1.0)
+        new = tracker.track("200000", 5, [0x4001], timeout=1.0)
+        with pytest.raises(TimeoutError):
+            await old
+        assert not new.done()
+        tracker.fail_all(ConnectionError())
+        with pytest.raises(ConnectionError):
+            await new
+
+
+class TestClientRequest:
+    """Tests for NasaClient.request."""
+
+    async def test_request_resolves_with_parsed_response(self, nasa_client):
+        """Test that request returns the parsed datasets of the reply routed through the parser."""
+        parser = NasaPacketParser(config=NasaConfig())
+        parser.set_reply_handler(nasa_client._handle_reply)
+
+        task = asyncio.create_task(nasa_client.request("200000", DataType.READ, [SendMessage(0x4000, b"")]))
+        await asyncio.sleep(0)
+        frame = nasa_client._tx_queue.get_nowait()
+        reply = OutgoingPacket.create("200000", "80FF01", DataType.RESPONSE, [SendMessage(0x4000, b"\x01")])
+        await parser.parse_packet(reply.packet_data(frame[11]))
+
+        response = await asyncio.wait_for(task, timeout=1.0)
+        assert response.messages[0x4000].VALUE is not None
+        nasa_client._pending_reads.clear()
+
+    async def test_request_not_connected(self, nasa_client):
+        """Test that a request that cannot be sent raises ConnectionError."""
+        nasa_client._client.is_connected = False
+        with pytest.raises(ConnectionError):
+            await nasa_client.request("200000", DataType.WRITE, [SendMessage(0x4000, b"\x01")])
+
+    async def test_request_timeout(self, nasa_client):
+        """Test that request raises TimeoutError when no reply arrives."""
+        with pytest.raises(TimeoutError):
+            await nasa_client.request("200000", DataType.WRITE, [SendMessage(0x4000, b"\x01")], timeout=0.01)
+        nasa_client._pending_writes.clear()
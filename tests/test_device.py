@@ -1,13 +1,18 @@
 """Tests for NASA device module."""
 
+import asyncio
+
 import pytest
 from unittest.mock import Mock, AsyncMock
 from datetime import datetime, timezone
 from pysamsungnasa.device import NasaDevice
 from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.protocol.packet import MessageEvent
 from pysamsungnasa.protocol.parser import NasaPacketParser
 from pysamsungnasa.protocol.enum import AddressClass, InUseThermostat, InOperationMode
-from pysamsungnasa.protocol.factory.types import BaseMessage
+from pysamsungnasa.protocol.encoder import OutgoingPacket
+from pysamsungnasa.protocol.enum import DataType
+from pysamsungnasa.protocol.factory.types import BaseMessage, SendMessage
 
 
 # Helper message classes for testing
@@ -269,6 +274,226 @@ class TestNasaDeviceHandlePacket:
         failing_callback.assert_called_once()
 
 
+class TestNasaDeviceHandleEvent:
+    """Tests for NasaDevice handle_event functionality."""
+
+    @pytest.fixture
+    def setup_device(self):
+        """Setup common device test dependencies."""
+        config = NasaConfig()
+        parser = NasaPacketParser(config=config)
+        client = Mock()
+        return config, parser, client
+
+    def test_device_registers_event_handler(self, setup_device):
+        """Test that the device receives events from the parser."""
+        config, parser, client = setup_device
+        device = NasaDevice(
+            address="200001", device_type=AddressClass.INDOOR, packet_parser=parser, config=config, client=client
+        )
+        assert device.handle_event in parser._device_event_handlers["200001"]
+
+    def test_handle_event_stores_attribute_and_calls_callbacks(self, setup_device):
+        """Test that handle_event stores the message and calls both callback styles."""
+        config, parser, client = setup_device
+        device = NasaDevice(
+            address="200001", device_type=AddressClass.INDOOR, packet_parser=parser, config=config, client=client
+        )
+        event_callback = Mock()
+        kwargs_callback = Mock()
+        device.add_packet_event_callback(Message4000, event_callback)
+        device.add_packet_callback(Message4000, kwargs_callback)
+
+        message = Message4000(value=1)
+        event = MessageEvent.from_kwargs({"messageNumber": 0x4000, "packet": message, "dest": "80FF01"})
+        device.handle_event(event)
+
+        assert device.attributes[0x4000] is message
+        event_callback.assert_called_once_with(device, event)
+        kwargs_callback.assert_called_once_with(device, **event.as_kwargs())
+
+    def test_remove_packet_event_callback(self, setup_device):
+        """Test that a removed packet event callback is not called."""
+        config, parser, client = setup_device
+        device = NasaDevice(
+            address="200001", device_type=AddressClass.INDOOR, packet_parser=parser, config=config, client=client
+        )
+        callback = Mock()
+        device.add_packet_event_callback(Message4000, callback)
+        device.remove_packet_event_callback(Message4000, callback)
+
+        device.handle_packet(messageNumber=0x4000, packet=Message4000(value=1), dest="80FF01")
+
+        callback.assert_not_called()
+
+
+class TestNasaDeviceUnchangedValues:
+    """Tests for unchanged value suppression and dirty tracking."""
+
+    @pytest.fixture
+    def device(self):
+        """Create a device with unchanged value suppression on."""
+        config = NasaConfig(suppress_unchanged_values=True)
+        return NasaDevice(
+            address="200001",
+            device_type=AddressClass.INDOOR,
+            packet_parser=NasaPacketParser(config=config),
+            config=config,
+            client=Mock(),
+        )
+
+    @staticmethod
+    def _event(payload: bytes) -> MessageEvent:
+        return MessageEvent.from_kwargs(
+            {"messageNumber": 0x4000, "packet": Message4000.lazy(payload, Message4000), "dest": "80FF01"}
+        )
+
+    def test_unchanged_payload_skips_callbacks(self, device):
+        """Test that a value received again with the same raw payload keeps the stored message and calls nothing."""
+        device_callback = Mock()
+        event_callback = Mock()
+        device.add_device_callback(device_callback)
+        device.add_packet_event_callback(Message4000, event_callback)
+
+        device.handle_event(self._event(b"\x01"))
+        stored = device.attributes[0x4000]
+        device.handle_event(self._event(b"\x01"))
+
+        assert device.attributes[0x4000] is stored
+        device_callback.assert_called_once_with(device)
+        event_callback.assert_called_once()
+
+    def test_changed_payload_calls_callbacks(self, device):
+        """Test that a different raw payload is stored and calls the callbacks."""
+        callback = Mock()
+        device.add_device_callback(callback)
+        device.handle_event(self._event(b"\x01"))
+        device.handle_event(self._event(b"\x02"))
+        assert device.attributes[0x4000].RAW_PAYLOAD == b"\x02"
+        assert callback.call_count == 2
+
+    def test_unchanged_payload_wakes_readers(self, device):
+        """Test that a reader waiting for the message is woken even if its value did not change."""
+        device.handle_event(self._event(b"\x01"))
+        event = device._attribute_events.setdefault(0x4000, asyncio.Event())
+        device.handle_event(self._event(b"\x01"))
+        assert event.is_set()
+
+    def test_suppression_is_off_by_default(self):
+        """Test that unchanged value suppression is opt-in."""
+        assert NasaConfig().suppress_unchanged_values is False
+
+    def test_suppression_can_be_disabled(self, device):
+        """Test that every value calls the callbacks with suppress_unchanged_values off."""
+        device.config.suppress_unchanged_values = False
+        callback = Mock()
+        device.add_device_callback(callback)
+        device.handle_event(self._event(b"\x01"))
+        device.handle_event(self._event(b"\x01"))
+        assert callback.call_count == 2
+
+    def test_packet_callbacks_fire_for_repeats_when_suppression_is_disabled(self, device):
+        """Test that per-message packet callbacks are called for every repeat with suppress_unchanged_values off."""
+        device.config.suppress_unchanged_values = False
+        packet_callback = Mock()
+        event_callback = Mock()
+        device.add_packet_callback(Message4000, packet_callback)
+        device.add_packet_event_callback(Message4000, event_callback)
+        for _ in range(3):
+            device.handle_event(self._event(b"\x01"))
+        assert packet_callback.call_count == 3
+        assert event_callback.call_count == 3
+
+    def test_drain_dirty(self, device):
+        """Test that changed message IDs are collected until drained."""
+        device.handle_event(self._event(b"\x01"))
+        device.handle_packet(messageNumber=0x4001, packet=Message4001(value=1), dest="80FF01")
+        assert device.drain_dirty() == {0x4000, 0x4001}
+        device.handle_event(self._event(b"\x01"))
+        assert device.drain_dirty() == set()
+        device.handle_event(self._event(b"\x02"))
+        assert device.drain_dirty() == {0x4000}
+
+
+class TestNasaDeviceBatchedCallbacks:
+    """Tests for callbacks delivered once per packet."""
+
+    @staticmethod
+    def _setup(**config):
+        config = NasaConfig(**config)
+        parser = NasaPacketParser(config=config)
+        device = NasaDevice(
+            address="200001", device_type=AddressClass.INDOOR, packet_parser=parser, config=config, client=Mock()
+        )
+        return parser, device
+
+    @staticmethod
+    def _packet(*values):
+        """Return a NOTIFICATION packet from the device with 0x4000, 0x4001, ... set to values."""
+        messages = [SendMessage(0x4000 + index, bytes([value])) for index, value in enumerate(values)]
+        return OutgoingPacket.create("200001", "B0FF20", DataType.NOTIFICATION, messages).packet_data(1)
+
+    async def test_change_callback_once_per_packet(self):
+        """Test that a change callback is called once per packet with the changed message IDs."""
+        parser, device = self._setup(suppress_unchanged_values=True)
+        callback = Mock()
+        device.add_change_callback(callback)
+
+        await parser.parse_packet(self._packet(1, 1, 1))
+        callback.assert_called_once_with(device, frozenset({0x4000, 0x4001, 0x4002}))
+
+        await parser.parse_packet(self._packet(1, 0, 1))
+        assert callback.call_args.args == (device, frozenset({0x4001}))
+
+        await parser.parse_packet(self._packet(1, 0, 1))
+        assert callback.call_count == 2  # Nothing changed
+
+        device.remove_change_callback(callback)
+        await parser.parse_packet(self._packet(0, 0, 0))
+        assert callback.call_count == 2
+
+    async def test_batched_device_callbacks(self):
+        """Test that device callbacks are called once per packet, after every dataset is stored."""
+        parser, device = self._setup(batch_device_callbacks=True)
+        seen = []
+        device.add_device_callback(lambda device: seen.append(set(device.attributes)))
+
+        await parser.parse_packet(self._packet(1, 1, 1))
+        assert seen == [{0x4000, 0x4001, 0x4002}]
+
+    async def test_device_callbacks_per_message_by_default(self):
+        """Test that device callbacks are still called once per changed message by default."""
+        parser, device = self._setup()
+        callback = Mock()
+        device.add_device_callback(callback)
+        await parser.parse_packet(self._packet(1, 1, 1))
+        assert callback.call_count == 3
+
+    def test_kwargs_handle_packet_delivers_changes(self):
+        """Test that each handle_packet call is delivered as a packet to change and batched device callbacks."""
+        _, device = self._setup(batch_device_callbacks=True)
+        change_callback = Mock()
+        device_callback = Mock()
+        device.add_change_callback(change_callback)
+        device.add_device_callback(device_callback)
+
+        device.handle_packet(messageNumber=0x4000, packet=Message4000(value=1), dest="80FF01")
+        change_callback.assert_called_once_with(device, frozenset({0x4000}))
+        device_callback.assert_called_once_with(device)
+
+    async def test_flush_interval(self):
+        """Test that changes of several packets are delivered together after the flush interval."""
+        parser, device = self._setup(device_callback_flush_interval=0.02)
+        callback = Mock()
+        device.add_change_callback(callback)
+
+        await parser.parse_packet(self._packet(1))
+        await parser.parse_packet(self._packet(1, 1))
+        callback.assert_not_called()
+        await asyncio.sleep(0.05)
+        callback.assert_called_once_with(device, frozenset({0x4000, 0x4001}))
+
+
 class TestNasaDeviceCallbackExceptionHandling:
     """Tests for exception handling in device callbacks."""
 
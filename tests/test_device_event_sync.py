@@ -442,3 +442,135 @@ class TestGetAttributeEventSync:
         assert result_cached.VALUE == 1.0
         # Second call should wait and get v2
         assert result_fresh.VALUE == 2.0
+
+
+class TestSingleFlightReads:
+    """Tests for sharing attribute reads between concurrent callers."""
+
+    @pytest.fixture
+    def setup_device(self):
+        """Setup a device with a mocked client."""
+        config = NasaConfig()
+        parser = NasaPacketParser(config=config)
+        client = AsyncMock()
+        device = NasaDevice(
+            address="200001",
+            device_type=AddressClass.INDOOR,
+            packet_parser=parser,
+            config=config,
+            client=client,
+        )
+        return device, client
+
+    @staticmethod
+    def _message(value):
+        message = Mock(spec=BaseMessage)
+        message.VALUE = value
+        message.is_fsv_message = False
+        return message
+
+    @staticmethod
+    def _arrive(device, message_id, message):
+        device.handle_packet(
+            messageNumber=message_id,
+            packet=message,
+            dest="80FF01",
+            formattedMessageNumber=hex(message_id),
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_one_request(self, setup_device):
+        """Test that concurrent reads of one attribute send a single READ and get the same result."""
+        device, client = setup_device
+        message = self._message(25.0)
+
+        tasks = [asyncio.create_task(device.get_attribute(Message4203, requires_read=True)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        self._arrive(device, 0x4203, message)
+        results = await asyncio.gather(*tasks)
+
+        assert results == [message] * 5
+        client.nasa_read.assert_called_once_with(msgs=[0x4203], destination="200001")
+        assert device._attribute_reads == {}
+
+    @pytest.mark.asyncio
+    async def test_overlapping_reads_only_request_new_ids(self, setup_device):
+        """Test that a read for several attributes joins the ones already in flight."""
+        device, client = setup_device
+
+        first = asyncio.create_task(device.get_attribute(Message4000))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(device.get_attributes([Message4000, Message4001]))
+        await asyncio.sleep(0.01)
+        self._arrive(device, 0x4000, self._message(1))
+        self._arrive(device, 0x4001, self._message(2))
+
+        assert (await first).VALUE == 1
+        assert {message_id: message.VALUE for message_id, message in (await second).items()} == {0x4000: 1, 0x4001: 2}
+        assert [c.kwargs["msgs"] for c in client.nasa_read.call_args_list] == [[0x4000], [0x4001]]
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_shared(self, setup_device, fast_timeout):
+        """Test that every caller of a read that times out gets TimeoutError."""
+        device, client = setup_device
+
+        results = await asyncio.gather(
+            device.get_attribute(Message9999),
+            device.get_attribute(Message9999),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, TimeoutError) for result in results)
+        client.nasa_read.assert_called_once()
+        assert device._attribute_reads == {}
+
+    @pytest.mark.asyncio
+    async def test_read_error_is_shared(self, setup_device):
+        """Test that an error sending the read is raised to every caller."""
+        device, client = setup_device
+        client.nasa_read.side_effect = ConnectionError("gone")
+
+        results = await asyncio.gather(
+            device.get_attribute(Message4203),
+            device.get_attribute(Message4203),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, ConnectionError) for result in results)
+        client.nasa_read.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_the_read(self, setup_device):
+        """Test that cancelling one caller still delivers the attribute to the others."""
+        device, client = setup_device
+        message = self._message(25.0)
+
+        cancelled = asyncio.create_task(device.get_attribute(Message4203))
+        other = asyncio.create_task(device.get_attribute(Message4203))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0.01)
+        self._arrive(device, 0x4203, message)
+
+        assert await other is message
+        client.nasa_read.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_next_read_after_completion_is_new(self, setup_device):
+        """Test that a read started after the previous one completed sends a new request."""
+        device, client = setup_device
+
+        for value in (1, 2):
+            task = asyncio.create_task(device.get_attribute(Message4203, requires_read=True))
+            await asyncio.sleep(0.01)
+            self._arrive(device, 0x4203, self._message(value))
+            assert (await task).VALUE == value
+
+        assert client.nasa_read.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_attribute_without_message_id(self, setup_device):
+        """Test that attributes need a MESSAGE_ID."""
+        device, _ = setup_device
+        with pytest.raises(ValueError, match="MESSAGE_ID"):
+            await device.get_attributes([BaseMessage])
@@ -0,0 +1,311 @@
+"""Tests for the callback dispatcher."""
+
+import asyncio
+import threading
+import time
+
+from unittest.mock import Mock
+
+import pytest
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.device import NasaDevice
+from pysamsungnasa.dispatch import CallbackDispatcher, CallbackMode, OverflowPolicy
+from pysamsungnasa.protocol.encoder import OutgoingPacket
+from pysamsungnasa.protocol.enum import AddressClass, DataType
+from pysamsungnasa.protocol.factory.types import SendMessage
+from pysamsungnasa.protocol.parser import NasaPacketParser
+
+
+def _stats(dispatcher, callback):
+    (stats,) = [stats for stats in dispatcher.statistics() if stats.name == callback.__qualname__]
+    return stats
+
+
+class TestCallbackDispatcher:
+    """Tests for CallbackDispatcher."""
+
+    def test_inline(self):
+        """Test that inline calls run immediately and are timed."""
+        dispatcher = CallbackDispatcher()
+        calls = []
+
+        def callback(value, flag=False):
+            calls.append((value, flag))
+
+        dispatcher.call(callback, 1, flag=True)
+        assert calls == [(1, True)]
+        stats = _stats(dispatcher, callback)
+        assert (stats.calls, stats.errors, stats.queued) == (1, 0, 0)
+        assert stats.total_time >= stats.max_time > 0
+
+    def test_inline_error_is_logged(self, caplog):
+        """Test that an error in a callback is counted and logged, not raised."""
+        dispatcher = CallbackDispatcher()
+
+        def broken():
+            raise RuntimeError("boom")
+
+        dispatcher.call(broken)
+        assert _stats(dispatcher, broken).errors == 1
+        assert "Error in callback" in caplog.text
+
+    async def test_task_mode_runs_later_in_order(self):
+        """Test that task mode queues calls and runs them in order without blocking the caller."""
+        dispatcher = CallbackDispatcher(CallbackMode.TASK)
+        calls = []
+        dispatcher.call(calls.append, 1)
+        dispatcher.call(calls.append, 2)
+        assert calls == []
+        await asyncio.sleep(0)
+        assert calls == [1, 2]
+
+    async def test_slow_callback_only_delays_itself(self):
+        """Test that each callback has its own queue."""
+        dispatcher = CallbackDispatcher(CallbackMode.TASK)
+        release = asyncio.Event()
+        fast = Mock()
+
+        async def slow():
+            await release.wait()
+
+        dispatcher.call(slow)
+        dispatcher.call(fast)
+        await asyncio.sleep(0)
+        fast.assert_called_once()
+        release.set()
+        await asyncio.sleep(0)
+        await dispatcher.close()
+
+    async def test_latest_replaces_call_with_same_key(self):
+        """Test that the latest policy keeps only the newest queued call for a key, in the older call's place."""
+        dispatcher = CallbackDispatcher(CallbackMode.TASK, overflow=OverflowPolicy.LATEST)
+        calls = []
+
+        def callback(value):
+            calls.append(value)
+
+        dispatcher.call(callback, "a1", key="a")
+        dispatcher.call(callback, "b1", key="b")
+        dispatcher.call(callback, "a2", key="a")
+        dispatcher.call(callback, "x")
+        dispatcher.call(callback, "y")
+        await asyncio.sleep(0)
+        assert calls == ["a2", "b1", "x", "y"]
+        assert _stats(dispatcher, callback).dropped == 1
+
+    @pytest.mark.parametrize("overflow", [OverflowPolicy.LATEST, OverflowPolicy.DROP_OLDEST])
+    async def test_full_queue_drops_oldest(self, overflow):
+        """Test that a full queue drops its oldest call."""
+        dispatcher = CallbackDispatcher(CallbackMode.TASK, queue_size=2, overflow=overflow)
+        calls = []
+
+        def callback(value):
+            calls.append(value)
+
+        for value in range(4):
+            dispatcher.call(callback, value, key=value)
+        await asyncio.sleep(0)
+        assert calls == [2, 3]
+        assert _stats(dispatcher, callback).dropped == 2
+
+    @pytest.mark.parametrize("overflow", [OverflowPolicy.LATEST, OverflowPolicy.DROP_OLDEST])
+    async def test_calls_without_key_are_dropped_when_full(self, overflow):
+        """Test that a full queue drops its oldest call without a key too, so it never grows past queue_size."""
+        dispatcher = CallbackDispatcher(CallbackMode.TASK, queue_size=2, overflow=overflow)
+        calls = []
+
+        def callback(value):
+            calls.append(value)
+
+        for value in range(5):
+            dispatcher.call(callback, value)
+        assert len(dispatcher._subscribers[callback].queue) == 2
+        await asyncio.sleep(0)
+        assert calls == [3, 4]
+        assert _stats(dispatcher, callback).dropped == 3
+
+    @pytest.mark.parametrize("overflow", [OverflowPolicy.LATEST, OverflowPolicy.DROP_OLDEST])
+    async def test_merged_calls_keep_queue_bounded(self, overflow):
+        """Test that calls with a merge function take one place per key and lose none of their arguments."""
+        dispatcher = CallbackDispatcher(CallbackMode.TASK, queue_size=10, overflow=overflow)
+        calls = []
+
+        def merge(queued, new):
+            return (queued[0] | new[0],)
+
+        def callback(ids):
+            calls.append(ids)
+
+        for value in range(5000):
+            dispatcher.call(callback, frozenset({value}), key="device", merge=merge)
+            dispatcher.call(callback, frozenset({value}), key="other device", merge=merge)
+            assert len(dispatcher._subscribers[callback].queue) <= 10
+        await asyncio.sleep(0)
+        assert calls == [frozenset(range(5000))] * 2
+        assert _stats(dispatcher, callback).dropped == 0
+
+    async def test_block_keeps_every_call_and_waits(self):
+        """Test that the block policy keeps every call and wait_for_room waits until the queue has room."""
+        dispatcher = CallbackDispatcher(CallbackMode.TASK, queue_size=1, overflow=OverflowPolicy.BLOCK)
+        calls = []
+
+        def callback(value):
+            calls.append(value)
+
+        for value in range(3):
+            dispatcher.call(callback, value, key="same")
+        assert dispatcher.blocked
+        await asyncio.wait_for(dispatcher.wait_for_room(), timeout=1.0)
+        assert not dispatcher.blocked
+        await asyncio.sleep(0)
+        assert calls == [0, 1, 2]
+
+    async def test_thread_mode(self):
+        """Test that thread mode runs plain callbacks on the thread pool and coroutines on the loop."""
+        dispatcher = CallbackDispatcher(CallbackMode.THREAD, threads=1)
+        threads = []
+        done = asyncio.Event()
+
+        def blocking():
+            time.sleep(0.01)
+            threads.append(threading.get_ident())
+
+        async def coroutine():
+            threads.append(threading.get_ident())
+            done.set()
+
+        dispatcher.call(blocking)
+        dispatcher.call(coroutine)
+        await asyncio.wait_for(done.wait(), timeout=1.0)
+        while len(threads) < 2:
+            await asyncio.sleep(0.01)
+        assert threading.get_ident() in threads
+        assert len(set(threads)) == 2
+        assert _stats(dispatcher, blocking).total_time >= 0.01
+        await dispatcher.close()
+
+    async def test_close_drops_queued_calls(self):
+        """Test that close cancels queued calls."""
+        dispatcher = CallbackDispatcher(CallbackMode.TASK)
+        callback = Mock()
+        dispatcher.call(callback)
+        await dispatcher.close()
+        await asyncio.sleep(0)
+        callback.assert_not_called()
+
+    async def test_inline_coroutine_is_tracked(self, caplog):
+        """Test that a coroutine returned by an inline callback is kept until done and its error counted."""
+        dispatcher = CallbackDispatcher()
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        dispatcher.call(broken)
+        (task,) = dispatcher._tasks
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert not dispatcher._tasks
+        assert _stats(dispatcher, broken).errors == 1
+        assert "Error in callback" in caplog.text
+
+    async def test_unsubscribe_drops_the_last_registration(self):
+        """Test that a callback is forgotten, with its queued calls, once every registration is removed."""
+        dispatcher = CallbackDispatcher(CallbackMode.TASK)
+        callback = Mock(__qualname__="callback")
+        dispatcher.subscribe(callback)
+        dispatcher.subscribe(callback)
+        dispatcher.call(callback, 1)
+        dispatcher.unsubscribe(callback)
+        assert _stats(dispatcher, callback).queued == 1
+        dispatcher.unsubscribe(callback)
+        assert dispatcher.statistics() == []
+        await asyncio.sleep(0)
+        callback.assert_not_called()
+
+    def test_invalid_options(self):
+        """Test that unknown modes and policies are rejected."""
+        with pytest.raises(ValueError):
+            CallbackDispatcher("later")
+        with pytest.raises(ValueError):
+            CallbackDispatcher(overflow="drop_newest")
+        with pytest.raises(ValueError):
+            CallbackDispatcher(queue_size=0)
+
+
+class TestDeviceCallbacksInTasks:
+    """Tests for device callbacks run by the parser's dispatcher."""
+
+    async def test_callbacks_do_not_run_in_the_receive_path(self):
+        """Test that in task mode parsing returns before the callbacks run."""
+        config = NasaConfig(callback_mode="task")
+        parser = NasaPacketParser(config=config)
+        device = NasaDevice(
+            address="200001", device_type=AddressClass.INDOOR, packet_parser=parser, config=config, client=Mock()
+        )
+        device_callback = Mock()
+        listener = Mock()
+        device.add_device_callback(device_callback)
+        parser.add_packet_listener(0x4000, listener)
+        messages = [SendMessage(0x4000, b"\x01"), SendMessage(0x4001, b"\x01")]
+        packet = OutgoingPacket.create("200001", "B0FF20", DataType.NOTIFICATION, messages).packet_data(1)
+
+        await parser.parse_packet(packet)
+        device_callback.assert_not_called()
+        listener.assert_not_called()
+        await asyncio.sleep(0)
+        device_callback.assert_called_once_with(device)  # Both datasets coalesced into one call
+        assert listener.call_args.kwargs["messageNumber"] == 0x4000
+        await parser.dispatcher.close()
+
+    async def test_change_callbacks_are_merged_per_device(self):
+        """Test that queued change callback calls for a device merge their IDs and keep the queue bounded."""
+        config = NasaConfig(callback_mode="task", callback_queue_size=2)
+        parser = NasaPacketParser(config=config)
+        device = NasaDevice(
+            address="200001", device_type=AddressClass.INDOOR, packet_parser=parser, config=config, client=Mock()
+        )
+        change_callback = Mock(__qualname__="change_callback")
+        device.add_change_callback(change_callback)
+
+        for value in range(50):
+            messages = [SendMessage(0x4000 + value, b"\x01")]
+            packet = OutgoingPacket.create("200001", "B0FF20", DataType.NOTIFICATION, messages).packet_data(value)
+            await parser.parse_packet(packet)
+            assert len(parser.dispatcher._subscribers[change_callback].queue) <= 2
+        await asyncio.sleep(0)
+        change_callback.assert_called_once_with(device, frozenset(range(0x4000, 0x4000 + 50)))
+        await parser.dispatcher.close()
+
+    async def test_removed_callbacks_leave_the_dispatcher(self):
+        """Test that removing device callbacks and parser listeners unsubscribes them."""
+        config = NasaConfig()
+        parser = NasaPacketParser(config=config)
+        device = NasaDevice(
+            address="200001", device_type=AddressClass.INDOOR, packet_parser=parser, config=config, client=Mock()
+        )
+        device_callback = Mock()
+        change_callback = Mock()
+        listener = Mock()
+        device.add_device_callback(device_callback)
+        device.add_change_callback(change_callback)
+        parser.add_event_listener(0x4000, listener)
+        assert len(parser.dispatcher.statistics()) == 3
+
+        device.remove_device_callback(device_callback)
+        device.remove_change_callback(change_callback)
+        parser.remove_event_listener(0x4000, listener)
+        assert parser.dispatcher.statistics() == []
+
+    async def test_event_listener_errors_are_caught(self, caplog):
+        """Test that an event listener raising does not stop the packet being processed."""
+        parser = NasaPacketParser(config=NasaConfig())
+        broken = Mock(side_effect=RuntimeError("boom"), __qualname__="broken")
+        listener = Mock(__qualname__="listener")
+        parser.add_event_listener(0x4000, broken)
+        parser.add_event_listener(0x4000, listener)
+        packet = OutgoingPacket.create("200001", "B0FF20", DataType.NOTIFICATION, [SendMessage(0x4000, b"\x01")])
+
+        await parser.parse_packet(packet.packet_data(1))
+        listener.assert_called_once()
+        assert "Error in callback broken" in caplog.text
@@ -0,0 +1,188 @@
+"""Tests for the binary packet encoder."""
+
+import binascii
+
+import pytest
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.helpers import Address, hex2bin
+from pysamsungnasa.nasa_client import NasaClient
+from pysamsungnasa.protocol import FrameDecoder, FrameEncoder
+from pysamsungnasa.protocol.encoder import (
+    PACKET_NUMBER_OFFSET,
+    FrameTemplate,
+    FrameTemplateCache,
+    OutgoingPacket,
+    address_bytes,
+)
+from pysamsungnasa.protocol.enum import DataType, PacketType
+from pysamsungnasa.protocol.factory import build_message
+from pysamsungnasa.protocol.factory.types import SendMessage
+
+MESSAGES = [
+    SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01"),
+    SendMessage(MESSAGE_ID=0x4201, PAYLOAD=b"\x00\xdc"),
+    SendMessage(MESSAGE_ID=0x4401, PAYLOAD=b"\x00\x00\x01\x02"),
+]
+
+
+def _hex_encode(template: str, packet_number: int) -> bytes:
+    """Encode a frame from a build_message template, as send_command did before the binary encoder."""
+    return FrameEncoder.encode(hex2bin(template.format(CUR_PACK_NUM=f"{packet_number:02x}")))
+
+
+class TestAddressBytes:
+    """Tests for address_bytes."""
+
+    @pytest.mark.parametrize("address", ["80ff01", "80FF01", b"\x80\xff\x01", Address(0x80, 0xFF, 0x01)])
+    def test_forms(self, address):
+        """Test that every address form gives the same bytes."""
+        assert address_bytes(address) == b"\x80\xff\x01"
+
+    @pytest.mark.parametrize("address", ["80ff", b"\x80\xff\x01\x02", "zzzzzz"])
+    def test_invalid(self, address):
+        """Test that malformed addresses are rejected."""
+        with pytest.raises(ValueError):
+            address_bytes(address)
+
+
+class TestOutgoingPacket:
+    """Tests for OutgoingPacket."""
+
+    def test_no_messages_raises(self):
+        """Test that a packet needs at least one message."""
+        with pytest.raises(ValueError, match="At least one message is required"):
+            OutgoingPacket.create("80FF01", "200001", DataType.WRITE, [])
+
+    @pytest.mark.parametrize("data_type", [DataType.WRITE, DataType.REQUEST, DataType.READ, DataType.NOTIFICATION])
+    @pytest.mark.parametrize("packet_number", [0, 1, 0x7F, 0xFF])
+    def test_matches_hex_encoding(self, data_type, packet_number):
+        """Test that the binary encoder produces the same frame as the hex round trip."""
+        packet = OutgoingPacket.create("80FF01", "200001", data_type, MESSAGES)
+        template = build_message("80FF01", "200001", data_type, MESSAGES)
+        assert packet.encode(packet_number) == _hex_encode(template, packet_number)
+
+    def test_decodes_back(self):
+        """Test that an encoded frame passes the decoder with the expected header."""
+        packet = OutgoingPacket.create("80FF01", "B0FF20", DataType.WRITE, MESSAGES)
+        (frame,) = FrameDecoder().feed(bytes(packet.encode(0x42)))
+        header = frame.header
+        assert header.source == "80FF01"
+        assert header.dest == "b0ff20"
+        assert header.protocol_version == 2
+        assert header.retry_counter == 0
+        assert header.packet_type == PacketType.NORMAL
+        assert header.payload_type == DataType.WRITE
+        assert header.packet_number == 0x42
+        assert header.dataset_count == 3
+        assert frame.data[10:] == bytes.fromhex("400001" + "420100dc" + "440100000102")
+
+    def test_read_payloads_are_zero(self):
+        """Test that READ requests get a zero payload sized by the message ID, whatever the message carries."""
+        messages = [SendMessage(MESSAGE_ID=message_id, PAYLOAD=b"\x05\xa5\xa5\xa5") for message_id in (0x4000, 0x4201)]
+        packet = OutgoingPacket.create("80FF01", "200001", DataType.READ, messages)
+        assert packet.packet_data(1)[10:] == bytes.fromhex("400000" + "42010000")
+
+    def test_packet_number_offset(self):
+        """Test that the packet number is written at PACKET_NUMBER_OFFSET."""
+        frame = OutgoingPacket.create("80FF01", "200001", DataType.WRITE, MESSAGES).encode(0xA5)
+        assert frame[PACKET_NUMBER_OFFSET] == 0xA5
+        assert binascii.crc_hqx(frame[3:-3], 0) == int.from_bytes(frame[-3:-1], "big")
+
+    def test_hex_views(self):
+        """Test the hex views used for logging and the CLI."""
+        packet = OutgoingPacket.create("80ff01", "200001", DataType.WRITE, MESSAGES[:1])
+        assert packet.hex(0x10) == "80FF01200001C0121001400001"
+        assert packet.hex_template() == "80FF01200001C012{CUR_PACK_NUM}01400001"
+
+
+def _read(destination: str, *message_ids: int) -> OutgoingPacket:
+    return OutgoingPacket.create("80FF01", destination, DataType.READ, [SendMessage(i, b"") for i in message_ids])
+
+
+class TestFrameTemplateCache:
+    """Tests for FrameTemplateCache."""
+
+    def test_invalid_size(self):
+        """Test that the cache must hold at least one template."""
+        with pytest.raises(ValueError):
+            FrameTemplateCache(0)
+
+    @pytest.mark.parametrize("packet_number", [0, 1, 0x80, 0xFF])
+    def test_template_matches_encoder(self, packet_number):
+        """Test that a patched template is the frame the encoder produces."""
+        packet = _read("200000", 0x4000, 0x4201, 0x4401)
+        template = FrameTemplateCache().template(packet)
+        assert template.encode(packet_number) == packet.encode(packet_number)
+
+    def test_template_encode_copies(self):
+        """Test that encoding a template does not change it."""
+        template = FrameTemplate(bytes(_read("200000", 0x4000).encode(0)))
+        template.encode(7)[0] = 0
+        assert template.encode(8)[PACKET_NUMBER_OFFSET] == 8
+        assert template.frame[0] == 0x32
+
+    def test_hits_and_misses(self):
+        """Test that the same destination and message IDs reuse the template."""
+        cache = FrameTemplateCache()
+        first = cache.template(_read("200000", 0x4000, 0x4001))
+        assert cache.template(_read("200000", 0x4000, 0x4001)) is first
+        assert cache.template(_read("200001", 0x4000, 0x4001)) is not first
+        assert cache.template(_read("200000", 0x4001, 0x4000)) is not first
+        assert (cache.hits, cache.misses, len(cache)) == (1, 3, 3)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the least recently used template is dropped once the cache is full."""
+        cache = FrameTemplateCache(2)
+        first = cache.template(_read("200000", 0x4000))
+        cache.template(_read("200000", 0x4001))
+        cache.template(_read("200000", 0x4000))  # Now the most recently used
+        cache.template(_read("200000", 0x4002))
+        assert cache.evictions == 1
+        assert cache.template(_read("200000", 0x4000)) is first
+        assert cache.misses == 3
+
+    def test_only_read_packets(self):
+        """Test that packets with payloads are not cached."""
+        packet = OutgoingPacket.create("80FF01", "200000", DataType.WRITE, MESSAGES)
+        with pytest.raises(ValueError):
+            FrameTemplateCache().template(packet)
+
+    def test_clear(self):
+        """Test that clear drops every template."""
+        cache = FrameTemplateCache()
+        cache.template(_read("200000", 0x4000))
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestSendCommand:
+    """Tests for sending encoded packets through NasaClient."""
+
+    async def test_packet_is_encoded_with_the_next_packet_number(self, nasa_client):
+        """Test that send_command encodes an OutgoingPacket with the packet number it returns."""
+        packet = OutgoingPacket.create("80FF01", "200001", DataType.WRITE, MESSAGES)
+        packet_number = await nasa_client.send_command([packet])
+        assert nasa_client._tx_queue.get_nowait() == packet.encode(packet_number)
+
+    async def test_hex_templates_are_still_accepted(self, nasa_client):
+        """Test that build_message templates give the same frame as an OutgoingPacket."""
+        template = build_message("80FF01", "200001", DataType.WRITE, MESSAGES)
+        packet_number = await nasa_client.send_command([template])
+        expected = OutgoingPacket.create("80FF01", "200001", DataType.WRITE, MESSAGES).encode(packet_number)
+        assert nasa_client._tx_queue.get_nowait() == expected
+
+    async def test_repeated_reads_use_a_template(self, nasa_client):
+        """Test that polling the same attributes twice reuses the encoded frame."""
+        first = await nasa_client.nasa_read([0x4000, 0x4201], "200000")
+        frames = [nasa_client._tx_queue.get_nowait()]  # Sent before the next poll would supersede it
+        nasa_client._pending_reads.clear()
+        second = await nasa_client.nasa_read([0x4000, 0x4201], "200000")
+        frames.append(nasa_client._tx_queue.get_nowait())
+        assert nasa_client._frame_templates.hits == 1
+        assert frames == [_read("200000", 0x4000, 0x4201).encode(number) for number in (first, second)]
+
+    async def test_template_cache_can_be_disabled(self):
+        """Test that a cache size of 0 encodes every READ packet."""
+        client = NasaClient(config=NasaConfig(device_path="socket://localhost:8000", frame_template_cache_size=0))
+        assert client._frame_templates is None
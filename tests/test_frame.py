@@ -0,0 +1,148 @@
+"""Tests for the sans-IO frame decoder and encoder."""
+
+import binascii
+
+from pysamsungnasa.helpers import bin2hex
+from pysamsungnasa.protocol import FrameDecoder, FrameEncoder
+from pysamsungnasa.protocol.enum import AddressClass, DataType, PacketType
+
+PACKET_DATA = bytes.fromhex("200000b0ff20c0140101400001")
+
+
+def _legacy_encode(packet_data: bytes) -> bytes:
+    """Encode a frame the way send_command used to, from hex strings."""
+    msg = bin2hex(packet_data)
+    crc = binascii.crc_hqx(packet_data, 0)
+    return bytes.fromhex(f"32{len(packet_data) + 4:04x}{msg}{crc:04x}34")
+
+
+class TestFrameEncoder:
+    """Tests for FrameEncoder."""
+
+    def test_matches_legacy_encoding(self):
+        """Test that the encoder produces the same bytes as the hex based encoder."""
+        assert FrameEncoder.encode(PACKET_DATA) == _legacy_encode(PACKET_DATA)
+
+    def test_round_trip(self):
+        """Test that an encoded frame decodes back to its packet data."""
+        (frame,) = FrameDecoder().feed(FrameEncoder.encode(PACKET_DATA))
+        assert frame.data == PACKET_DATA
+        assert frame.crc == binascii.crc_hqx(PACKET_DATA, 0)
+        assert frame.is_crc_valid
+
+
+class TestFrame:
+    """Tests for Frame."""
+
+    def test_header_is_parsed(self):
+        """Test that decoded frames carry the parsed packet header."""
+        (frame,) = FrameDecoder().feed(FrameEncoder.encode(PACKET_DATA))
+        header = frame.header
+        assert header.source == "200000"
+        assert header.source_class == AddressClass.INDOOR
+        assert header.dest == "b0ff20"
+        assert header.is_info == 1
+        assert header.protocol_version == 2
+        assert header.retry_counter == 0
+        assert header.packet_type == PacketType.NORMAL
+        assert header.payload_type == DataType.NOTIFICATION
+        assert header.packet_number == 0x01
+        assert header.dataset_count == 0x01
+
+
+class TestFrameDecoder:
+    """Tests for FrameDecoder."""
+
+    def test_frame_split_across_chunks(self):
+        """Test that a frame fed one byte at a time is emitted once complete."""
+        decoder = FrameDecoder()
+        raw = FrameEncoder.encode(PACKET_DATA)
+        frames = []
+        for index in range(len(raw)):
+            frames.extend(decoder.feed(raw[index : index + 1]))
+            if index < len(raw) - 1:
+                assert not frames
+        assert [frame.raw for frame in frames] == [raw]
+        assert len(decoder) == 0
+        assert decoder.statistics.frames == 1
+        assert decoder.statistics.received_bytes == len(raw)
+
+    def test_multiple_frames_in_one_chunk(self):
+        """Test that several frames in one chunk are all emitted."""
+        decoder = FrameDecoder()
+        raw = FrameEncoder.encode(PACKET_DATA)
+        assert [frame.raw for frame in decoder.feed(raw * 3)] == [raw] * 3
+
+    def test_garbage_is_skipped(self):
+        """Test that bytes before the STX are skipped and counted."""
+        decoder = FrameDecoder()
+        raw = FrameEncoder.encode(PACKET_DATA)
+        assert [frame.raw for frame in decoder.feed(b"\x00\x01\x02" + raw)] == [raw]
+        assert decoder.statistics.skipped_bytes == 3
+
+    def test_invalid_etx_resyncs(self):
+        """Test that a candidate with a bad ETX is rejected and the next frame is found."""
+        decoder = FrameDecoder()
+        raw = FrameEncoder.encode(PACKET_DATA)
+        bad = raw[:-1] + b"\x00"
+        assert [frame.raw for frame in decoder.feed(bad + raw)] == [raw]
+        assert decoder.statistics.resyncs == 1
+        assert decoder.statistics.skipped_bytes == len(bad)
+
+    def test_invalid_crc_resyncs(self):
+        """Test that a candidate with a bad CRC is rejected and the next frame is found."""
+        decoder = FrameDecoder()
+        raw = FrameEncoder.encode(PACKET_DATA)
+        bad = bytearray(raw)
+        bad[5] ^= 0xFF
+        assert [frame.raw for frame in decoder.feed(bytes(bad) + raw)] == [raw]
+        assert decoder.statistics.crc_errors == 1
+        assert decoder.statistics.resyncs == 1
+        assert decoder.statistics.frames == 1
+
+    def test_corrupt_length_does_not_swallow_frames(self):
+        """Test that a corrupt length field spanning real frames only costs the corrupt candidate."""
+        decoder = FrameDecoder()
+        raw = FrameEncoder.encode(PACKET_DATA)
+        # The bogus length covers exactly the next frame and ends on its ETX, so only the CRC rejects it.
+        bogus = b"\x32" + (len(raw) + 3 - 2).to_bytes(2, "big")
+        assert [frame.raw for frame in decoder.feed(bogus + raw)] == [raw]
+        assert decoder.statistics.crc_errors == 1
+        assert decoder.statistics.skipped_bytes == len(bogus)
+
+    def test_implausible_length_resyncs(self):
+        """Test that an implausible size field is rejected without waiting for more data."""
+        decoder = FrameDecoder()
+        raw = FrameEncoder.encode(PACKET_DATA)
+        assert [frame.raw for frame in decoder.feed(b"\x32\xff\xff" + raw)] == [raw]
+        assert decoder.statistics.resyncs == 1
+        assert decoder.statistics.skipped_bytes == 3
+
+    def test_frames_are_consumed_lazily(self):
+        """Test that frames stay buffered until the iterator is advanced."""
+        decoder = FrameDecoder()
+        raw = FrameEncoder.encode(PACKET_DATA)
+        frames = decoder.feed(raw * 2)
+        assert len(decoder) == len(raw) * 2
+        next(frames)
+        assert len(decoder) == len(raw)
+        assert len(list(frames)) == 1
+        assert len(decoder) == 0
+
+    def test_overflow_is_counted(self):
+        """Test that overflowing the buffer is counted and discards the backlog."""
+        decoder = FrameDecoder(max_buffer_size=32)
+        assert not list(decoder.feed(b"\x32\x00\x1c" + b"\x00" * 20))
+        assert not list(decoder.feed(b"\x00" * 20))
+        assert decoder.statistics.overflows == 1
+        assert decoder.statistics.skipped_bytes == 43
+        assert len(decoder) == 0
+
+    def test_reset(self):
+        """Test that reset discards a partial frame."""
+        decoder = FrameDecoder()
+        raw = FrameEncoder.encode(PACKET_DATA)
+        list(decoder.feed(raw[:5]))
+        decoder.reset()
+        assert len(decoder) == 0
+        assert [frame.raw for frame in decoder.feed(raw)] == [raw]
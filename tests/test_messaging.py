@@ -2,6 +2,7 @@
 
 import pytest
 import struct
+from unittest.mock import Mock
 from pysamsungnasa.protocol.factory.types import (
     SendMessage,
     BaseMessage,
@@ -330,3 +331,49 @@ class TestIntegerMessage:
         payload = b"\x64"  # Hex for 100
         msg = IntegerMessage.parse_payload(payload)
         assert msg.VALUE == 100
+
+
+class TestLazyMessage:
+    """Tests for lazily decoded messages."""
+
+    def test_lazy_message_is_not_decoded_until_read(self):
+        """Test that a lazy message only decodes its payload when VALUE is read."""
+        parser = Mock(side_effect=BoolMessage.parse_payload)
+        msg = BoolMessage.lazy(b"\x01", parser)
+        assert isinstance(msg, BoolMessage)
+        assert not msg.is_decoded
+        assert msg.RAW_PAYLOAD == b"\x01"
+        parser.assert_not_called()
+
+        assert msg.VALUE is True
+        assert msg.is_decoded
+        assert msg.as_dict["value"] is True
+        parser.assert_called_once_with(b"\x01")
+
+    def test_lazy_message_defaults_to_parse_payload(self):
+        """Test that a lazy message decodes with parse_payload by default."""
+
+        class TestEnum(SamsungEnum):
+            VALUE1 = 1
+            VALUE2 = 2
+
+        class TestEnumMsg(EnumMessage):
+            MESSAGE_ENUM = TestEnum
+            ENUM_DEFAULT = TestEnum.VALUE1
+
+        msg = TestEnumMsg.lazy(b"\x02")
+        assert msg.OPTIONS == ["VALUE1", "VALUE2"]
+        assert msg.VALUE == TestEnum.VALUE2
+
+    def test_lazy_message_decode_error_falls_back_to_hex(self):
+        """Test that a payload that fails to decode is exposed as hex, like a raw message."""
+        msg = FloatMessage.lazy(b"\x01\x02\x03")
+        assert msg.VALUE == "010203"
+
+    def test_lazy_message_value_can_be_set(self):
+        """Test that setting VALUE replaces the pending decode."""
+        parser = Mock(side_effect=BoolMessage.parse_payload)
+        msg = BoolMessage.lazy(b"\x01", parser)
+        msg.VALUE = False
+        assert msg.VALUE is False
+        parser.assert_not_called()
@@ -0,0 +1,135 @@
+"""Tests for TX pacing."""
+
+import asyncio
+
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.nasa_client import NasaClient
+from pysamsungnasa.protocol.pacing import BITS_PER_BYTE, TokenBucket, TxPacer
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    def test_invalid(self):
+        """Test that a bucket needs a positive rate and a capacity of at least one token."""
+        with pytest.raises(ValueError):
+            TokenBucket(0, 1)
+        with pytest.raises(ValueError):
+            TokenBucket(10, 0.5)
+
+    def test_burst_then_rate(self):
+        """Test that a full bucket allows a burst and then one frame per 1/rate seconds."""
+        bucket = TokenBucket(rate=10, capacity=3)
+        for _ in range(3):
+            assert bucket.delay(100.0) == 0
+            bucket.consume(100.0)
+        assert bucket.delay(100.0) == pytest.approx(0.1)
+        assert bucket.delay(100.05) == pytest.approx(0.05)
+        assert bucket.delay(100.1) == pytest.approx(0, abs=1e-9)
+
+    def test_refill_is_capped(self):
+        """Test that an idle bucket never holds more than its capacity."""
+        bucket = TokenBucket(rate=10, capacity=2)
+        bucket.delay(1000.0)
+        assert bucket.tokens == 2
+
+
+class TestTxPacer:
+    """Tests for TxPacer."""
+
+    def test_invalid_baudrate(self):
+        """Test that the baudrate must be positive."""
+        with pytest.raises(ValueError):
+            TxPacer(baudrate=0, idle_gap=0.01)
+
+    def test_wire_time(self):
+        """Test that the wire time counts start, parity and stop bits."""
+        pacer = TxPacer(baudrate=9600, idle_gap=0.0)
+        assert BITS_PER_BYTE == 11
+        assert pacer.wire_time(96) == pytest.approx(0.11)
+
+    def test_idle_bus_sends_immediately(self):
+        """Test that nothing is delayed on a bus that has been quiet."""
+        assert TxPacer(baudrate=9600, idle_gap=0.02).delay(10.0) == 0
+
+    def test_waits_for_rx_idle_gap(self):
+        """Test that sending waits until the bus has been quiet for the idle gap after receiving."""
+        pacer = TxPacer(baudrate=9600, idle_gap=0.02)
+        pacer.on_rx(10.0)
+        assert pacer.delay(10.005) == pytest.approx(0.015)
+        assert pacer.delay(10.02) == 0
+
+    def test_waits_for_frame_on_the_wire(self):
+        """Test that the next frame waits for the previous one to leave the wire plus the idle gap."""
+        pacer = TxPacer(baudrate=9600, idle_gap=0.01)
+        pacer.on_tx(10.0, 96)  # 110 ms on the wire
+        assert pacer.delay(10.0) == pytest.approx(0.12)
+        pacer.on_tx(10.0, 96)  # Queued behind the first frame in the UART
+        assert pacer.tx_busy_until == pytest.approx(10.22)
+
+    def test_rate_limit(self):
+        """Test that the token bucket limits frames sent on an idle bus."""
+        pacer = TxPacer(baudrate=1_000_000, idle_gap=0.0, rate=10, burst=1)
+        pacer.on_tx(10.0, 10)
+        assert pacer.idle_delay(10.01) == 0
+        assert pacer.rate_delay(10.01) == pytest.approx(0.09)
+        assert pacer.delay(10.01) == pytest.approx(0.09)
+
+    def test_no_rate_limit(self):
+        """Test that a rate of 0 disables the token bucket."""
+        pacer = TxPacer(baudrate=9600, idle_gap=0.0, rate=0)
+        assert pacer.bucket is None
+        assert pacer.rate_delay(0.0) == 0
+
+
+class TestClientPacing:
+    """Tests for pacing in NasaClient."""
+
+    async def test_receive_updates_last_rx_time(self, nasa_client):
+        """Test that received bytes update the RX timestamp used for pacing."""
+        nasa_client._last_rx_time = 0.0
+        await nasa_client._read_buffer_handler(b"\x00")
+        now = asyncio.get_running_loop().time()
+        assert 0 < nasa_client._last_rx_time <= now
+        assert nasa_client._pacer.last_rx_time == nasa_client._last_rx_time
+
+    async def test_wait_for_bus_waits_for_idle_gap(self, nasa_client):
+        """Test that the writer waits out the idle gap after receiving."""
+        loop = asyncio.get_running_loop()
+        nasa_client._pacer.on_rx(loop.time())
+        started = loop.time()
+        await nasa_client._wait_for_bus()
+        assert loop.time() - started >= nasa_client._config.tx_idle_gap * 0.9
+
+    async def test_wait_for_bus_gives_up_on_a_busy_bus(self):
+        """Test that the writer sends anyway once the bus has been busy for tx_max_idle_wait."""
+        client = NasaClient(
+            config=NasaConfig(device_path="socket://localhost:8000", tx_idle_gap=10.0, tx_max_idle_wait=0.01)
+        )
+        client._pacer.on_rx(asyncio.get_running_loop().time())
+        await asyncio.wait_for(client._wait_for_bus(), timeout=1.0)
+
+    async def test_writer_paces_frames(self):
+        """Test that the writer records each frame with the pacer instead of sleeping a fixed time."""
+        client = NasaClient(config=NasaConfig(device_path="socket://localhost:8000"))
+        client._client = Mock()
+        client._client.is_connected = True
+        client._client.writer = Mock(drain=AsyncMock(), is_closing=Mock(return_value=False))
+        client._tx_queue = asyncio.Queue()
+        client._rx_queue = asyncio.Queue()
+        frame = bytes(20)
+        await client._tx_queue.put(frame)
+
+        with patch.object(client, "_wait_for_bus", new_callable=AsyncMock) as wait_for_bus:
+            task = asyncio.create_task(client._writer())
+            await client._tx_queue.join()
+            client._client.is_connected = False
+            await task
+
+        wait_for_bus.assert_awaited_once()
+        client._client.writer.write.assert_called_once_with(frame)
+        assert client._pacer.tx_busy_until > client._pacer.last_rx_time
@@ -0,0 +1,84 @@
+"""Tests for the packet header and message events."""
+
+import pytest
+
+from pysamsungnasa.helpers import hex2bin
+from pysamsungnasa.protocol.enum import AddressClass, DataType, PacketType
+from pysamsungnasa.protocol.factory.types import RawMessage
+from pysamsungnasa.protocol.packet import MessageEvent, PacketHeader
+
+PACKET_DATA = hex2bin("B0FF20" + "80FF01" + "C8" + "15" + "42" + "01" + "40000001")
+
+
+class TestPacketHeader:
+    """Tests for PacketHeader."""
+
+    def test_parse(self):
+        """Test that every header field is parsed."""
+        header = PacketHeader.parse(PACKET_DATA)
+        assert header.source == "B0FF20"
+        assert header.source_class == AddressClass.BML
+        assert header.dest == "80ff01"
+        assert header.is_info == 1
+        assert header.protocol_version == 2
+        assert header.retry_counter == 1
+        assert header.packet_type == PacketType.NORMAL
+        assert header.payload_type == DataType.RESPONSE
+        assert header.packet_number == 0x42
+        assert header.dataset_count == 1
+
+    def test_unknown_values(self):
+        """Test that unknown classes and types fall back to UNKNOWN."""
+        header = PacketHeader.parse(hex2bin("FE0000" + "FD0000" + "80" + "FF" + "00" + "00"))
+        assert header.source_class == AddressClass.UNKNOWN
+        assert header.dest_class == AddressClass.UNKNOWN
+        assert header.packet_type == PacketType.UNKNOWN
+        assert header.payload_type == DataType.UNKNOWN
+
+    def test_too_short(self):
+        """Test that short packet data is rejected."""
+        with pytest.raises(ValueError):
+            PacketHeader.parse(PACKET_DATA[:9])
+
+    def test_immutable(self):
+        """Test that the header can be shared safely between events."""
+        header = PacketHeader.parse(PACKET_DATA)
+        with pytest.raises(AttributeError):
+            header.source = "200000"  # type: ignore[misc]
+
+
+class TestMessageEvent:
+    """Tests for MessageEvent."""
+
+    def test_as_kwargs(self):
+        """Test that the kwargs match the legacy handler arguments."""
+        message = RawMessage(value="01")
+        event = MessageEvent(PacketHeader.parse(PACKET_DATA), 0x4000, message)
+        assert event.as_kwargs() == {
+            "source": "B0FF20",
+            "source_class": AddressClass.BML,
+            "dest": "80ff01",
+            "dest_class": AddressClass.JIG_TESTER,
+            "isInfo": 1,
+            "protocolVersion": 2,
+            "retryCounter": 1,
+            "packetType": PacketType.NORMAL,
+            "payloadType": DataType.RESPONSE,
+            "packetNumber": 0x42,
+            "formattedMessageNumber": "0x4000",
+            "messageNumber": 0x4000,
+            "packet": message,
+        }
+
+    def test_from_kwargs_round_trip(self):
+        """Test that an event survives conversion to kwargs and back."""
+        event = MessageEvent(PacketHeader.parse(PACKET_DATA), 0x4000, RawMessage(value="01"))
+        assert MessageEvent.from_kwargs(event.as_kwargs()) == event
+
+    def test_from_partial_kwargs(self):
+        """Test that missing header fields get defaults."""
+        message = RawMessage(value="01")
+        event = MessageEvent.from_kwargs({"messageNumber": 0x4000, "packet": message, "dest": "80FF01"})
+        assert event.header.dest == "80FF01"
+        assert event.header.source_class == AddressClass.UNKNOWN
+        assert event.message is message
@@ -2,7 +2,9 @@
 
 import pytest
 from unittest.mock import Mock, AsyncMock, call
-from pysamsungnasa.protocol.parser import NasaPacketParser
+from pysamsungnasa.protocol.frame import FrameDecoder, FrameEncoder
+from pysamsungnasa.protocol.factory import DECODE_TABLE
+from pysamsungnasa.protocol.parser import InvalidPacketError, NasaPacketParser, read_datasets
 from pysamsungnasa.protocol.enum import PacketType, DataType, AddressClass
 from pysamsungnasa.config import NasaConfig
 from pysamsungnasa.helpers import hex2bin
@@ -230,6 +232,21 @@ class TestNasaPacketParser:
         # New device handler should be called for unknown source
         assert len(handler_called) > 0, "New device handler should have been called for unknown device"
 
+    async def test_new_device_gets_the_rest_of_its_first_packet(self):
+        """Test that a device registered by the new device handler receives the remaining datasets of the packet."""
+        config = NasaConfig(client_address=1)
+        events = []
+
+        async def new_device_handler(**kwargs):
+            parser.add_device_event_handler(kwargs["source"], events.append)
+
+        parser = NasaPacketParser(config=config, _new_device_handler=new_device_handler)
+        packet_hex = "200001" + "80FF01" + "80" + "14" + "01" + "03" + "400001" + "400101" + "400200"
+
+        await parser.parse_packet(hex2bin(packet_hex))
+
+        assert [event.message_number for event in events] == [0x4001, 0x4002]
+
     @pytest.mark.asyncio
     async def test_parse_packet_protocol_fields(self):
         """Test that protocol fields are correctly extracted."""
@@ -313,3 +330,170 @@ class TestNasaPacketParser:
             args = pending_handler.call_args[0]
             assert args[0] == "200001"
             assert args[1] == []
+
+    @pytest.mark.asyncio
+    async def test_parse_packet_accepts_decoded_frame(self):
+        """Test that a decoded frame is parsed using its pre-parsed header."""
+        config = NasaConfig(client_address=1)
+        parser = NasaPacketParser(config=config)
+
+        packet_data = hex2bin("200001" + "80FF01" + "C8" + "15" + "42" + "01" + "40000001")
+        (frame,) = FrameDecoder().feed(FrameEncoder.encode(packet_data))
+
+        callback = Mock()
+        parser.add_device_handler("200001", callback)
+
+        await parser.parse_packet(frame)
+
+        assert callback.called
+        kwargs = callback.call_args[1]
+        assert kwargs["source"] == "200001"
+        assert kwargs["payloadType"] == DataType.RESPONSE
+        assert kwargs["retryCounter"] == 1
+        assert kwargs["packetNumber"] == 0x42
+        assert kwargs["messageNumber"] == 0x4000
+        assert parser._latest_packet is frame
+
+    @pytest.mark.asyncio
+    async def test_frame_with_too_many_datasets_is_dropped(self, caplog):
+        """Test that a dataset count past the end of a frame drops it instead of reading the CRC as datasets."""
+        parser = NasaPacketParser(config=NasaConfig(client_address=1))
+        handler = Mock()
+        parser.add_device_event_handler("200001", handler)
+        packet_data = hex2bin("200001" + "80FF01" + "C0" + "14" + "42" + "02" + "40000001")
+        (frame,) = FrameDecoder().feed(FrameEncoder.encode(packet_data))
+        table_size = len(DECODE_TABLE)
+
+        await parser.parse_packet(frame)
+
+        handler.assert_not_called()
+        assert len(DECODE_TABLE) == table_size
+        assert "Dropping packet from 200001" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_truncated_payload_is_dropped(self):
+        """Test that a packet ending inside a dataset's payload is dropped rather than cut short."""
+        parser = NasaPacketParser(config=NasaConfig(client_address=1))
+        handler = Mock()
+        parser.add_device_event_handler("200001", handler)
+
+        await parser.parse_packet(hex2bin("200001" + "80FF01" + "C0" + "14" + "42" + "02" + "400001" + "420301"))
+
+        handler.assert_not_called()
+
+    def test_read_datasets_rejects_structure_with_other_datasets(self):
+        """Test that a structure is only accepted as the only dataset of a packet."""
+        buffer = hex2bin("060001" + "400001")
+        with pytest.raises(InvalidPacketError, match="struct"):
+            read_datasets(buffer, 0, len(buffer), 2)
+
+    @pytest.mark.asyncio
+    async def test_parse_packet_decodes_lazily(self):
+        """Test that dispatched messages are only decoded when their value is read."""
+        config = NasaConfig(client_address=1)
+        parser = NasaPacketParser(config=config)
+
+        packet_data = hex2bin("200001" + "80FF01" + "80" + "14" + "01" + "01" + "42030102")
+
+        callback = Mock()
+        parser.add_device_handler("200001", callback)
+
+        await parser.parse_packet(packet_data)
+
+        message = callback.call_args[1]["packet"]
+        assert not message.is_decoded
+        assert message.RAW_PAYLOAD == b"\x01\x02"
+        assert message.VALUE == pytest.approx(25.8)
+        assert message.is_decoded
+
+    @pytest.mark.asyncio
+    async def test_parse_packet_dispatches_events(self):
+        """Test that event handlers receive one event per dataset sharing the packet header."""
+        config = NasaConfig(client_address=1)
+        parser = NasaPacketParser(config=config)
+
+        packet_data = hex2bin("200001" + "80FF01" + "80" + "14" + "07" + "02" + "400001" + "420300FA")
+
+        handler = Mock()
+        listener = Mock()
+        parser.add_device_event_handler("200001", handler)
+        parser.add_event_listener(0x4203, listener)
+
+        await parser.parse_packet(packet_data)
+
+        events = [args[0][0] for args in handler.call_args_list]
+        assert [event.message_number for event in events] == [0x4000, 0x4203]
+        assert events[0].header is events[1].header
+        assert events[0].header.packet_number == 0x07
+        listener.assert_called_once_with(events[1])
+
+    @pytest.mark.asyncio
+    async def test_event_and_kwargs_handlers_together(self):
+        """Test that kwargs style handlers still receive the legacy arguments next to event handlers."""
+        config = NasaConfig(client_address=1)
+        new_device_handler = Mock()
+        parser = NasaPacketParser(config=config, _new_device_handler=new_device_handler)
+
+        packet_data = hex2bin("200001" + "80FF01" + "80" + "14" + "07" + "01" + "400001")
+
+        event_handler = Mock()
+        kwargs_handler = Mock()
+        parser.add_device_event_handler("200001", event_handler)
+        parser.add_device_handler("200001", kwargs_handler)
+
+        await parser.parse_packet(packet_data)
+
+        event = event_handler.call_args[0][0]
+        assert kwargs_handler.call_args[1] == event.as_kwargs()
+        new_device_handler.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_removed_event_handler_is_not_called(self):
+        """Test removing event handlers and listeners."""
+        config = NasaConfig(client_address=1)
+        parser = NasaPacketParser(config=config)
+        handler = Mock()
+        listener = Mock()
+        parser.add_device_event_handler("200001", handler)
+        parser.add_event_listener(0x4000, listener)
+        parser.remove_device_event_handler("200001", handler)
+        parser.remove_event_listener(0x4000, listener)
+
+        await parser.parse_packet(hex2bin("200001" + "80FF01" + "80" + "14" + "07" + "01" + "400001"))
+
+        handler.assert_not_called()
+        listener.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_debug_logging_is_filtered_by_message(self, caplog):
+        """Test that only datasets matching the log filter are logged and decoded at debug level."""
+        config = NasaConfig(client_address=1, messages_to_log=[0x4000])
+        parser = NasaPacketParser(config=config)
+        handler = Mock()
+        parser.add_device_event_handler("200001", handler)
+
+        packet_data = hex2bin("200001" + "B0FF20" + "80" + "14" + "01" + "02" + "400001" + "42030102")
+        with caplog.at_level("DEBUG", logger="pysamsungnasa.protocol.parser"):
+            await parser.parse_packet(packet_data)
+
+        parsed = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Parsed")]
+        assert len(parsed) == 1
+        assert "0x4000" in parsed[0]
+        events = {event.message_number: event for (event,), _ in handler.call_args_list}
+        assert events[0x4000].message.is_decoded
+        assert not events[0x4203].message.is_decoded
+
+    @pytest.mark.asyncio
+    async def test_messages_are_not_decoded_for_logging_when_debug_is_off(self, caplog):
+        """Test that the log filter is not consulted unless debug logging is enabled."""
+        config = NasaConfig(client_address=1, log_all_messages=True)
+        parser = NasaPacketParser(config=config)
+        handler = Mock()
+        parser.add_device_event_handler("200001", handler)
+
+        with caplog.at_level("INFO", logger="pysamsungnasa.protocol.parser"):
+            await parser.parse_packet(hex2bin("200001" + "80FF01" + "80" + "14" + "01" + "01" + "42030102"))
+
+        (event,), _ = handler.call_args
+        assert not event.message.is_decoded
+        assert config._log_filter is None
@@ -0,0 +1,184 @@
+"""Tests for the poll scheduler."""
+
+import asyncio
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.nasa import SamsungNasa
+from pysamsungnasa.polling import PollScheduler
+from pysamsungnasa.protocol.encoder import OutgoingPacket
+from pysamsungnasa.protocol.enum import DataType
+from pysamsungnasa.protocol.factory.messages.indoor import InOperationPowerMessage
+from pysamsungnasa.protocol.factory.types import SendMessage
+from pysamsungnasa.protocol.parser import NasaPacketParser
+
+
+def _notification(source, message_id):
+    """Return a NOTIFICATION packet from source carrying message_id."""
+    packet = OutgoingPacket.create(source, "B0FF20", DataType.NOTIFICATION, [SendMessage(message_id, b"\x01")])
+    return packet.packet_data(1)
+
+
+@pytest.fixture
+def parser():
+    """Create a parser."""
+    return NasaPacketParser(config=NasaConfig())
+
+
+@pytest.fixture
+def read():
+    """Create a read function that records its calls."""
+    return AsyncMock(return_value=1)
+
+
+def _sent(read):
+    """Return the (destination, message IDs) of every read sent."""
+    return sorted((call.args[1], tuple(call.args[0])) for call in read.call_args_list)
+
+
+class TestPollScheduler:
+    """Tests for PollScheduler."""
+
+    async def test_due_polls_are_packed_per_destination(self, parser, read):
+        """Test that due messages are sent in READ packets of at most 10 per destination."""
+        scheduler = PollScheduler(parser, read, jitter=0)
+        scheduler.add("200000", range(0x4000, 0x400C), interval=10)
+        scheduler.add("200001", [0x4000, 0x4001], interval=10)
+        await scheduler._send(list(scheduler._polls.values()), asyncio.get_running_loop().time())
+        assert _sent(read) == [
+            ("200000", tuple(range(0x4000, 0x400A))),
+            ("200000", (0x400A, 0x400B)),
+            ("200001", (0x4000, 0x4001)),
+        ]
+        assert scheduler.reads == 3
+
+    async def test_packets_are_filled_with_polls_due_soon(self, parser, read):
+        """Test that a packet with room takes polls due within pack_ahead of their interval."""
+        scheduler = PollScheduler(parser, read, jitter=0, pack_ahead=0.25)
+        scheduler.add("200000", [0x4000, 0x4001, 0x4002], interval=10)
+        now = asyncio.get_running_loop().time()
+        polls = scheduler._polls
+        polls[("200000", 0x4001)].due = now + 2  # Within 25% of 10s
+        polls[("200000", 0x4002)].due = now + 5
+        await scheduler._send([polls[("200000", 0x4000)]], now)
+        assert _sent(read) == [("200000", (0x4000, 0x4001))]
+        assert polls[("200000", 0x4001)].due == now + 10
+        assert polls[("200000", 0x4002)].due == now + 5
+
+    async def test_runs_polls_at_their_interval(self, parser, read):
+        """Test that started polls are sent repeatedly and stop when the scheduler stops."""
+        scheduler = PollScheduler(parser, read, jitter=0)
+        scheduler.start()
+        scheduler.add("200000", [InOperationPowerMessage], interval=0.02)
+        await asyncio.sleep(0.07)
+        await scheduler.stop()
+        sent = read.call_count
+        assert sent >= 3
+        assert read.call_args.args == ([InOperationPowerMessage.MESSAGE_ID], "200000")
+        await asyncio.sleep(0.03)
+        assert read.call_count == sent
+
+    async def test_notification_postpones_poll(self, parser, read):
+        """Test that a value received in a notification counts as a refresh and pushes the next poll back."""
+        scheduler = PollScheduler(parser, read, jitter=0)
+        scheduler.add("200000", [0x4000], interval=10)
+        poll = scheduler._polls[("200000", 0x4000)]
+        await parser.parse_packet(_notification("200000", 0x4000))
+        await parser.parse_packet(_notification("200001", 0x4000))
+        assert poll.refreshes == 1
+        assert poll.due > asyncio.get_running_loop().time() + 9
+
+    async def test_statistics(self, parser, read):
+        """Test that requested and achieved refresh rates are reported."""
+        scheduler = PollScheduler(parser, read, jitter=0)
+        scheduler.add("200000", [0x4000], interval=0.5)
+        await parser.parse_packet(_notification("200000", 0x4000))
+        scheduler._polls[("200000", 0x4000)].added -= 1.0
+        (stats,) = scheduler.statistics()
+        assert (stats.destination, stats.message_id, stats.refreshes) == ("200000", 0x4000, 1)
+        assert stats.requested_rate == 2.0
+        assert stats.achieved_rate == pytest.approx(1.0, rel=0.1)
+
+    async def test_add_updates_interval(self, parser, read):
+        """Test that adding a message again changes its interval without a second poll."""
+        scheduler = PollScheduler(parser, read, jitter=0)
+        scheduler.add("200000", [0x4000], interval=10)
+        scheduler.add("200000", [0x4000], interval=1)
+        assert len(scheduler) == 1
+        assert scheduler._polls[("200000", 0x4000)].interval == 1
+        with pytest.raises(ValueError):
+            scheduler.add("200000", [0x4000], interval=0)
+
+    async def test_remove(self, parser, read):
+        """Test that removing the last poll of a message removes its event listener."""
+        scheduler = PollScheduler(parser, read)
+        scheduler.add("200000", [0x4000, 0x4001], interval=10)
+        scheduler.add("200001", [0x4000], interval=10)
+        scheduler.remove("200000")
+        assert parser._event_listeners[0x4000] == [scheduler._handle_event]
+        assert parser._event_listeners[0x4001] == []
+        scheduler.remove("200001", [0x4000])
+        assert len(scheduler) == 0
+        assert parser._event_listeners[0x4000] == []
+
+    async def test_idle_without_polls(self, parser, read):
+        """Test that no task runs until something is polled."""
+        scheduler = PollScheduler(parser, read)
+        scheduler.start()
+        assert scheduler._task is None
+        scheduler.add("200000", [0x4000], interval=10)
+        assert scheduler._task is not None
+        await scheduler.stop()
+        assert scheduler._task is None
+
+
+class TestUnansweredPolls:
+    """Tests for polling a device that never answers."""
+
+    async def test_queue_stays_bounded(self, parser, nasa_client):
+        """Test that polls of a device that never answers do not pile up in the client's read queue."""
+        nasa_client._queued_reads.clear()
+        message_ids = list(range(0x4000, 0x4014))
+        scheduler = PollScheduler(parser, nasa_client.nasa_read, jitter=0, outstanding=nasa_client.outstanding_reads)
+        scheduler.add("200000", message_ids, interval=0.01)
+        scheduler.start()
+        await asyncio.sleep(0.3)
+        await scheduler.stop()
+
+        queued = [msg for msgs in nasa_client._queued_reads.get("200000", []) for msg in msgs]
+        assert len(queued) == len(set(queued))
+        assert nasa_client.outstanding_reads("200000") == set(message_ids)
+        assert scheduler.reads <= 4  # Two packets pending, then only polls that are not outstanding
+        nasa_client._queued_reads.clear()
+        nasa_client._pending_reads.clear()
+
+    async def test_client_does_not_queue_outstanding_ids_twice(self, nasa_client):
+        """Test that a read queued behind a pending read only adds message IDs not already outstanding."""
+        nasa_client._queued_reads.clear()
+        await nasa_client.nasa_read([0x4000, 0x4001], "200000")
+        for _ in range(5):
+            assert await nasa_client.nasa_read([0x4001, 0x4002, 0x4002], "200000") is None
+        assert nasa_client._queued_reads["200000"] == [[0x4002]]
+        nasa_client._queued_reads.clear()
+        nasa_client._pending_reads.clear()
+
+
+class TestSamsungNasaPolling:
+    """Tests for the scheduler attached to SamsungNasa."""
+
+    async def test_scheduler_reads_through_the_client(self):
+        """Test that SamsungNasa polls with nasa_read and stops polling on stop."""
+        nasa = SamsungNasa(config={"device_path": "socket://localhost:8000", "poll_jitter": 0})
+        assert nasa.poll_scheduler._read == nasa.client.nasa_read
+        nasa.client.nasa_read = AsyncMock()
+        nasa.client.disconnect = AsyncMock()
+        nasa.poll_scheduler._read = nasa.client.nasa_read
+        nasa.poll_scheduler.start()
+        nasa.poll_scheduler.add("200000", [0x4000], interval=10)
+        await asyncio.sleep(0.01)
+        nasa.client.nasa_read.assert_called_once_with([0x4000], "200000")
+        await nasa.stop()
+        assert nasa.poll_scheduler._task is None
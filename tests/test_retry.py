@@ -0,0 +1,133 @@
+"""Tests for retry timers."""
+
+import asyncio
+
+from unittest.mock import AsyncMock, Mock, patch
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.nasa_client import NasaClient
+from pysamsungnasa.protocol.enum import DataType
+from pysamsungnasa.protocol.factory.types import SendMessage
+from pysamsungnasa.protocol.txqueue import TxQueue
+from pysamsungnasa.retry import RetryTimers
+
+
+class TestRetryTimers:
+    """Tests for RetryTimers."""
+
+    async def test_fires_when_due(self):
+        """Test that keys come out in deadline order when they are due."""
+        timers = RetryTimers()
+        now = asyncio.get_running_loop().time()
+        timers.schedule("late", now + 0.04)
+        timers.schedule("early", now + 0.01)
+        assert len(timers) == 2
+        assert await asyncio.wait_for(timers.next_due(), timeout=1.0) == "early"
+        assert await asyncio.wait_for(timers.next_due(), timeout=1.0) == "late"
+        assert asyncio.get_running_loop().time() >= now + 0.04
+        assert len(timers) == 0
+
+    async def test_cancel(self):
+        """Test that a cancelled timer never fires."""
+        timers = RetryTimers()
+        timers.schedule("key", asyncio.get_running_loop().time())
+        timers.cancel("key")
+        timers.cancel("missing")
+        assert "key" not in timers
+        await asyncio.sleep(0.01)
+        assert timers._due.empty()
+
+    async def test_schedule_replaces_timer(self):
+        """Test that scheduling a key again moves its deadline."""
+        timers = RetryTimers()
+        now = asyncio.get_running_loop().time()
+        timers.schedule("key", now)
+        timers.schedule("key", now + 10)
+        await asyncio.sleep(0.01)
+        assert timers._due.empty()
+        assert "key" in timers
+        timers.cancel_all()
+
+    async def test_cancel_all(self):
+        """Test that cancel_all stops timers and forgets due keys."""
+        timers = RetryTimers()
+        now = asyncio.get_running_loop().time()
+        timers.schedule("due", now)
+        await asyncio.sleep(0)
+        timers.schedule("later", now + 10)
+        timers.cancel_all()
+        assert len(timers) == 0
+        assert timers._due.empty()
+
+
+def _client(**config) -> NasaClient:
+    client = NasaClient(config=NasaConfig(device_path="socket://localhost:8000", **config))
+    client._client = Mock()
+    client._tx_queue = TxQueue()
+    return client
+
+
+class TestClientRetryTimers:
+    """Tests for retry timing in NasaClient."""
+
+    async def test_sub_second_retry_is_sent_when_due(self):
+        """Test that a read is retried after read_retry_interval, not on the next whole second."""
+        client = _client(read_retry_interval=0.05, read_retry_backoff_factor=1.0, enable_write_retries=False)
+        client._pending_reads.clear()
+        manager = asyncio.create_task(client._retry_manager())
+        await client.send_message("200000", DataType.READ, [SendMessage(0x4000, b"")])
+        sent = asyncio.get_running_loop().time()
+        with patch.object(client, "send_message", new_callable=AsyncMock) as retry:
+            while not retry.called:
+                await asyncio.sleep(0.005)
+                assert asyncio.get_running_loop().time() - sent < 0.5
+        assert retry.call_args.kwargs["priority"].name == "RETRY"
+        manager.cancel()
+        await manager
+        client._pending_reads.clear()
+
+    async def test_response_cancels_timer(self):
+        """Test that clearing a pending read stops its timer."""
+        client = _client(enable_write_retries=False)
+        client._pending_reads.clear()
+        await client.send_message("200000", DataType.READ, [SendMessage(0x4000, b"")])
+        assert len(client._retry_timers) == 1
+        await client._mark_read_received("200000", [0x4000])
+        assert len(client._retry_timers) == 0
+        assert len(client._pending_reads) == 0
+
+    async def test_ack_cancels_write_timer(self):
+        """Test that an ACK stops the timer of the write it clears."""
+        client = _client(enable_read_retries=False)
+        client._pending_writes.clear()
+        await client.send_message("200000", DataType.WRITE, [SendMessage(0x4000, b"\x01")])
+        assert len(client._retry_timers) == 1
+        await client._mark_write_received("200000", [0x4000])
+        assert len(client._retry_timers) == 0
+
+    async def test_idle_without_pending_requests(self):
+        """Test that the manager sends nothing while no request is pending."""
+        client = _client()
+        client._pending_reads.clear()
+        client._pending_writes.clear()
+        with patch.object(client, "send_message", new_callable=AsyncMock) as send:
+            manager = asyncio.create_task(client._retry_manager())
+            await asyncio.sleep(0.02)
+            manager.cancel()
+            await manager
+        send.assert_not_called()
+        assert len(client._retry_timers) == 0
+
+    async def test_session_end_keeps_pending_requests(self):
+        """Test that ending the session stops timers and the next session sets them again."""
+        client = _client(enable_write_retries=False)
+        client._pending_reads.clear()
+        await client.send_message("200000", DataType.READ, [SendMessage(0x4000, b"")])
+        await client._end_retry_manager_session()
+        assert len(client._retry_timers) == 0
+        assert len(client._pending_reads) == 1
+        assert await client._start_retry_manager_session()
+        await asyncio.sleep(0)
+        assert len(client._retry_timers) == 1
+        await client._end_retry_manager_session()
+        client._pending_reads.clear()
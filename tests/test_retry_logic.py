@@ -2,8 +2,10 @@
 
 import pytest
 import asyncio
+from dataclasses import replace
 from unittest.mock import AsyncMock, patch
 from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.pending import PendingRead, PendingWrite
 from pysamsungnasa.protocol.enum import DataType, AddressClass
 from pysamsungnasa.protocol.factory.types import SendMessage
 
@@ -24,15 +26,15 @@ class TestSendMessageRetryTracking:
             )
 
             # Check that the write was tracked
-            # Note: Keys are formatted as destination_packet_number
-            write_key = "200001_1"  # packet_number=1
+            # Note: Keys are the destination and the sorted message IDs
+            write_key = ("200001", (0x4000,))
             assert write_key in client._pending_writes
-            write_info = client._pending_writes[write_key]
-            assert write_info["destination"] == "200001"
-            assert write_info["message_ids"] == [0x4000]
-            assert write_info["data_type"] == DataType.WRITE
-            assert write_info["attempts"] == 0
-            assert write_info["packet_number"] == 1
+            write_info = client._pending_writes.get(write_key)
+            assert write_info.destination == "200001"
+            assert write_info.message_ids == (0x4000,)
+            assert write_info.data_type == DataType.WRITE
+            assert write_info.attempts == 0
+            assert write_info.packet_number == 1
 
     @pytest.mark.asyncio
     async def test_send_message_tracks_read_retry(self, nasa_client):
@@ -50,13 +52,13 @@ class TestSendMessageRetryTracking:
             )
 
             # Check that the read was tracked with sorted message IDs
-            read_key = "200001_(16384, 16385)"  # Sorted tuple as string
+            read_key = ("200001", (0x4000, 0x4001))
             assert read_key in client._pending_reads
-            read_info = client._pending_reads[read_key]
-            assert read_info["destination"] == "200001"
-            assert set(read_info["messages"]) == {0x4000, 0x4001}
-            assert read_info["attempts"] == 0
-            assert read_info["packet_number"] == 2
+            read_info = client._pending_reads.get(read_key)
+            assert read_info.destination == "200001"
+            assert set(read_info.message_ids) == {0x4000, 0x4001}
+            assert read_info.attempts == 0
+            assert read_info.packet_number == 2
 
     @pytest.mark.asyncio
     async def test_send_message_request_type_tracked_as_write(self, nasa_client):
@@ -71,7 +73,7 @@ class TestSendMessageRetryTracking:
             )
 
             # REQUEST type should be tracked as write retry
-            write_key = "100001_3"  # 0x5000 = 20480
+            write_key = ("100001", (0x5000,))
             assert write_key in client._pending_writes
 
     @pytest.mark.asyncio
@@ -113,12 +115,12 @@ class TestSendMessageRetryTracking:
                 messages=messages,
             )
 
-            # All messages in one packet should have a single entry with packet_number key
-            write_key = "200001_5"  # packet_number=5
+            # All messages in one packet should have a single entry
+            write_key = ("200001", (0x4000, 0x4001, 0x4002))
             assert write_key in client._pending_writes
-            write_info = client._pending_writes[write_key]
-            assert write_info["message_ids"] == [0x4000, 0x4001, 0x4002]
-            assert len(write_info["messages"]) == 3
+            write_info = client._pending_writes.get(write_key)
+            assert write_info.message_ids == (0x4000, 0x4001, 0x4002)
+            assert len(write_info.messages) == 3
 
     @pytest.mark.asyncio
     async def test_send_message_read_resend_preserves_retry_state(self, nasa_client):
@@ -128,7 +130,7 @@ class TestSendMessageRetryTracking:
             SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x05\xa5\xa5\xa5"),
             SendMessage(MESSAGE_ID=0x4001, PAYLOAD=b"\x05\xa5\xa5\xa5"),
         ]
-        read_key = "200001_(16384, 16385)"
+        read_key = ("200001", (0x4000, 0x4001))
 
         # Initial send creates tracked read
         with patch.object(client, "send_command", new_callable=AsyncMock, return_value=2):
@@ -139,9 +141,8 @@ class TestSendMessageRetryTracking:
             )
 
         # Simulate retry manager state before resend
-        client._pending_reads[read_key]["attempts"] = 2
-        client._pending_reads[read_key]["retry_interval"] = 1.21
-        old_next_retry_time = client._pending_reads[read_key]["next_retry_time"]
+        client._pending_reads.add(replace(client._pending_reads.get(read_key), attempts=2, retry_interval=1.21))
+        old_next_retry_time = client._pending_reads.get(read_key).next_retry_time
 
         # Resend should update packet number only, not reset attempts/backoff
         with patch.object(client, "send_command", new_callable=AsyncMock, return_value=3):
@@ -151,20 +152,19 @@ class TestSendMessageRetryTracking:
                 messages=messages,
             )
 
-        read_info = client._pending_reads[read_key]
-        assert read_info["attempts"] == 2
-        assert read_info["retry_interval"] == 1.21
-        assert read_info["next_retry_time"] == old_next_retry_time
-        assert read_info["packet_number"] == 3
+        read_info = client._pending_reads.get(read_key)
+        assert read_info.attempts == 2
+        assert read_info.retry_interval == 1.21
+        assert read_info.next_retry_time == old_next_retry_time
+        assert read_info.packet_number == 3
 
     @pytest.mark.asyncio
     async def test_send_message_write_resend_preserves_retry_state(self, nasa_client):
         """Test that re-sending an already tracked write does not reset retry state."""
         client = nasa_client
         messages = [SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01")]
-        write_key = "200001_7"
+        write_key = ("200001", (0x4000,))
 
-        # Use same packet number to hit existing write entry
         with patch.object(client, "send_command", new_callable=AsyncMock, return_value=7):
             await client.send_message(
                 destination="200001",
@@ -173,23 +173,23 @@ class TestSendMessageRetryTracking:
             )
 
         # Simulate retry manager state before resend
-        client._pending_writes[write_key]["attempts"] = 1
-        client._pending_writes[write_key]["retry_interval"] = 1.1
-        old_next_retry_time = client._pending_writes[write_key]["next_retry_time"]
+        client._pending_writes.add(replace(client._pending_writes.get(write_key), attempts=1, retry_interval=1.1))
+        old_next_retry_time = client._pending_writes.get(write_key).next_retry_time
 
-        # Resend should refresh metadata but not reset attempts/backoff
-        with patch.object(client, "send_command", new_callable=AsyncMock, return_value=7):
+        # Resend with a new packet number should refresh metadata but not reset attempts/backoff
+        with patch.object(client, "send_command", new_callable=AsyncMock, return_value=8):
             await client.send_message(
                 destination="200001",
                 request_type=DataType.WRITE,
                 messages=messages,
             )
 
-        write_info = client._pending_writes[write_key]
-        assert write_info["attempts"] == 1
-        assert write_info["retry_interval"] == 1.1
-        assert write_info["next_retry_time"] == old_next_retry_time
-        assert write_info["packet_number"] == 7
+        write_info = client._pending_writes.get(write_key)
+        assert write_info.attempts == 1
+        assert write_info.retry_interval == 1.1
+        assert write_info.next_retry_time == old_next_retry_time
+        assert write_info.packet_number == 8
+        assert len(client._pending_writes) == 1
 
 
 class TestNasaWriteRetry:
@@ -208,13 +208,13 @@ class TestNasaWriteRetry:
             )
 
             # Check that write was tracked with message_ids and messages
-            write_key = "200001_1"  # packet_number=1
+            write_key = ("200001", (0x4000,))
             assert write_key in client._pending_writes
-            write_info = client._pending_writes[write_key]
-            assert write_info["message_ids"] == [0x4000]
-            assert write_info["data_type"] == DataType.WRITE
-            assert len(write_info["messages"]) == 1
-            assert write_info["messages"][0].MESSAGE_ID == 0x4000
+            write_info = client._pending_writes.get(write_key)
+            assert write_info.message_ids == (0x4000,)
+            assert write_info.data_type == DataType.WRITE
+            assert len(write_info.messages) == 1
+            assert write_info.messages[0].MESSAGE_ID == 0x4000
 
 
 class TestNasaReadRetry:
@@ -231,10 +231,32 @@ class TestNasaReadRetry:
             )
 
             # Check that read was tracked
-            read_key = "200001_(16384, 16385)"  # Sorted tuple as string
+            read_key = ("200001", (0x4000, 0x4001))
             assert read_key in client._pending_reads
-            read_info = client._pending_reads[read_key]
-            assert set(read_info["messages"]) == {0x4000, 0x4001}
+            read_info = client._pending_reads.get(read_key)
+            assert set(read_info.message_ids) == {0x4000, 0x4001}
+
+
+async def _run_retry_manager(client, duration=0.05):
+    """Run the retry manager for duration seconds."""
+    task = asyncio.create_task(client._retry_manager())
+    await asyncio.sleep(duration)
+    task.cancel()
+    await task
+
+
+def _pending_write(destination="200001", message_ids=(0x4000,), **kwargs):
+    """Return a pending write of message_ids to destination."""
+    fields = {
+        "packet_number": 1,
+        "last_attempt_time": 0,
+        "next_retry_time": 0,
+        "retry_interval": 0.1,
+        "messages": tuple(SendMessage(MESSAGE_ID=message_id, PAYLOAD=b"\x01") for message_id in message_ids),
+        "data_type": DataType.WRITE,
+    }
+    fields.update(kwargs)
+    return PendingWrite(destination=destination, message_ids=tuple(message_ids), **fields)
 
 
 class TestRetryManagerRetryBehavior:
@@ -246,19 +268,9 @@ class TestRetryManagerRetryBehavior:
         client = nasa_client_with_full_retry_config
         # Manually add a pending write that needs retry
         current_time = asyncio.get_running_loop().time()
-        write_key = "test_200001_1"  # Use unique key to avoid conflicts
-        messages = [SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01")]
-        client._pending_writes[write_key] = {
-            "destination": "200001",
-            "message_ids": [0x4000],
-            "messages": messages,
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": current_time,
-            "next_retry_time": current_time - 1.0,  # Time to retry now
-            "retry_interval": 0.1,
-        }
+        client._pending_writes.add(
+            _pending_write(last_attempt_time=current_time, next_retry_time=current_time - 1.0)  # Time to retry now
+        )
 
         retry_send_call_count = 0
 
@@ -267,29 +279,11 @@ class TestRetryManagerRetryBehavior:
             retry_send_call_count += 1
             return None
 
-        sleep_count = 0
-
-        async def mock_sleep(delay):
-            nonlocal sleep_count
-            sleep_count += 1
-            if sleep_count == 1:
-                # Allow first sleep to "complete" immediately
-                return
-            else:
-                # Raise error on subsequent sleeps to exit
-                raise asyncio.CancelledError()
-
         with patch.object(client, "send_message", new_callable=AsyncMock, side_effect=mock_send):
-            with patch("asyncio.sleep", side_effect=mock_sleep):
-                # Run retry manager
-                retry_task = asyncio.create_task(client._retry_manager())
-                try:
-                    await retry_task
-                except asyncio.CancelledError:
-                    pass
+            await _run_retry_manager(client)
 
-                # Check that send_message was called to retry
-                assert retry_send_call_count > 0
+            # Check that send_message was called to retry
+            assert retry_send_call_count > 0
 
     @pytest.mark.asyncio
     async def test_retry_manager_retries_failed_read(self, nasa_client_with_full_retry_config):
@@ -297,16 +291,16 @@ class TestRetryManagerRetryBehavior:
         client = nasa_client_with_full_retry_config
         # Manually add a pending read that needs retry
         current_time = asyncio.get_running_loop().time()
-        read_key = "test_200001_(16384, 16385)"
-        client._pending_reads[read_key] = {
-            "destination": "200001",
-            "messages": [0x4000, 0x4001],
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": current_time,
-            "next_retry_time": current_time - 1.0,  # Time to retry now
-            "retry_interval": 0.1,
-        }
+        client._pending_reads.add(
+            PendingRead(
+                destination="200001",
+                message_ids=(0x4000, 0x4001),
+                packet_number=1,
+                last_attempt_time=current_time,
+                next_retry_time=current_time - 1.0,  # Time to retry now
+                retry_interval=0.1,
+            )
+        )
 
         retry_send_call_count = 0
 
@@ -315,123 +309,67 @@ class TestRetryManagerRetryBehavior:
             retry_send_call_count += 1
             return None
 
-        sleep_count = 0
-
-        async def mock_sleep(delay):
-            nonlocal sleep_count
-            sleep_count += 1
-            if sleep_count == 1:
-                # Allow first sleep to "complete" immediately
-                return
-            else:
-                # Raise error on subsequent sleeps to exit
-                raise asyncio.CancelledError()
-
         with patch.object(client, "send_message", new_callable=AsyncMock, side_effect=mock_send):
-            with patch("asyncio.sleep", side_effect=mock_sleep):
-                # Run retry manager
-                retry_task = asyncio.create_task(client._retry_manager())
-                try:
-                    await retry_task
-                except asyncio.CancelledError:
-                    pass
+            await _run_retry_manager(client)
 
-                # Check that send_message was called to retry
-                assert retry_send_call_count > 0
+            # Check that send_message was called to retry
+            assert retry_send_call_count > 0
 
     @pytest.mark.asyncio
     async def test_retry_manager_applies_backoff_factor(self, nasa_client_with_full_retry_config):
         """Test that retry manager applies backoff factor to retry interval."""
         client = nasa_client_with_full_retry_config
         current_time = asyncio.get_running_loop().time()
-        write_key = "test_200001_1"  # Use unique key
         initial_interval = 0.1
-        client._pending_writes[write_key] = {
-            "destination": "200001",
-            "message_id": 0x4000,
-            "payload": b"\x01",
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": current_time,
-            "next_retry_time": current_time - 1.0,  # Time to retry now
-            "retry_interval": initial_interval,
-        }
-
-        sleep_count = 0
-
-        async def mock_sleep(delay):
-            nonlocal sleep_count
-            sleep_count += 1
-            if sleep_count == 1:
-                # Allow first sleep to "complete" immediately
-                return
-            else:
-                # Raise error on subsequent sleeps to exit
-                raise asyncio.CancelledError()
+        write = _pending_write(
+            last_attempt_time=current_time, next_retry_time=current_time - 1.0, retry_interval=initial_interval
+        )
+        client._pending_writes.add(write)
 
         with patch.object(client, "send_message", new_callable=AsyncMock):
-            with patch("asyncio.sleep", side_effect=mock_sleep):
-                retry_task = asyncio.create_task(client._retry_manager())
-                try:
-                    await retry_task
-                except asyncio.CancelledError:
-                    pass
-
-                # Check that backoff was applied
-                write_info = client._pending_writes[write_key]
-                expected_interval = initial_interval * client._config.write_retry_backoff_factor
-                # Use pytest.approx for floating point comparison
-                assert write_info["retry_interval"] == pytest.approx(expected_interval, rel=1e-9)
-                assert write_info["attempts"] == 1
+            await _run_retry_manager(client, duration=0.01)
+
+            # Check that backoff was applied
+            write_info = client._pending_writes.get(write.key)
+            expected_interval = initial_interval * client._config.write_retry_backoff_factor
+            # Use pytest.approx for floating point comparison
+            assert write_info.retry_interval == pytest.approx(expected_interval, rel=1e-9)
+            assert write_info.attempts == 1
 
     @pytest.mark.asyncio
     async def test_retry_manager_abandons_after_max_attempts(self, nasa_client_with_full_retry_config):
         """Test that retry manager abandons request after max attempts."""
         client = nasa_client_with_full_retry_config
         current_time = asyncio.get_running_loop().time()
-        write_key = "test_200001_1"  # Use unique key
-
-        # Clear any existing pending entries to have a clean test
-        client._pending_writes.clear()
-        client._pending_reads.clear()
-
-        client._pending_writes[write_key] = {
-            "destination": "200001",
-            "message_id": 0x4000,
-            "payload": b"\x01",
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": client._config.write_retry_max_attempts,  # Already at max
-            "last_attempt_time": current_time,
-            "next_retry_time": current_time - 1.0,
-            "retry_interval": 0.1,
-        }
-
-        sleep_count = 0
-
-        async def mock_sleep(delay):
-            nonlocal sleep_count
-            sleep_count += 1
-            if sleep_count == 1:
-                # Allow first sleep to "complete" immediately
-                return
-            else:
-                # Raise error on subsequent sleeps to exit
-                raise asyncio.CancelledError()
+        write = _pending_write(
+            attempts=client._config.write_retry_max_attempts,  # Already at max
+            last_attempt_time=current_time,
+            next_retry_time=current_time - 1.0,
+        )
+        client._pending_writes.add(write)
 
         with patch.object(client, "send_message", new_callable=AsyncMock) as mock_send:
-            with patch("asyncio.sleep", side_effect=mock_sleep):
-                retry_task = asyncio.create_task(client._retry_manager())
-                try:
-                    await retry_task
-                except asyncio.CancelledError:
-                    pass
+            await _run_retry_manager(client)
 
-                # send_message should NOT be called since max attempts reached
-                mock_send.assert_not_called()
-                # And the pending write should be removed
-                assert write_key not in client._pending_writes
+            # send_message should NOT be called since max attempts reached
+            mock_send.assert_not_called()
+            # And the pending write should be removed
+            assert write.key not in client._pending_writes
+
+    @pytest.mark.asyncio
+    async def test_retry_updates_the_same_write(self, nasa_client_with_full_retry_config):
+        """Test that a retried write keeps one record even though it is sent with a new packet number."""
+        client = nasa_client_with_full_retry_config
+        current_time = asyncio.get_running_loop().time()
+        write = _pending_write(last_attempt_time=current_time, next_retry_time=current_time - 1.0)
+        client._pending_writes.add(write)
+
+        with patch.object(client, "send_command", new_callable=AsyncMock, return_value=2):
+            await _run_retry_manager(client, duration=0.01)
+
+        assert len(client._pending_writes) == 1
+        write_info = client._pending_writes.get(write.key)
+        assert (write_info.attempts, write_info.packet_number) == (1, 2)
 
 
 class TestWriteAttributesWithRetry:
@@ -458,18 +396,15 @@ class TestWriteAttributesWithRetry:
 
     @pytest.mark.asyncio
     async def test_write_attributes_uses_retry_tracking(self, device):
-        """Test that write_attributes triggers retry tracking in send_message."""
+        """Test that write_attributes sends through request, whose send_message tracks the write for retries."""
         from pysamsungnasa.protocol.enum import InOperationPower
         from pysamsungnasa.protocol.factory.messages.indoor import InOperationPowerMessage
 
-        # Mock send_message to capture the call
-        device._client.send_message = AsyncMock()
-
         await device.write_attributes({InOperationPowerMessage: InOperationPower.ON_STATE_1})
 
-        # Verify send_message was called with correct parameters
-        device._client.send_message.assert_called_once()
-        call_args = device._client.send_message.call_args
+        # Verify request was called with correct parameters
+        device._client.request.assert_called_once()
+        call_args = device._client.request.call_args
         assert call_args.kwargs["destination"] == "200001"
         assert call_args.kwargs["request_type"] == DataType.WRITE
 
@@ -478,23 +413,23 @@ class TestRetryStateManagement:
     """Tests for proper state management of retry logic."""
 
     def test_write_key_format(self):
-        """Test that write keys are properly formatted."""
-        # The write key should be destination_packet_number
-        dest = "200001"
-        packet_number = 1
-
-        # Write keys now use packet_number to group all messages in a packet
-        write_key = f"{dest}_{packet_number}"
-        assert write_key == "200001_1"
+        """Test that write keys are the destination and the sorted message IDs."""
+        # A resend of the same messages has the same key whatever its packet number
+        assert _pending_write(message_ids=(0x4001, 0x4000)).key == ("200001", (0x4000, 0x4001))
+        assert _pending_write(packet_number=1).key == _pending_write(packet_number=2).key
 
     def test_read_key_format(self):
         """Test that read keys use sorted tuple of message IDs."""
-        dest = "200001"
-        msgs = [0x4001, 0x4000, 0x4002]  # Unsorted
-
-        # Read key should have sorted message IDs as string representation
-        read_key = f"{dest}_{tuple(sorted(msgs))}"
-        assert read_key == "200001_(16384, 16385, 16386)"
+        read = PendingRead(
+            destination="200001",
+            message_ids=(0x4001, 0x4000, 0x4002),  # Unsorted
+            packet_number=1,
+            last_attempt_time=0,
+            next_retry_time=0,
+            retry_interval=1.0,
+        )
+        assert read.key == ("200001", (0x4000, 0x4001, 0x4002))
+        assert read.message_ids == (0x4001, 0x4000, 0x4002)
 
     def test_retry_interval_calculation(self):
         """Test that retry intervals are calculated correctly."""
@@ -502,24 +437,53 @@ class TestRetryStateManagement:
         initial_interval = 1.0
         backoff_factor = 1.1
 
-        write_info = {
-            "destination": "200001",
-            "message_id": 0x4000,
-            "payload": b"\x01",
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": current_time,
-            "next_retry_time": current_time + initial_interval,
-            "retry_interval": initial_interval,
-        }
+        write_info = _pending_write(
+            last_attempt_time=current_time,
+            next_retry_time=current_time + initial_interval,
+            retry_interval=initial_interval,
+        )
 
         # Simulate what retry manager does
-        new_interval = write_info["retry_interval"] * backoff_factor
+        new_interval = write_info.retry_interval * backoff_factor
         new_next_retry = current_time + new_interval
 
         assert new_interval == 1.1
-        assert new_next_retry > write_info["next_retry_time"]
+        assert new_next_retry > write_info.next_retry_time
+
+    def test_records_are_read_only(self, nasa_client):
+        """Test that the pending requests are exposed as a read-only view of immutable records."""
+        nasa_client._pending_writes.add(_pending_write())
+        view = nasa_client.pending_writes
+        assert list(view) == [("200001", (0x4000,))]
+        with pytest.raises(TypeError):
+            view[("200001", (0x4001,))] = _pending_write(message_ids=(0x4001,))
+        with pytest.raises(AttributeError):
+            view[("200001", (0x4000,))].attempts = 1
+        assert nasa_client.pending_reads == {}
+
+
+class TestPendingIndexes:
+    """Tests for the destination and message ID indexes."""
+
+    async def test_has_destination(self, nasa_client):
+        """Test that pending reads are found by destination."""
+        with patch.object(nasa_client, "send_command", new_callable=AsyncMock, return_value=1):
+            await nasa_client.send_message("200001", DataType.READ, [SendMessage(0x4000, b"")])
+        assert nasa_client._pending_reads.has_destination("200001")
+        assert not nasa_client._pending_reads.has_destination("200002")
+        nasa_client._clear_pending_read("200001", [0x4000])
+        assert not nasa_client._pending_reads.has_destination("200001")
+        assert nasa_client._pending_reads._by_message == {}
+
+    def test_answered_by_uses_the_message_index(self, nasa_client):
+        """Test that an ACK only finds writes to its source that carry its message IDs."""
+        writes = nasa_client._pending_writes
+        for number in range(100):
+            writes.add(_pending_write(destination=f"2000{number:02d}", message_ids=(0x4000, 0x4001 + number)))
+        assert writes._by_message[("200042", 0x4000)] == {("200042", (0x4000, 0x402B)): None}
+        assert [write.destination for write in writes.answered_by("200042", [0x4000, 0x402B])] == ["200042"]
+        assert writes.answered_by("200042", [0x4000]) == []
+        assert len(writes.for_destination("200042")) == 1
 
 
 class TestAckClearing:
@@ -529,208 +493,98 @@ class TestAckClearing:
         """Test that ACK clears a single message packet when message ID is in ACK list."""
         client = nasa_client
         # Add a pending write with single message
-        client._pending_writes["200001_1"] = {
-            "destination": "200001",
-            "message_ids": [0x4000],
-            "messages": [SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01")],
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
+        write = _pending_write(message_ids=(0x4000,))
+        client._pending_writes.add(write)
 
         # ACK with the message ID
-        client._clear_pending_write("200001", [0x4000])
+        assert client._clear_pending_write("200001", [0x4000]) == [write.key]
 
         # Should be cleared
-        assert "200001_1" not in client._pending_writes
+        assert write.key not in client._pending_writes
 
     async def test_ack_clears_multi_message_packet_when_all_acked(self, nasa_client):
         """Test that multi-message packet is cleared only when ALL messages are ACKed."""
         client = nasa_client
         # Add a pending write with multiple messages
-        client._pending_writes["200001_1"] = {
-            "destination": "200001",
-            "message_ids": [0x4000, 0x4001, 0x4002],
-            "messages": [
-                SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01"),
-                SendMessage(MESSAGE_ID=0x4001, PAYLOAD=b"\x02"),
-                SendMessage(MESSAGE_ID=0x4002, PAYLOAD=b"\x03"),
-            ],
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
+        write = _pending_write(message_ids=(0x4000, 0x4001, 0x4002))
+        client._pending_writes.add(write)
 
         # ACK all three messages
         client._clear_pending_write("200001", [0x4000, 0x4001, 0x4002])
 
         # Should be cleared
-        assert "200001_1" not in client._pending_writes
+        assert write.key not in client._pending_writes
 
     async def test_ack_does_not_clear_multi_message_packet_with_partial_ack(self, nasa_client):
         """Test that multi-message packet is NOT cleared when only SOME messages are ACKed."""
         client = nasa_client
         # Add a pending write with multiple messages
-        client._pending_writes["200001_1"] = {
-            "destination": "200001",
-            "message_ids": [0x4000, 0x4001, 0x4002],
-            "messages": [
-                SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01"),
-                SendMessage(MESSAGE_ID=0x4001, PAYLOAD=b"\x02"),
-                SendMessage(MESSAGE_ID=0x4002, PAYLOAD=b"\x03"),
-            ],
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
+        write = _pending_write(message_ids=(0x4000, 0x4001, 0x4002))
+        client._pending_writes.add(write)
 
         # ACK only two of three messages
         client._clear_pending_write("200001", [0x4000, 0x4001])
 
         # Should NOT be cleared - still pending
-        assert "200001_1" in client._pending_writes
+        assert write.key in client._pending_writes
 
     async def test_ack_with_empty_message_numbers_clears_all(self, nasa_client):
         """Test that ACK with empty message_numbers clears all writes for destination."""
         client = nasa_client
         # Add multiple pending writes
-        client._pending_writes["200001_1"] = {
-            "destination": "200001",
-            "message_ids": [0x4000],
-            "messages": [SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01")],
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
-        client._pending_writes["200001_2"] = {
-            "destination": "200001",
-            "message_ids": [0x4001, 0x4002],
-            "messages": [
-                SendMessage(MESSAGE_ID=0x4001, PAYLOAD=b"\x02"),
-                SendMessage(MESSAGE_ID=0x4002, PAYLOAD=b"\x03"),
-            ],
-            "data_type": DataType.WRITE,
-            "packet_number": 2,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
+        first = _pending_write(message_ids=(0x4000,))
+        second = _pending_write(message_ids=(0x4001, 0x4002), packet_number=2)
+        client._pending_writes.add(first)
+        client._pending_writes.add(second)
 
         # ACK with empty message_numbers (ACK all for this destination)
         client._clear_pending_write("200001", [])
 
         # All writes for 200001 should be cleared
-        assert "200001_1" not in client._pending_writes
-        assert "200001_2" not in client._pending_writes
+        assert first.key not in client._pending_writes
+        assert second.key not in client._pending_writes
 
     async def test_ack_does_not_clear_different_destination(self, nasa_client):
         """Test that ACK for one destination doesn't affect other destinations."""
         client = nasa_client
         # Add pending writes for different destinations
-        client._pending_writes["200001_1"] = {
-            "destination": "200001",
-            "message_ids": [0x4000],
-            "messages": [SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01")],
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
-        client._pending_writes["200002_1"] = {
-            "destination": "200002",
-            "message_ids": [0x4000],
-            "messages": [SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01")],
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
+        first = _pending_write(destination="200001")
+        second = _pending_write(destination="200002")
+        client._pending_writes.add(first)
+        client._pending_writes.add(second)
 
         # ACK only for 200001
         client._clear_pending_write("200001", [0x4000])
 
         # Only 200001 should be cleared
-        assert "200001_1" not in client._pending_writes
-        assert "200002_1" in client._pending_writes
+        assert first.key not in client._pending_writes
+        assert second.key in client._pending_writes
 
     async def test_ack_clears_correct_packet_from_multiple_packets(self, nasa_client):
         """Test that ACK clears only the specific packet when multiple exist for same destination."""
         client = nasa_client
         # Add multiple packets from same destination
-        client._pending_writes["200001_1"] = {
-            "destination": "200001",
-            "message_ids": [0x4000, 0x4001],
-            "messages": [
-                SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01"),
-                SendMessage(MESSAGE_ID=0x4001, PAYLOAD=b"\x02"),
-            ],
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
-        client._pending_writes["200001_2"] = {
-            "destination": "200001",
-            "message_ids": [0x4002, 0x4003],
-            "messages": [
-                SendMessage(MESSAGE_ID=0x4002, PAYLOAD=b"\x03"),
-                SendMessage(MESSAGE_ID=0x4003, PAYLOAD=b"\x04"),
-            ],
-            "data_type": DataType.WRITE,
-            "packet_number": 2,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
+        first = _pending_write(message_ids=(0x4000, 0x4001))
+        second = _pending_write(message_ids=(0x4002, 0x4003), packet_number=2)
+        client._pending_writes.add(first)
+        client._pending_writes.add(second)
 
         # ACK only the first packet's messages
         client._clear_pending_write("200001", [0x4000, 0x4001])
 
         # First packet cleared, second still pending
-        assert "200001_1" not in client._pending_writes
-        assert "200001_2" in client._pending_writes
+        assert first.key not in client._pending_writes
+        assert second.key in client._pending_writes
 
     async def test_ack_with_extra_message_ids_still_clears(self, nasa_client):
         """Test that ACK with extra message IDs still clears packet if all required IDs present."""
         client = nasa_client
         # Add a pending write
-        client._pending_writes["200001_1"] = {
-            "destination": "200001",
-            "message_ids": [0x4000, 0x4001],
-            "messages": [
-                SendMessage(MESSAGE_ID=0x4000, PAYLOAD=b"\x01"),
-                SendMessage(MESSAGE_ID=0x4001, PAYLOAD=b"\x02"),
-            ],
-            "data_type": DataType.WRITE,
-            "packet_number": 1,
-            "attempts": 0,
-            "last_attempt_time": 0,
-            "next_retry_time": 0,
-            "retry_interval": 0.1,
-        }
+        write = _pending_write(message_ids=(0x4000, 0x4001))
+        client._pending_writes.add(write)
 
         # ACK with extra message IDs (shouldn't matter, as long as required ones present)
         client._clear_pending_write("200001", [0x4000, 0x4001, 0x9999])
 
         # Should still be cleared
-        assert "200001_1" not in client._pending_writes
+        assert write.key not in client._pending_writes
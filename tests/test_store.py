@@ -0,0 +1,189 @@
+"""Tests for the columnar value store."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.device import NasaDevice
+from pysamsungnasa.nasa import SamsungNasa
+from pysamsungnasa.protocol.enum import AddressClass
+from pysamsungnasa.protocol.factory.messages.indoor import InOperationPowerMessage
+from pysamsungnasa.protocol.factory.types import (
+    BasicTemperatureMessage,
+    BoolMessage,
+    FloatMessage,
+    IntegerMessage,
+    RawMessage,
+    StrMessage,
+)
+from pysamsungnasa.protocol.packet import MessageEvent
+from pysamsungnasa.protocol.parser import NasaPacketParser
+from pysamsungnasa.store import ValueStore
+
+
+class Temperature(BasicTemperatureMessage):
+    """Signed temperature."""
+
+    MESSAGE_ID = 0x4203
+
+
+class UnsignedFloat(FloatMessage):
+    """Unsigned float."""
+
+    MESSAGE_ID = 0x4204
+    ARITHMETIC = 0.5
+    SIGNED = False
+
+
+class Flag(BoolMessage):
+    """Bool."""
+
+    MESSAGE_ID = 0x4205
+
+
+class Counter(IntegerMessage):
+    """Integer."""
+
+    MESSAGE_ID = 0x4206
+
+
+class Custom(FloatMessage):
+    """Float with its own parser."""
+
+    MESSAGE_ID = 0x4207
+    ARITHMETIC = 1.0
+
+    @classmethod
+    def parse_payload(cls, payload):
+        return cls(value=42.0, raw_payload=payload)
+
+
+class Text(StrMessage):
+    """String."""
+
+    MESSAGE_ID = 0x4208
+
+
+class TestValueStore:
+    """Tests for ValueStore."""
+
+    @pytest.mark.parametrize(
+        ("message_class", "payload", "raw"),
+        [
+            (Temperature, b"\xff\x38", -200),
+            (Temperature, b"\x00\xfa", 250),
+            (UnsignedFloat, b"\xff", 255),
+            (InOperationPowerMessage, b"\x01", 1),
+            (Flag, b"\x02", 2),
+            (Counter, b"\x00\x01\x00\x00", 65536),
+        ],
+    )
+    def test_values_match_decoded_messages(self, message_class, payload, raw):
+        """Test that values read from the raw payload equal the decoded message value."""
+        store = ValueStore()
+        assert store.update_message(message_class.MESSAGE_ID, message_class.lazy(payload), 10.0)
+        decoded = message_class.parse_payload(payload).VALUE
+        expected = float(decoded.value if hasattr(decoded, "value") else decoded)
+        assert store.get(message_class.MESSAGE_ID) == pytest.approx(expected)
+        assert store.raw[store.slot(message_class.MESSAGE_ID)] == raw
+
+    @pytest.mark.parametrize(
+        ("message_class", "payload"),
+        [
+            (Custom, b"\x01"),
+            (Text, b"ab"),
+            (RawMessage, b"\x01"),
+            (Temperature, b""),
+            (Counter, b"\x00" * 8),
+        ],
+    )
+    def test_non_numeric_messages_are_skipped(self, message_class, payload):
+        """Test that messages whose value is not read from the payload alone are not stored."""
+        store = ValueStore()
+        assert not store.update_message(0x4000, message_class.lazy(payload), 10.0)
+        assert len(store) == 0
+
+    def test_slots_and_sequences(self):
+        """Test that a message ID keeps its slot and every change takes the next sequence number."""
+        store = ValueStore()
+        store.update(0x4203, 21.0, 210, 1.0)
+        store.update(0x4204, 1.0, 1, 1.0)
+        mark = store.sequence
+        store.update(0x4203, 22.0, 220, 2.0)
+        assert store.slot(0x4203) == 0
+        assert list(store.message_ids) == [0x4203, 0x4204]
+        assert list(store.sequences) == [3, 2]
+        assert store.changed_since(mark) == {0x4203: 22.0}
+        assert store.as_dict() == {0x4203: 22.0, 0x4204: 1.0}
+
+    def test_touch_moves_only_the_timestamp(self):
+        """Test that touch updates the timestamp but not the value or sequence."""
+        store = ValueStore()
+        store.update(0x4203, 21.0, 210, 1.0)
+        store.touch(0x4203, 5.0)
+        store.touch(0x4204, 5.0)
+        assert list(store.timestamps) == [5.0]
+        assert store.sequence == 1
+        assert 0x4204 not in store
+
+    def test_snapshot_is_a_copy(self):
+        """Test that a snapshot does not change with later updates."""
+        store = ValueStore()
+        store.update(0x4203, 21.0, 210, 1.0)
+        snapshot = store.snapshot()
+        store.update(0x4203, 22.0, 220, 2.0)
+        store.update(0x4204, 1.0, 1, 2.0)
+        assert list(snapshot.message_ids) == [0x4203]
+        assert list(snapshot.values) == [21.0]
+        assert (snapshot.values.typecode, snapshot.raw.typecode, snapshot.sequences.typecode) == ("d", "q", "Q")
+
+
+class TestDeviceValueStore:
+    """Tests for the value store kept by NasaDevice."""
+
+    @staticmethod
+    def _device(**options):
+        config = NasaConfig(**options)
+        return NasaDevice(
+            address="200001",
+            device_type=AddressClass.INDOOR,
+            packet_parser=NasaPacketParser(config=config),
+            config=config,
+            client=Mock(),
+        )
+
+    @staticmethod
+    def _event(payload: bytes) -> MessageEvent:
+        return MessageEvent.from_kwargs(
+            {"messageNumber": 0x4203, "packet": Temperature.lazy(payload), "dest": "80FF01"}
+        )
+
+    def test_disabled_by_default(self):
+        """Test that no store is kept unless value_store is set."""
+        device = self._device()
+        device.handle_event(self._event(b"\x00\xd2"))
+        assert device.values is None
+
+    def test_device_keeps_latest_values(self):
+        """Test that changed values are stored and unchanged ones only move the timestamp."""
+        device = self._device(value_store=True, suppress_unchanged_values=True)
+        device.handle_event(self._event(b"\x00\xd2"))
+        assert device.values.get(0x4203) == pytest.approx(21.0)
+        assert device.values.timestamps[0] == device.last_packet_time.timestamp()
+        device.handle_event(self._event(b"\x00\xdc"))
+        assert device.values.get(0x4203) == pytest.approx(22.0)
+        device._last_header = None  # Next event is a new packet
+        device.handle_event(self._event(b"\x00\xdc"))
+        assert device.values.sequence == 2
+        assert device.values.timestamps[0] == device.last_packet_time.timestamp()
+
+    async def test_bus_snapshot(self):
+        """Test that SamsungNasa returns a snapshot of every device with a store."""
+        nasa = SamsungNasa(
+            config={"device_path": "socket://localhost:8000", "value_store": True, "device_addresses": ["200001"]}
+        )
+        nasa.devices["200001"].handle_event(self._event(b"\x00\xd2"))
+        snapshots = nasa.value_snapshot()
+        assert list(snapshots["200001"].message_ids) == [0x4203]
+        nasa.devices.clear()  # devices is shared by every SamsungNasa
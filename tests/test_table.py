@@ -0,0 +1,89 @@
+"""Tests for the precompiled message decode table."""
+
+import pytest
+
+from pysamsungnasa.protocol.factory.messages import MESSAGE_PARSERS
+from pysamsungnasa.protocol.factory.table import (
+    DECODE_TABLE,
+    DecodeTable,
+    MessageFlags,
+    build_decode_entry,
+    message_flags,
+)
+from pysamsungnasa.protocol.factory.types import RawMessage
+
+SAMPLE_PAYLOADS = [
+    b"\x00",
+    b"\x01",
+    b"\x7f",
+    b"\xff",
+    b"\x00\x00",
+    b"\x01\x2c",
+    b"\xff\x38",
+    b"\x00\x01\x86\xa0",
+    b"\xff\xff\xff\xff",
+]
+
+
+class TestDecodeTable:
+    """Tests for DECODE_TABLE."""
+
+    def test_every_known_message_has_an_entry(self):
+        """Test that the table covers every message parser."""
+        for message_id, parser_class in MESSAGE_PARSERS.items():
+            entry = dict.get(DECODE_TABLE, message_id)
+            assert entry is not None
+            assert entry.flags & MessageFlags.KNOWN
+            if parser_class.MESSAGE_NAME is not None:
+                assert entry.name == parser_class.MESSAGE_NAME
+
+    @pytest.mark.parametrize(
+        "message_id,payload_size",
+        [(0x4000, 1), (0x4201, 2), (0x4423, 4), (0x4601, 0)],
+    )
+    def test_payload_size_from_message_id(self, message_id, payload_size):
+        """Test that the payload size follows the size kind bits of the message ID."""
+        assert build_decode_entry(message_id).payload_size == payload_size
+
+    def test_structure_flag(self):
+        """Test that variable length messages are flagged as structures."""
+        assert build_decode_entry(0x4601).flags & MessageFlags.STRUCTURE
+        assert not build_decode_entry(0x4000).flags & MessageFlags.STRUCTURE
+
+    def test_is_fsv_message_reads_the_table_flag(self):
+        """Test that is_fsv_message of every known message class agrees with the FSV flag of its entry."""
+        fsv = 0
+        for message_id, parser_class in MESSAGE_PARSERS.items():
+            flagged = bool(DECODE_TABLE[message_id].flags & MessageFlags.FSV)
+            assert message_flags(parser_class) == DECODE_TABLE[message_id].flags
+            assert parser_class.lazy(b"\x00").is_fsv_message is flagged
+            fsv += flagged
+        assert fsv > 0
+
+    def test_unknown_message_is_built_once(self):
+        """Test that entries for unknown IDs are built on first use and cached."""
+        table = DecodeTable()
+        entry = table[0x40FE]
+        assert table[0x40FE] is entry
+        assert entry.name == "Message 0x40fe"
+        assert entry.flags == MessageFlags.NONE
+        assert isinstance(entry.parser(b"\x01"), RawMessage)
+
+    def test_compiled_parsers_match_parse_payload(self):
+        """Test that every table parser produces the same message as the class parse_payload."""
+        for message_id, parser_class in MESSAGE_PARSERS.items():
+            entry = DECODE_TABLE[message_id]
+            for payload in SAMPLE_PAYLOADS:
+                if len(payload) != entry.payload_size:
+                    continue  # Structures are parsed by their class unchanged
+                try:
+                    expected = parser_class.parse_payload(payload)
+                except Exception as ex:  # pylint: disable=broad-except
+                    with pytest.raises(type(ex)):
+                        entry.parser(payload)
+                    continue
+                message = entry.parser(payload)
+                assert type(message) is type(expected)
+                assert message.VALUE == expected.VALUE, hex(message_id)
+                assert message.OPTIONS == expected.OPTIONS
+                assert message.RAW_PAYLOAD == expected.RAW_PAYLOAD
@@ -0,0 +1,71 @@
+"""Tests for the frame trace."""
+
+import pytest
+
+from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.nasa_client import NasaClient
+from pysamsungnasa.protocol import FrameEncoder, FrameTrace, TraceRecord
+from pysamsungnasa.protocol.trace import RX, TX
+
+PACKET_DATA = bytes.fromhex("200000b0ff20c0140101400001")
+
+
+class TestFrameTrace:
+    """Tests for FrameTrace."""
+
+    def test_invalid_size(self):
+        """Test that a trace must hold at least one frame."""
+        with pytest.raises(ValueError):
+            FrameTrace(0)
+
+    def test_records_in_order(self):
+        """Test that frames are returned oldest first."""
+        trace = FrameTrace(4)
+        trace.record(RX, b"\x01")
+        trace.record(TX, b"\x02")
+        records = list(trace)
+        assert len(trace) == 2
+        assert all(isinstance(record, TraceRecord) for record in records)
+        assert [(record.direction, record.raw) for record in records] == [(RX, b"\x01"), (TX, b"\x02")]
+
+    def test_oldest_frames_are_dropped(self):
+        """Test that the trace never grows beyond its size."""
+        trace = FrameTrace(3)
+        for value in range(10):
+            trace.record(RX, bytes([value]))
+        assert trace.size == 3
+        assert [record.raw for record in trace] == [b"\x07", b"\x08", b"\x09"]
+
+    def test_dump(self):
+        """Test that a dump has one line per frame with the direction and hex bytes."""
+        trace = FrameTrace(2)
+        trace.record(RX, b"\x32\x00")
+        trace.record(TX, b"\x34")
+        lines = trace.dump().splitlines()
+        assert len(lines) == 2
+        assert lines[0].endswith(" rx 3200")
+        assert lines[1].endswith(" tx 34")
+
+    def test_clear(self):
+        """Test that clear drops all frames."""
+        trace = FrameTrace(2)
+        trace.record(RX, b"\x01")
+        trace.clear()
+        assert len(trace) == 0
+        assert trace.dump() == ""
+
+
+class TestClientTrace:
+    """Tests for the frame trace kept by NasaClient."""
+
+    async def test_trace_disabled_by_default(self):
+        """Test that no trace is kept unless it is configured."""
+        client = NasaClient(config=NasaConfig(device_path="socket://localhost:8000"))
+        assert client.trace is None
+
+    async def test_received_frames_are_traced(self):
+        """Test that every framed RX frame is recorded."""
+        client = NasaClient(config=NasaConfig(device_path="socket://localhost:8000", trace_buffer_size=8))
+        raw = FrameEncoder.encode(PACKET_DATA)
+        await client._read_buffer_handler(b"\x00" + raw + raw)
+        assert [(record.direction, record.raw) for record in client.trace] == [(RX, raw), (RX, raw)]
@@ -0,0 +1,143 @@
+"""Tests for the TX priority queue."""
+
+import asyncio
+
+import pytest
+
+from pysamsungnasa.protocol.enum import DataType
+from pysamsungnasa.protocol.factory.types import SendMessage
+from pysamsungnasa.protocol.txqueue import TxPriority, TxQueue
+
+
+class FakeClock:
+    """Clock the tests move by hand."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _drain(queue):
+    frames = []
+    while not queue.empty():
+        frames.append(queue.get_nowait())
+    return frames
+
+
+class TestTxQueue:
+    """Tests for TxQueue."""
+
+    def test_priority_order(self):
+        """Test that interactive frames go before retries and retries before polls, FIFO within a class."""
+        queue = TxQueue()
+        queue.put_nowait(b"poll1", TxPriority.POLL)
+        queue.put_nowait(b"retry", TxPriority.RETRY)
+        queue.put_nowait(b"poll2", TxPriority.POLL)
+        queue.put_nowait(b"write", TxPriority.INTERACTIVE)
+        assert _drain(queue) == [b"write", b"retry", b"poll1", b"poll2"]
+
+    def test_depths(self):
+        """Test that the depth of each class is reported."""
+        queue = TxQueue()
+        queue.put_nowait(b"a", TxPriority.POLL)
+        queue.put_nowait(b"b", TxPriority.POLL)
+        queue.put_nowait(b"c", TxPriority.RETRY)
+        assert queue.depths == {TxPriority.INTERACTIVE: 0, TxPriority.RETRY: 1, TxPriority.POLL: 2}
+        assert queue.qsize() == 3
+        queue.get_nowait()
+        assert queue.depth(TxPriority.RETRY) == 0
+
+    def test_no_starvation(self):
+        """Test that a frame waiting max_wait is sent ahead of newer higher priority frames."""
+        clock = FakeClock()
+        queue = TxQueue(max_wait=1.0, clock=clock)
+        queue.put_nowait(b"poll", TxPriority.POLL)
+        clock.now = 0.5
+        queue.put_nowait(b"write1", TxPriority.INTERACTIVE)
+        assert queue.get_nowait() == b"write1"
+        clock.now = 1.0
+        queue.put_nowait(b"write2", TxPriority.INTERACTIVE)
+        assert queue.get_nowait() == b"poll"
+        assert queue.get_nowait() == b"write2"
+
+    def test_supersede_drops_queued_frame(self):
+        """Test that a frame with the same key replaces one queued in the same or a lower class."""
+        queue = TxQueue()
+        queue.put_nowait(b"old poll", TxPriority.POLL, key="200000_read")
+        queue.put_nowait(b"other", TxPriority.POLL)
+        queue.put_nowait(b"new poll", TxPriority.POLL, key="200000_read")
+        queue.put_nowait(b"old retry", TxPriority.RETRY, key="200000_write")
+        queue.put_nowait(b"new write", TxPriority.INTERACTIVE, key="200000_write")
+        assert queue.dropped == 2
+        assert queue.qsize() == 3
+        assert _drain(queue) == [b"new write", b"other", b"new poll"]
+
+    def test_lower_class_does_not_supersede(self):
+        """Test that a retry never drops a queued interactive frame."""
+        queue = TxQueue()
+        queue.put_nowait(b"write", TxPriority.INTERACTIVE, key="k")
+        queue.put_nowait(b"retry", TxPriority.RETRY, key="k")
+        assert queue.dropped == 0
+        assert _drain(queue) == [b"write", b"retry"]
+
+    def test_get_nowait_empty(self):
+        """Test that an empty queue raises QueueEmpty."""
+        with pytest.raises(asyncio.QueueEmpty):
+            TxQueue().get_nowait()
+
+    async def test_get_waits_for_a_frame(self):
+        """Test that get waits until a frame is queued."""
+        queue = TxQueue()
+        task = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not task.done()
+        await queue.put(b"frame", TxPriority.POLL)
+        assert await asyncio.wait_for(task, timeout=1.0) == b"frame"
+
+    async def test_join(self):
+        """Test that join waits for every frame, superseded ones count as handled."""
+        queue = TxQueue()
+        queue.put_nowait(b"a", TxPriority.POLL, key="k")
+        queue.put_nowait(b"b", TxPriority.POLL, key="k")
+        queue.get_nowait()
+        join = asyncio.create_task(queue.join())
+        await asyncio.sleep(0)
+        assert not join.done()
+        queue.task_done()
+        await asyncio.wait_for(join, timeout=1.0)
+        with pytest.raises(ValueError):
+            queue.task_done()
+
+
+class TestClientPriorities:
+    """Tests for TX priorities in NasaClient."""
+
+    async def test_write_is_sent_before_queued_polls(self, nasa_client):
+        """Test that a write queued behind heavy polling is sent first."""
+        for message_id in range(0x4000, 0x4020):
+            await nasa_client.send_message("200000", DataType.READ, [SendMessage(message_id, b"")])
+        packet_number = await nasa_client.send_message("200000", DataType.WRITE, [SendMessage(0x4000, b"\x01")])
+
+        assert nasa_client.tx_queue_depths[TxPriority.POLL] == 32
+        frame = nasa_client._tx_queue.get_nowait()
+        assert frame[11] == packet_number
+        nasa_client._pending_reads.clear()
+        nasa_client._pending_writes.clear()
+
+    async def test_retries_use_the_retry_class(self, nasa_client):
+        """Test that an explicit priority is used for the frame."""
+        await nasa_client.send_message(
+            "200000", DataType.WRITE, [SendMessage(0x4000, b"\x01")], priority=TxPriority.RETRY
+        )
+        assert nasa_client.tx_queue_depths[TxPriority.RETRY] == 1
+        nasa_client._pending_writes.clear()
+
+    async def test_repeated_poll_supersedes_queued_poll(self, nasa_client):
+        """Test that polling the same messages again replaces the frame still in the queue."""
+        for _ in range(3):
+            await nasa_client.send_message("200000", DataType.READ, [SendMessage(0x4000, b"")])
+        assert nasa_client._tx_queue.qsize() == 1
+        assert nasa_client._tx_queue.dropped == 2
+        nasa_client._pending_reads.clear()
@@ -1,15 +1,20 @@
 """Tests for NasaDevice write_attributes and message to_bytes functionality."""
 
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, Mock
 from pysamsungnasa.device import NasaDevice
 from pysamsungnasa.config import NasaConfig
+from pysamsungnasa.correlation import NackError
+from pysamsungnasa.protocol.encoder import OutgoingPacket
 from pysamsungnasa.protocol.parser import NasaPacketParser
 from pysamsungnasa.protocol.enum import AddressClass, DataType, InOperationPower, InOperationMode
 from pysamsungnasa.protocol.factory.types import (
     BoolMessage,
     FloatMessage,
     BasicTemperatureMessage,
+    SendMessage,
 )
 from pysamsungnasa.protocol.factory.messages.indoor import (
     InOperationPowerMessage,
@@ -160,8 +165,8 @@ class TestWriteAttributes:
         """Test writing a single attribute."""
         await device.write_attribute(InOperationPowerMessage, InOperationPower.ON_STATE_1)
 
-        device._client.send_message.assert_called_once()
-        call_args = device._client.send_message.call_args
+        device._client.request.assert_called_once()
+        call_args = device._client.request.call_args
         assert call_args.kwargs["destination"] == "200001"
         assert call_args.kwargs["request_type"] == DataType.WRITE
         messages = call_args.kwargs["messages"]
@@ -180,8 +185,8 @@ class TestWriteAttributes:
             }
         )
 
-        device._client.send_message.assert_called_once()
-        call_args = device._client.send_message.call_args
+        device._client.request.assert_called_once()
+        call_args = device._client.request.call_args
         messages = call_args.kwargs["messages"]
         assert len(messages) == 3
 
@@ -216,7 +221,7 @@ class TestWriteAttributes:
 
         # Should not raise
         await device.write_attributes(attributes)
-        device._client.send_message.assert_called_once()
+        device._client.request.assert_called_once()
 
     @pytest.mark.asyncio
     async def test_write_attribute_without_message_id(self, device):
@@ -232,7 +237,7 @@ class TestWriteAttributes:
         """Test that payload is properly encoded using to_bytes()."""
         await device.write_attribute(InTargetTemperature, 22.5)
 
-        call_args = device._client.send_message.call_args
+        call_args = device._client.request.call_args
         messages = call_args.kwargs["messages"]
         payload = messages[0].PAYLOAD
 
@@ -244,7 +249,7 @@ class TestWriteAttributes:
         """Test that enum values are properly encoded."""
         await device.write_attribute(InOperationModeMessage, InOperationMode.HEAT)
 
-        call_args = device._client.send_message.call_args
+        call_args = device._client.request.call_args
         messages = call_args.kwargs["messages"]
         payload = messages[0].PAYLOAD
 
@@ -256,7 +261,7 @@ class TestWriteAttributes:
         """Test that write goes to correct device address."""
         await device.write_attribute(InOperationPowerMessage, InOperationPower.ON_STATE_1)
 
-        call_args = device._client.send_message.call_args
+        call_args = device._client.request.call_args
         assert call_args.kwargs["destination"] == device.address
 
     @pytest.mark.asyncio
@@ -264,9 +269,79 @@ class TestWriteAttributes:
         """Test that request type is WRITE."""
         await device.write_attribute(InOperationPowerMessage, InOperationPower.ON_STATE_1)
 
-        call_args = device._client.send_message.call_args
+        call_args = device._client.request.call_args
         assert call_args.kwargs["request_type"] == DataType.WRITE
 
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_are_coalesced(self, device):
+        """Test that writes issued together are sent in one packet with the latest value of each attribute."""
+        device._client.request.return_value = 9
+        results = await asyncio.gather(
+            device.write_attribute(InOperationPowerMessage, InOperationPower.ON_STATE_1),
+            device.write_attribute(InOperationModeMessage, InOperationMode.COOL),
+            device.write_attribute(InTargetTemperature, 21.0),
+            device.write_attribute(InOperationModeMessage, InOperationMode.HEAT),
+        )
+
+        assert results == [9, 9, 9, 9]
+        device._client.request.assert_called_once()
+        messages = device._client.request.call_args.kwargs["messages"]
+        assert [msg.MESSAGE_ID for msg in messages] == [0x4000, 0x4001, 0x4201]
+        assert messages[1].PAYLOAD == bytes([InOperationMode.HEAT.value])
+
+
+class TestWriteAttributesReply:
+    """Tests for write_attributes waiting for the ACK or NACK to the coalesced packet."""
+
+    @pytest.fixture
+    def device_and_parser(self, nasa_client):
+        """Create a test device sending through a real NasaClient, and the parser its replies go through."""
+        config = NasaConfig(write_coalesce_window=0.01)
+        parser = NasaPacketParser(config=config)
+        parser.set_reply_handler(nasa_client._handle_reply)
+        device = NasaDevice(
+            address="200001",
+            device_type=AddressClass.INDOOR,
+            packet_parser=parser,
+            config=config,
+            client=nasa_client,
+        )
+        yield device, parser
+        nasa_client._pending_writes.clear()
+
+    @staticmethod
+    async def _reply(device, parser, data_type):
+        """Answer the next frame sent with a reply of data_type."""
+        while device._client._tx_queue.empty():
+            await asyncio.sleep(0.005)
+        frame = device._client._tx_queue.get_nowait()
+        reply = OutgoingPacket.create("200001", "80FF01", data_type, [SendMessage(0x4000, b"\x01")])
+        await parser.parse_packet(reply.packet_data(frame[11]))
+
+    async def test_every_caller_gets_the_ack(self, device_and_parser):
+        """Test that every write merged into one packet is resolved by its ACK."""
+        device, parser = device_and_parser
+        writes = asyncio.gather(
+            device.write_attribute(InOperationPowerMessage, InOperationPower.ON_STATE_1),
+            device.write_attribute(InTargetTemperature, 21.0),
+        )
+        await self._reply(device, parser, DataType.ACK)
+        first, second = await asyncio.wait_for(writes, timeout=1.0)
+        assert first is second
+        assert first.header.payload_type == DataType.ACK
+
+    async def test_every_caller_gets_the_nack(self, device_and_parser):
+        """Test that every write merged into one packet fails with NackError when the device rejects it."""
+        device, parser = device_and_parser
+        writes = [
+            asyncio.create_task(device.write_attribute(InOperationPowerMessage, InOperationPower.ON_STATE_1)),
+            asyncio.create_task(device.write_attribute(InTargetTemperature, 21.0)),
+        ]
+        await self._reply(device, parser, DataType.NACK)
+        for write in writes:
+            with pytest.raises(NackError):
+                await asyncio.wait_for(write, timeout=1.0)
+
 
 class TestMessageRoundTrip:
     """Integration tests for parse -> to_bytes -> parse round-trips."""